@@ -7,24 +7,107 @@ Agora SDK 自动化处理模块
 
 import os
 import sys
+import json
+import contextlib
 import zipfile
-import subprocess
 import shutil
 from pathlib import Path
 import argparse
+import functools
+import stat
+import threading
+
+from build_journal import BuildJournal, journal_key, journal_path
+from build_manifest import BuildManifest, manifest_path, output_matches
+from dylib_graph import build_graph_from_zip, print_graph_report
+from fast_copy import copy_file
+from conversion_cache import CACHE_FORMAT_VERSION, ConversionCache, hash_bytes, hash_file
+from sdk_metrics import MetricsRecorder, format_metrics_table
+from macho_parser import parse_macho, read_macho
+from macho_rewriter import dylib_install_names, rewrite_buffer, rewrite_install_names
+from macho_slicer import UNIVERSAL, parse_arch_option, select_slice, thin_file
+from sdk_index import SdkZipIndex
+from sdk_archive import (DEFAULT_LEVEL, READ_CHUNK_SIZE, ZipArchiveWriter, close_members,
+                         compress_bytes, compress_directory, compress_file, compress_files,
+                         read_raw_members)
+from sdk_pipeline import ResourceBudget, context_executor, run_pipeline
+from sdk_version import parse_sdk_version, version_suffix
+
+# 并行任务因其他任务失败而被跳过
+_SKIPPED = object()
+# 流式模式下输出dylib的zip外部属性，与解压后再复制得到的文件权限一致
+_DYLIB_EXTERNAL_ATTR = (stat.S_IFREG | 0o644) << 16
 
 class AgoraSDKProcessor:
     """Agora SDK 处理器"""
     
-    def __init__(self, sdk_dir="agora_sdk", aed_dir="SDK/aed", output_dir=None):
+    def __init__(self, sdk_dir="agora_sdk", aed_dir="SDK/aed", output_dir=None, jobs=1,
+                 stream=False, cache=None, work_dir=None, metrics=None, incremental=True,
+                 compress_level=DEFAULT_LEVEL, compress_jobs=None, store_compressed=False,
+                 verify_deps=False, arch=None, pipeline=False, max_memory=None, max_disk=None,
+                 resume=False):
         # 如果没有指定输出目录，则使用当前工作目录
         self.output_dir = Path(output_dir) if output_dir else Path.cwd()
-        # 在输出目录下创建临时的sdk目录
-        self.sdk_dir = self.output_dir / sdk_dir
         self.aed_dir = Path(aed_dir)
-        self.temp_dir = Path("temp_sdk")
-        # 版本信息
+        if work_dir:
+            # 指定工作目录时临时目录都放在其中，多个处理器可以同时运行互不覆盖
+            self.sdk_dir = Path(work_dir) / sdk_dir
+            self.temp_dir = Path(work_dir) / "temp_sdk"
+        else:
+            # 在输出目录下创建临时的sdk目录
+            self.sdk_dir = self.output_dir / sdk_dir
+            self.temp_dir = Path("temp_sdk")
+        # 解压时根据zip中央目录建立的framework索引
+        self.sdk_index = None
+        # 并行转换framework的任务数
+        self.jobs = max(1, jobs or 1)
+        # 流式模式：直接从源zip读取framework二进制，不解压到磁盘
+        self.stream = stream
+        # 流水线模式（流式模式的基础上）：转换与写入压缩包同时进行
+        self.pipeline = pipeline
+        # 低占用模式的内存与临时磁盘上限（字节），任一项不为None时使用流水线并按预算放行framework
+        self.max_memory = max_memory
+        self.max_disk = max_disk
+        # 转换缓存（ConversionCache），None 表示不使用缓存
+        self.cache = cache
+        # 各阶段的耗时与资源度量（MetricsRecorder）
+        self.metrics = metrics or MetricsRecorder()
+        # zlib压缩级别（0-9）
+        self.compress_level = compress_level
+        # 并行压缩的线程数，None 表示使用全部CPU
+        self.compress_jobs = max(1, compress_jobs or os.cpu_count() or 1)
+        # 已压缩的内容（嵌套zip等）直接存储
+        self.store_compressed = store_compressed
+        # 处理过程中使用的压缩线程池
+        self.compress_pool = None
+        # 只输出该架构的dylib（例如 "arm64"），None 表示保持通用二进制
+        self.arch = arch
+        # 生成压缩包后检查dylib依赖图，有问题时处理失败
+        self.verify_deps = verify_deps
+        # 增量处理：根据上次的构建清单只重做输入发生变化的部分
+        self.incremental = incremental
+        # 本次处理的构建清单
+        self.manifest = None
+        # 断点续传：失败时保留已完成的解压与转换结果，再次运行时从断点继续
+        self.resume = resume
+        # 解压模式下的断点续传日志（BuildJournal）
+        self.journal = None
+        # 从断点沿用的已转换framework {lib_name: 日志中的记录}
+        self.resumed = {}
+        # 沿用上次结果的framework {lib_name: 上次清单中的记录}
+        self.reused = {}
+        # 可以从上次AED包中直接复制压缩数据的AED文件名
+        self.reused_aed = set()
+        # 标准包 / AED包 是否已是最新，无需重新生成
+        self.standard_fresh = False
+        self.aed_fresh = False
+        # 本次转换得到的dylib哈希 {lib_name: sha256}
+        self.dylib_hashes = {}
+        # 版本信息（SdkVersion，无法识别时为None）与输出文件名中的后缀
+        self.sdk_version = None
         self.version_suffix = ""
+        # 本次处理生成的压缩包路径
+        self.output_files = []
         
     def process_sdk(self, sdk_zip_path):
         """
@@ -38,65 +121,318 @@ class AgoraSDKProcessor:
         """
         try:
             print(f"🚀 开始处理SDK: {sdk_zip_path}")
+            self.output_files = []
+            self.dylib_hashes = {}
+            if self.compress_jobs > 1:
+                self.compress_pool = context_executor(self.compress_jobs)
             
             # 解析原zip文件名，提取版本信息
             self._parse_zip_filename(sdk_zip_path)
             
-            # 1. 解压SDK
-            if not self._extract_sdk(sdk_zip_path):
+            # 读取zip中央目录，并与上次的构建清单对比，确定需要重做的部分
+            if not self._scan_sdk(sdk_zip_path):
                 return False
+            with self.metrics.stage("plan"):
+                self._plan_build(sdk_zip_path)
             
-            # 2. 转换framework为dylib
-            if not self._convert_frameworks():
-                return False
+            # 解压模式下总是记录断点（失败后保留），--resume 时从第一个未完成的单元继续
+            self.journal = None
+            self.resumed = {}
+            if self._streaming():
+                if self.resume:
+                    print("⚠️  流式/流水线模式不保留中间结果，--resume 只对解压模式生效")
+            elif not self.standard_fresh:
+                self._open_journal(sdk_zip_path)
             
-            # 3. 生成标准压缩包
-            if not self._create_standard_zip():
-                return False
+            if self.standard_fresh and self.aed_fresh:
+                print("✅ 输入未变化，压缩包保持不变")
+                self.output_files = [path for path in (self._standard_zip_path(),
+                                                       self._aed_zip_path())
+                                     if path.name in self.manifest.outputs]
+            elif (self.pipeline or self._bounded()) and not self.standard_fresh:
+                # 1-5. 流水线：读取、改写、压缩与写入两个压缩包同时进行
+                with self.metrics.stage("pipeline"):
+                    if not self._pipeline_sdk(sdk_zip_path):
+                        return False
+            else:
+                if self.standard_fresh:
+                    # 只有AED文件变化，直接沿用标准包中的dylib
+                    members = []
+                elif self.stream:
+                    # 1-3. 流式读取、改写并压缩framework，不写入任何临时目录
+                    with self.metrics.stage("convert"):
+                        members = self._stream_frameworks(sdk_zip_path)
+                else:
+                    # 1. 解压SDK
+                    if not self._extract_sdk(sdk_zip_path):
+                        return False
+                    
+                    # 2. 转换framework为dylib
+                    with self.metrics.stage("convert"):
+                        converted = self._convert_frameworks()
+                    if not converted:
+                        return False
+                    
+                    # 3. 压缩dylib（只压缩一次，两个压缩包共用）
+                    with self.metrics.stage("compress"):
+                        members = self._compress_sdk_dir()
+                if members is None:
+                    return False
+                
+                try:
+                    # 未变化的dylib从上次的标准包中取出
+                    reused_members = self._reused_members()
+                    if reused_members is None:
+                        return False
+                    members.extend(reused_members)
+                    members.sort(key=lambda member: member.arcname)
+                    
+                    # 4. 生成标准压缩包
+                    if self.standard_fresh:
+                        print("✅ 标准压缩包未变化，跳过")
+                        self.output_files.append(self._standard_zip_path())
+                    elif not self._create_standard_zip(members):
+                        return False
+                    
+                    # 5. 生成AED版本压缩包
+                    if not self._create_aed_zip(members):
+                        return False
+                finally:
+                    close_members(members)
             
-            # 4. 生成AED版本压缩包
-            if not self._create_aed_zip():
+            # 检查压缩包中dylib的依赖关系
+            if self.verify_deps and not self._verify_dependencies():
                 return False
             
-            # 5. 清理临时文件
-            self._cleanup()
+            # 记录本次的输入与产物，供下次增量处理
+            self._save_manifest()
+            
+            # 6. 清理临时文件
+            with self.metrics.stage("cleanup"):
+                self._cleanup()
             
             print("✅ SDK处理完成!")
             return True
             
         except Exception as e:
             print(f"❌ 处理SDK时发生错误: {e}")
-            self._cleanup()
+            if self.journal is not None and self.journal.path.exists():
+                # 不论本次是否使用 --resume，已完成的解压与转换结果都保留给下次继续
+                print("⏯️  已保留断点，使用 --resume 再次运行可以继续处理")
+            else:
+                self._cleanup()
             return False
+        finally:
+            if self.compress_pool is not None:
+                self.compress_pool.shutdown()
+                self.compress_pool = None
     
     def _parse_zip_filename(self, sdk_zip_path):
         """解析zip文件名，提取版本信息"""
         try:
             zip_filename = Path(sdk_zip_path).name
-            
-            # 查找v4.4.30的位置
-            version_start = zip_filename.find("v4.4.30")
-            if version_start != -1:
-                # 提取v4.4.30后面的所有字符，但去掉.zip扩展名
-                version_part = zip_filename[version_start:]
-                if version_part.endswith('.zip'):
-                    self.version_suffix = version_part[:-4]  # 去掉.zip
-                else:
-                    self.version_suffix = version_part
-                print(f"📋 提取版本信息: {self.version_suffix}")
+            self.sdk_version = parse_sdk_version(zip_filename)
+            self.version_suffix = version_suffix(zip_filename)
+            if self.sdk_version is not None:
+                print(f"📋 提取版本信息: {self.sdk_version.describe()}")
             else:
-                # 如果没有找到v4.4.30，使用默认后缀
-                self.version_suffix = "unknown"
-                print(f"⚠️  未找到版本信息，使用默认后缀: {self.version_suffix}")
+                # 没有版本号时后缀中保留文件名，不同SDK的压缩包不会互相覆盖
+                print(f"⚠️  未找到版本信息，使用文件名作为后缀: {self.version_suffix}")
                 
         except Exception as e:
             print(f"⚠️  解析文件名失败: {e}")
             # 使用默认后缀作为后备
+            self.sdk_version = None
             self.version_suffix = "unknown"
     
+    def _scan_sdk(self, sdk_zip_path):
+        """读取zip中央目录建立framework索引"""
+        try:
+            with self.metrics.stage("scan") as details:
+                with zipfile.ZipFile(sdk_zip_path, 'r') as zip_ref:
+                    self.sdk_index = SdkZipIndex(zip_ref, arch=self.arch)
+                details["members"] = len(self.sdk_index.infos)
+                details["frameworks"] = len(self.sdk_index)
+            for xcframework, selected in self.sdk_index.xcframeworks.items():
+                if selected is None:
+                    print(f"⚠️  {xcframework} 中没有可用的macOS slice，跳过")
+            return True
+            
+        except Exception as e:
+            print(f"❌ 读取SDK文件失败: {e}")
+            return False
+    
+    def _framework_binaries(self):
+        """{lib_name: 动态库成员}，同名framework以最后出现的为准"""
+        return {entry.name: entry.binary for entry in self.sdk_index or []}
+    
+    def _streaming(self):
+        """是否直接从源zip读取framework（流式、流水线与低占用模式），不经过解压与转换目录"""
+        return self.stream or self.pipeline or self._bounded()
+    
+    def _bounded(self):
+        """是否限制了内存或临时磁盘占用"""
+        return self.max_memory is not None or self.max_disk is not None
+    
+    def _output_suffix(self):
+        """压缩包与清单文件名中的后缀，指定架构时追加架构名"""
+        return f"{self.version_suffix}_{self.arch}" if self.arch else self.version_suffix
+    
+    def _standard_zip_path(self):
+        return self.output_dir / f"agora_sdk_mac_{self._output_suffix()}.zip"
+    
+    def _aed_zip_path(self):
+        return self.output_dir / f"agora_sdk_mac_{self._output_suffix()}-aed.zip"
+    
+    def _cache_params(self, lib_name):
+        """转换缓存键中的参数（通用二进制不带架构，与之前的缓存兼容）"""
+        params = {"lib_name": lib_name}
+        if self.arch:
+            params["arch"] = self.arch
+        return params
+    
+    def _aed_files(self):
+        return sorted(self.aed_dir.glob("*.dylib")) if self.aed_dir.exists() else []
+    
+    def _build_params(self):
+        """影响输出内容的参数，变化时不沿用上次的结果"""
+        params = {"rewrite_version": CACHE_FORMAT_VERSION, "compress_level": self.compress_level,
+                  "store_compressed": self.store_compressed}
+        if self.arch:
+            params["arch"] = self.arch
+        return params
+    
+    def _plan_build(self, sdk_zip_path):
+        """对比上次的构建清单，确定可以沿用的dylib与压缩包"""
+        self.manifest = BuildManifest(self._build_params())
+        self.manifest.source = Path(sdk_zip_path).name
+        self.manifest.aed = {path.name: hash_file(path) for path in self._aed_files()}
+        self.reused = {}
+        self.reused_aed = set()
+        self.standard_fresh = self.aed_fresh = False
+        
+        if not self.incremental:
+            return
+        previous = BuildManifest.load(manifest_path(self.output_dir, self._output_suffix()))
+        if previous is None or previous.params != self.manifest.params:
+            return
+        standard_zip = self._standard_zip_path()
+        if not previous.output_unchanged(standard_zip):
+            print("⚠️  上次生成的标准压缩包已变化，重新完整处理")
+            return
+        
+        frameworks = self._framework_binaries()
+        for lib_name, info in frameworks.items():
+            if info is not None and previous.framework_unchanged(lib_name, info):
+                self.reused[lib_name] = previous.frameworks[lib_name]
+        
+        aed_zip = self._aed_zip_path()
+        if previous.output_unchanged(aed_zip):
+            self.reused_aed = {name for name, sha256 in self.manifest.aed.items()
+                               if previous.aed.get(name) == sha256}
+        
+        self.standard_fresh = (len(self.reused) == len(frameworks) and
+                               set(previous.frameworks) == set(frameworks))
+        if self.standard_fresh:
+            self.manifest.outputs[standard_zip.name] = previous.outputs[standard_zip.name]
+            if not self.manifest.aed:
+                self.aed_fresh = True
+            elif previous.aed == self.manifest.aed and previous.output_unchanged(aed_zip):
+                self.aed_fresh = True
+                self.manifest.outputs[aed_zip.name] = previous.outputs[aed_zip.name]
+        
+        print(f"♻️  增量处理: 沿用 {len(self.reused)}/{len(frameworks)} 个未变化的dylib")
+    
+    def _open_journal(self, sdk_zip_path):
+        """打开断点续传日志，--resume 且日志与本次输入一致时沿用已完成的单元"""
+        key = journal_key(sdk_zip_path, dict(self._build_params(), output=self._output_suffix()))
+        path = journal_path(self.sdk_dir)
+        journal = BuildJournal.load(path, key) if self.resume else None
+        if journal is None:
+            # 从头开始，清除上次中断留下的转换结果，避免混入压缩包
+            if self.sdk_dir.exists():
+                shutil.rmtree(self.sdk_dir)
+            self.journal = BuildJournal(path, key)
+            return
+        self.journal = journal
+        
+        # 只沿用内容与日志一致的dylib
+        frameworks = self._framework_binaries()
+        for lib_name, record in journal.frameworks.items():
+            dylib_path = self.sdk_dir / f"lib{lib_name}.dylib"
+            if (lib_name in frameworks and dylib_path.is_file() and
+                    hash_file(dylib_path) == record["sha256"]):
+                self.resumed[lib_name] = record
+                self.dylib_hashes[lib_name] = record["sha256"]
+            elif journal.stage_done("extract"):
+                # 需要重新转换，但其源文件可能没有被解压
+                journal.stages.remove("extract")
+        
+        standard_zip = self._standard_zip_path()
+        record = journal.outputs.get(standard_zip.name)
+        if (set(self.resumed) | set(self.reused) == set(frameworks) and
+                output_matches(record, standard_zip)):
+            # 标准包已经生成，所有dylib直接从中复制压缩数据，只需生成AED包
+            self.reused.update(self.resumed)
+            self.standard_fresh = True
+            self.manifest.outputs[standard_zip.name] = record
+        
+        done = ["解压"] if journal.stage_done("extract") else []
+        done.append(f"{len(self.resumed)} 个framework的转换")
+        if self.standard_fresh:
+            done.append("标准压缩包")
+        print(f"⏯️  从断点继续: 已完成{'、'.join(done)}")
+    
+    def _reused_members(self):
+        """从上次的标准压缩包中取出未变化的dylib（直接复制压缩数据，不重新压缩）"""
+        if not self.reused:
+            return []
+        try:
+            arcnames = [f"agora_sdk/lib{lib_name}.dylib" for lib_name in sorted(self.reused)]
+            return read_raw_members(self._standard_zip_path(), arcnames)
+            
+        except Exception as e:
+            print(f"❌ 读取上次的压缩包失败: {e}")
+            return None
+    
+    def _save_manifest(self):
+        """写入构建清单，失败时只提示（下次会完整处理）"""
+        try:
+            for lib_name, info in self._framework_binaries().items():
+                sha256 = self.dylib_hashes.get(lib_name)
+                if sha256 is None:
+                    sha256 = self.reused[lib_name]["sha256"]
+                self.manifest.add_framework(lib_name, info, sha256)
+            self.manifest.save(manifest_path(self.output_dir, self._output_suffix()))
+        except Exception as e:
+            print(f"⚠️  写入构建清单失败: {e}")
+    
+    @contextlib.contextmanager
+    def _output_writer(self, zip_path):
+        """先写临时文件再替换，写入过程中失败不会破坏上次的压缩包"""
+        tmp_path = zip_path.with_name(f".{zip_path.name}.tmp")
+        zip_path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            with ZipArchiveWriter(tmp_path) as writer:
+                yield writer
+            os.replace(tmp_path, zip_path)
+        except BaseException:
+            if tmp_path.exists():
+                tmp_path.unlink()
+            raise
+        self.manifest.add_output(zip_path)
+    
+    def _write_output(self, zip_path, members):
+        with self._output_writer(zip_path) as writer:
+            for member in members:
+                writer.add(member)
+    
     def _extract_sdk(self, sdk_zip_path):
         """解压SDK文件"""
         try:
+            if self.journal is not None and self.journal.stage_done("extract"):
+                print("⏯️  SDK已解压，跳过")
+                return True
             print("📦 解压SDK文件...")
             
             # 清理临时目录
@@ -104,13 +440,22 @@ class AgoraSDKProcessor:
                 shutil.rmtree(self.temp_dir)
             
             # 创建临时目录
-            self.temp_dir.mkdir(exist_ok=True)
+            self.temp_dir.mkdir(parents=True, exist_ok=True)
             
-            # 解压zip文件
+            # 根据中央目录索引，只解压需要重新转换的动态库成员
+            needed = self.sdk_index.needed_members(exclude=set(self.reused) | set(self.resumed))
             with zipfile.ZipFile(sdk_zip_path, 'r') as zip_ref:
-                zip_ref.extractall(self.temp_dir)
+                with self.metrics.stage("extract") as details:
+                    for info in needed:
+                        zip_ref.extract(info, self.temp_dir)
+                    details["members"] = len(needed)
+                    details["uncompressed_bytes"] = sum(info.file_size for info in needed)
             
-            print("✅ SDK解压完成")
+            total = len(self.sdk_index.infos)
+            size_mb = sum(info.file_size for info in needed) / (1024 * 1024)
+            print(f"✅ SDK解压完成: {len(needed)}/{total} 个成员 ({size_mb:.1f} MB)")
+            if self.journal is not None:
+                self.journal.complete_stage("extract")
             return True
             
         except Exception as e:
@@ -122,31 +467,30 @@ class AgoraSDKProcessor:
         try:
             print("🔄 转换framework为dylib...")
             
-            # 查找所有framework文件
-            framework_files = []
-            for root, dirs, files in os.walk(self.temp_dir):
-                for dir_name in dirs:
-                    if dir_name.endswith('.framework'):
-                        framework_path = os.path.join(root, dir_name)
-                        framework_files.append(framework_path)
-            
-            if not framework_files:
+            # 直接使用解压时建立的索引，无需扫描临时目录
+            if not self.sdk_index:
                 print("⚠️  未找到framework文件")
                 return True
             
-            print(f"📁 找到 {len(framework_files)} 个framework文件")
+            print(f"📁 找到 {len(self.sdk_index)} 个framework文件")
+            frameworks = [entry for entry in self.sdk_index
+                          if entry.name not in self.reused and entry.name not in self.resumed]
+            if not frameworks:
+                print("✅ 所有framework均未变化，无需转换")
+                return True
             
             # 创建输出目录
-            self.sdk_dir.mkdir(exist_ok=True)
+            self.sdk_dir.mkdir(parents=True, exist_ok=True)
             
-            # 转换每个framework
-            for framework_path in framework_files:
-                lib_name = os.path.basename(framework_path).replace('.framework', '')
-                print(f"  🔄 转换: {lib_name}")
-                
-                if not self._convert_single_framework(framework_path, lib_name):
-                    print(f"  ❌ 转换失败: {lib_name}")
-                    return False
+            # 输出文件名相同的framework放在同一个任务中按原顺序转换，避免并发写同一个dylib
+            groups = {}
+            for entry in frameworks:
+                groups.setdefault(entry.name, []).append(entry)
+            
+            tasks = [functools.partial(self._convert_framework_group, lib_name, entries)
+                     for lib_name, entries in groups.items()]
+            if self._run_tasks(tasks) is None:
+                return False
             
             print("✅ Framework转换完成")
             return True
@@ -155,83 +499,259 @@ class AgoraSDKProcessor:
             print(f"❌ 转换framework失败: {e}")
             return False
     
-    def _convert_single_framework(self, framework_path, lib_name):
-        """转换单个framework为dylib"""
-        try:
-            # 查找Framework中的动态库文件
-            possible_paths = [
-                os.path.join(framework_path, "Versions", "A", lib_name),
-                os.path.join(framework_path, "Versions", "Current", lib_name),
-                os.path.join(framework_path, "Versions", "B", lib_name),
-                os.path.join(framework_path, lib_name)
-            ]
-            
-            lib_path = None
-            for path in possible_paths:
-                if os.path.exists(path) and os.path.isfile(path):
-                    lib_path = path
-                    break
-            
-            if lib_path is None:
-                print(f"    ❌ 找不到动态库文件: {lib_name}")
-                return False
+    def _run_tasks(self, tasks):
+        """
+        执行一组相互独立的任务，jobs>1时使用线程池并行执行，日志按任务顺序输出
+        
+        Args:
+            tasks: 任务函数列表，函数接收log参数，返回None表示失败
             
+        Returns:
+            list: 各任务的结果，任一任务失败时返回None
+        """
+        if self.jobs == 1 or len(tasks) <= 1:
+            results = []
+            for task in tasks:
+                result = task(log=print)
+                if result is None:
+                    return None
+                results.append(result)
+            return results
+        
+        stop = threading.Event()
+        
+        def run(task):
+            logs = []
+            if stop.is_set():
+                return _SKIPPED, logs
+            result = task(log=logs.append)
+            if result is None:
+                stop.set()
+            return result, logs
+        
+        print(f"⚡ 使用 {self.jobs} 个并行任务")
+        results = []
+        with context_executor(self.jobs) as executor:
+            futures = [executor.submit(run, task) for task in tasks]
+            for future in futures:
+                result, logs = future.result()
+                for line in logs:
+                    print(line)
+                if result is not None and result is not _SKIPPED:
+                    results.append(result)
+                    continue
+                # 遇到第一个失败后取消所有尚未开始的任务
+                for pending in futures:
+                    pending.cancel()
+                if result is _SKIPPED:
+                    # 当前任务因其他任务失败而跳过，补充输出真正失败的日志
+                    for other in futures:
+                        if not other.cancelled() and other.result()[0] is None:
+                            for line in other.result()[1]:
+                                print(line)
+                            break
+                return None
+        return results
+    
+    def _convert_framework_group(self, lib_name, entries, log=print):
+        """按顺序转换输出名相同的一组framework"""
+        for entry in entries:
+            log(f"  🔄 转换: {lib_name}")
+            if entry.binary is None:
+                log(f"    ❌ 找不到动态库文件: {lib_name}")
+                log(f"  ❌ 转换失败: {lib_name}")
+                return None
+            lib_path = self.temp_dir / entry.binary.filename
+            with self.metrics.stage(f"convert:{lib_name}",
+                                    input_bytes=entry.binary.file_size):
+                converted = self._convert_single_framework(lib_path, lib_name, log=log)
+            if not converted:
+                log(f"  ❌ 转换失败: {lib_name}")
+                return None
+        if self.journal is not None:
+            self.journal.complete_framework(lib_name, self.dylib_hashes[lib_name])
+        return True
+    
+    def _convert_single_framework(self, lib_path, lib_name, log=print):
+        """转换单个framework的动态库文件为dylib"""
+        try:
             # 输出dylib文件名和路径
             out_lib_name = f"lib{lib_name}.dylib"
             out_lib_path = os.path.join(self.sdk_dir, out_lib_name)
             
-            # 复制动态库文件
-            shutil.copy2(lib_path, out_lib_path)
+            # 源动态库内容与参数都相同时直接使用缓存（硬链接，临时目录中的文件只会被读取）
+            cache_key = None
+            if self.cache is not None:
+                cache_key = self.cache.make_key(hash_file(lib_path), **self._cache_params(lib_name))
+                if self.cache.fetch(cache_key, out_lib_path, link=True):
+                    log(f"    ⚡ 命中转换缓存: {lib_name}")
+                    self.dylib_hashes[lib_name] = hash_file(out_lib_path)
+                    return True
             
-            # 修改动态库的ID
-            command = f'install_name_tool -id @rpath/{out_lib_name} "{out_lib_path}"'
-            subprocess.call(command, shell=True)
+            # 复制动态库文件（之后会原地改写，不能使用硬链接）；指定架构时只复制该架构的slice
+            if self.arch:
+                thin_file(lib_path, out_lib_path, self.arch)
+            else:
+                copy_file(lib_path, out_lib_path)
             
-            # 处理依赖的@rpath引用
-            try:
-                rpaths_output = subprocess.check_output(["otool", "-L", out_lib_path])
-                rpaths = rpaths_output.decode("utf-8").split("\n")
-                
-                for rpath in rpaths:
-                    rpath_stripped = rpath.strip()
-                    if rpath_stripped.startswith("@rpath") and not rpath_stripped.endswith(".dylib"):
-                        rpath_stripped = rpath_stripped.split(" ")[0]
-                        dep_lib = rpath_stripped.split("/")[-1]
-                        
-                        if dep_lib == lib_name:
-                            continue
-                            
-                        command = f'install_name_tool -change "{rpath_stripped}" @rpath/lib{dep_lib}.dylib "{out_lib_path}"'
-                        subprocess.call(command, shell=True)
-            except subprocess.CalledProcessError:
-                pass  # 忽略依赖处理错误
+            # 一次性改写动态库ID与依赖的@rpath引用
+            new_id, changes = dylib_install_names(read_macho(out_lib_path), lib_name)
+            rewrite_install_names(out_lib_path, new_id, changes)
             
+            if cache_key is not None:
+                self.cache.store(cache_key, out_lib_path)
+            
+            self.dylib_hashes[lib_name] = hash_file(out_lib_path)
             return True
             
         except Exception as e:
-            print(f"    ❌ 转换失败: {e}")
+            log(f"    ❌ 转换失败: {e}")
             return False
     
-    def _create_standard_zip(self):
+    def _stream_frameworks(self, sdk_zip_path):
+        """流式处理：直接从源zip读取framework二进制，在内存中改写并压缩"""
+        try:
+            print("🌊 流式转换framework为dylib...")
+            
+            frameworks = self._framework_binaries()
+            for lib_name, info in frameworks.items():
+                if info is None:
+                    print(f"    ❌ 找不到动态库文件: {lib_name}")
+                    return None
+            if not frameworks:
+                print("⚠️  未找到framework文件")
+                return []
+            
+            print(f"📁 找到 {len(frameworks)} 个framework文件")
+            frameworks = {lib_name: info for lib_name, info in frameworks.items()
+                          if lib_name not in self.reused}
+            with zipfile.ZipFile(sdk_zip_path, 'r') as zip_ref:
+                tasks = [functools.partial(self._stream_convert_single, zip_ref, info, lib_name)
+                         for lib_name, info in frameworks.items()]
+                members = self._run_tasks(tasks)
+            
+            if members is None:
+                return None
+            members.sort(key=lambda member: member.arcname)
+            print("✅ Framework流式转换完成")
+            return members
+            
+        except Exception as e:
+            print(f"❌ 流式转换framework失败: {e}")
+            return None
+    
+    def _stream_convert_single(self, zip_ref, info, lib_name, log=print):
+        """在内存中转换单个framework二进制，返回压缩好的dylib成员"""
+        try:
+            log(f"  🔄 转换: {lib_name}")
+            with self.metrics.stage(f"convert:{lib_name}", input_bytes=info.file_size):
+                data = _read_member(zip_ref, info)
+                if self.arch:
+                    # 原地截取单个架构，不额外复制一份
+                    macho_slice = select_slice(parse_macho(data), self.arch)
+                    del data[macho_slice.offset + macho_slice.size:]
+                    del data[:macho_slice.offset]
+                
+                # 一次性改写动态库ID与依赖的@rpath引用
+                new_id, changes = dylib_install_names(parse_macho(data), lib_name)
+                rewrite_buffer(data, new_id, changes)
+                self.dylib_hashes[lib_name] = hash_bytes(data)
+                
+                return compress_bytes(data, f"agora_sdk/lib{lib_name}.dylib",
+                                      info.date_time, _DYLIB_EXTERNAL_ATTR,
+                                      self.compress_level, self.compress_pool,
+                                      self.store_compressed)
+            
+        except Exception as e:
+            log(f"    ❌ 转换失败: {e}")
+            log(f"  ❌ 转换失败: {lib_name}")
+            return None
+    
+    def _spool_convert_single(self, zip_ref, info, lib_name, log=print):
+        """
+        在临时目录中转换单个framework二进制（用于超过内存预算的大文件），返回压缩好的dylib成员
+        
+        动态库按块解压到临时文件，通过内存映射只改写加载命令所在的页，
+        压缩完成后立即删除临时文件
+        """
+        spool_dir = self.temp_dir / "spool"
+        raw_path = spool_dir / f"{lib_name}.fat"
+        dylib_path = spool_dir / f"lib{lib_name}.dylib"
+        try:
+            log(f"  🔄 转换: {lib_name}（临时文件）")
+            with self.metrics.stage(f"convert:{lib_name}", input_bytes=info.file_size):
+                spool_dir.mkdir(parents=True, exist_ok=True)
+                with zip_ref.open(info) as src, open(raw_path if self.arch else dylib_path,
+                                                      "wb") as dst:
+                    shutil.copyfileobj(src, dst, READ_CHUNK_SIZE)
+                if self.arch:
+                    thin_file(raw_path, dylib_path, self.arch)
+                    raw_path.unlink()
+                
+                new_id, changes = dylib_install_names(read_macho(dylib_path), lib_name)
+                rewrite_install_names(dylib_path, new_id, changes)
+                self.dylib_hashes[lib_name] = hash_file(dylib_path)
+                
+                member = compress_file(dylib_path, f"agora_sdk/lib{lib_name}.dylib",
+                                       self.compress_level, self.compress_pool,
+                                       self.store_compressed)
+                # 与内存中转换的结果保持一致
+                member.date_time = info.date_time
+                member.external_attr = _DYLIB_EXTERNAL_ATTR
+                return member
+            
+        except Exception as e:
+            log(f"    ❌ 转换失败: {e}")
+            log(f"  ❌ 转换失败: {lib_name}")
+            return None
+        finally:
+            for path in (raw_path, dylib_path):
+                with contextlib.suppress(FileNotFoundError):
+                    path.unlink()
+    
+    def _framework_cost(self, info, in_memory):
+        """
+        预估转换单个framework在写入压缩包前的占用
+        
+        Returns:
+            tuple: (内存字节数, 临时磁盘字节数)，压缩数据的大小按源成员的压缩大小估计
+        """
+        if in_memory:
+            return info.file_size, info.compress_size
+        # 指定架构时切片前后的两个临时文件会同时存在
+        raw_size = info.file_size * (2 if self.arch else 1)
+        return 0, raw_size + info.compress_size
+    
+    def _compress_sdk_dir(self):
+        """压缩转换后的dylib，标准包与AED包共用同一份压缩数据"""
+        try:
+            print("🗜️  压缩转换后的dylib...")
+            members = compress_directory(self.sdk_dir, "agora_sdk", self.compress_level,
+                                         self.compress_pool, self.store_compressed)
+            print(f"✅ 压缩完成: {len(members)} 个文件")
+            return members
+            
+        except Exception as e:
+            print(f"❌ 压缩dylib失败: {e}")
+            return None
+    
+    def _create_standard_zip(self, members):
         """创建标准压缩包"""
         try:
             print("📦 创建标准压缩包...")
             
-            # 生成文件名
-            zip_name = f"agora_sdk_mac_{self.version_suffix}.zip"
-            
             # 确保zip文件在指定的输出目录下创建
-            zip_path = self.output_dir / zip_name
+            zip_path = self._standard_zip_path()
             print(f"📁 输出目录: {self.output_dir}")
             print(f"📁 zip文件将创建在: {zip_path.absolute()}")
             
-            # 创建zip文件
-            with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                for file_path in self.sdk_dir.rglob('*'):
-                    if file_path.is_file():
-                        # 在zip内部创建agora_sdk目录结构
-                        arcname = Path("agora_sdk") / file_path.relative_to(self.sdk_dir)
-                        zipf.write(file_path, arcname)
+            # 直接写入已压缩的数据，在zip内部创建agora_sdk目录结构
+            with self.metrics.stage("zip:standard") as details:
+                self._write_output(zip_path, members)
+                details["output_bytes"] = zip_path.stat().st_size
+            self.output_files.append(zip_path)
+            if self.journal is not None:
+                self.journal.complete_output(zip_path.name, self.manifest.outputs[zip_path.name])
             
             print(f"✅ 标准压缩包创建完成: {zip_path}")
             return True
@@ -240,8 +760,9 @@ class AgoraSDKProcessor:
             print(f"❌ 创建标准压缩包失败: {e}")
             return False
     
-    def _create_aed_zip(self):
+    def _create_aed_zip(self, members):
         """创建AED版本压缩包"""
+        aed_members = []
         try:
             print("📦 创建AED版本压缩包...")
             
@@ -250,31 +771,27 @@ class AgoraSDKProcessor:
                 print("⚠️  AED目录不存在，跳过AED版本创建")
                 return True
             
-            # 直接将AED文件添加到现有的dylib目录中
-            aed_files = list(self.aed_dir.glob("*.dylib"))
+            aed_files = sorted(self.aed_dir.glob("*.dylib"))
             if not aed_files:
                 print("⚠️  AED目录中没有dylib文件，跳过AED版本创建")
                 return True
             
-            print(f"📁 集成 {len(aed_files)} 个AED文件到现有目录")
-            for aed_file in aed_files:
-                shutil.copy2(aed_file, self.sdk_dir)
-            
-            # 生成AED版本文件名
-            zip_name = f"agora_sdk_mac_{self.version_suffix}-aed.zip"
+            # 只压缩AED文件，不再复制到sdk目录；与已有dylib同名时替换之
+            print(f"📁 集成 {len(aed_files)} 个AED文件")
+            aed_members = self._aed_members(aed_files)
+            extras = {member.arcname: member for member in aed_members}
+            combined = [extras.pop(member.arcname, member) for member in members]
+            combined.extend(extras.values())
             
             # 确保zip文件在指定的输出目录下创建
-            zip_path = self.output_dir / zip_name
+            zip_path = self._aed_zip_path()
             print(f"📁 输出目录: {self.output_dir}")
             print(f"📁 AED zip文件将创建在: {zip_path.absolute()}")
             
-            # 创建AED版本zip文件（从包含AED文件的现有目录创建）
-            with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                for file_path in self.sdk_dir.rglob('*'):
-                    if file_path.is_file():
-                        # 在zip内部创建agora_sdk目录结构
-                        arcname = Path("agora_sdk") / file_path.relative_to(self.sdk_dir)
-                        zipf.write(file_path, arcname)
+            with self.metrics.stage("zip:aed") as details:
+                self._write_output(zip_path, combined)
+                details["output_bytes"] = zip_path.stat().st_size
+            self.output_files.append(zip_path)
             
             print(f"✅ AED版本压缩包创建完成: {zip_path}")
             return True
@@ -282,6 +799,156 @@ class AgoraSDKProcessor:
         except Exception as e:
             print(f"❌ 创建AED版本压缩包失败: {e}")
             return False
+        finally:
+            close_members(aed_members)
+    
+    def _aed_members(self, aed_files):
+        """压缩AED文件（按压缩包内路径排序）"""
+        aed_members = []
+        try:
+            with self.metrics.stage("compress:aed"):
+                # 未变化的AED文件直接复制上次AED包中的压缩数据
+                reused = [name for name in sorted(self.reused_aed)
+                          if (self.aed_dir / name) in aed_files]
+                if reused:
+                    aed_members.extend(read_raw_members(
+                        self._aed_zip_path(), [f"agora_sdk/{name}" for name in reused]))
+                aed_members.extend(compress_files(
+                    [(self._thin_aed_file(aed_file), f"agora_sdk/{aed_file.name}")
+                     for aed_file in aed_files if aed_file.name not in reused],
+                    self.compress_level, self.compress_pool, self.store_compressed))
+            aed_members.sort(key=lambda member: member.arcname)
+            return aed_members
+        except BaseException:
+            close_members(aed_members)
+            raise
+    
+    def _pipeline_sdk(self, sdk_zip_path):
+        """
+        流水线处理：framework在线程池中读取、改写并压缩，完成一个就按顺序写入
+        标准包与AED包，写入与后续framework的转换同时进行
+        """
+        aed_future = None
+        reused_members = []
+        try:
+            print("🚰 流水线转换framework并生成压缩包...")
+            
+            frameworks = self._framework_binaries()
+            for lib_name, info in frameworks.items():
+                if info is None:
+                    print(f"    ❌ 找不到动态库文件: {lib_name}")
+                    return False
+            print(f"📁 找到 {len(frameworks)} 个framework文件")
+            
+            # 两个压缩包的成员都按压缩包内路径排序，与非流水线模式的结果一致
+            reused_members = self._reused_members()
+            if reused_members is None:
+                return False
+            # {压缩包内路径: (来源, 预估占用)}，沿用的成员只引用上次的压缩包，不占用预算
+            sources = {member.arcname: (member, (0, 0)) for member in reused_members}
+            
+            aed_files = self._aed_files()
+            standard_path = self._standard_zip_path()
+            aed_path = self._aed_zip_path()
+            with contextlib.ExitStack() as stack:
+                zip_ref = stack.enter_context(zipfile.ZipFile(sdk_zip_path, 'r'))
+                executor = stack.enter_context(context_executor(self.jobs))
+                for lib_name, info in frameworks.items():
+                    if lib_name in self.reused:
+                        continue
+                    # 超过内存预算的framework改为在临时文件中转换
+                    in_memory = self.max_memory is None or info.file_size <= self.max_memory
+                    convert = (self._stream_convert_single if in_memory
+                               else self._spool_convert_single)
+                    sources[f"agora_sdk/lib{lib_name}.dylib"] = (
+                        functools.partial(convert, zip_ref, info, lib_name),
+                        self._framework_cost(info, in_memory))
+                
+                # AED文件与framework同时压缩
+                if aed_files:
+                    print(f"📁 集成 {len(aed_files)} 个AED文件")
+                    aed_future = executor.submit(self._aed_members, aed_files)
+                aed_names = {f"agora_sdk/{aed_file.name}" for aed_file in aed_files}
+                
+                standard = stack.enter_context(self._output_writer(standard_path))
+                aed = stack.enter_context(self._output_writer(aed_path)) if aed_files else None
+                # 尚未写入AED包的AED成员 {压缩包内路径: 成员}，第一次需要时才等待AED压缩完成
+                remaining = None
+                
+                def aed_remaining():
+                    nonlocal remaining
+                    if remaining is None:
+                        remaining = {member.arcname: member for member in aed_future.result()}
+                    return remaining
+                
+                def sink(member):
+                    standard.add(member)
+                    if aed is None:
+                        return
+                    if member.arcname in aed_names:
+                        # 与AED文件同名的dylib在AED包中被替换
+                        aed.add(aed_remaining().pop(member.arcname))
+                    else:
+                        aed.add(member)
+                
+                # 压缩包成员必须按顺序写入，预算只决定何时放行下一个framework
+                budget = (ResourceBudget(self.max_memory, self.max_disk)
+                          if self._bounded() else None)
+                ordered = [sources[name] for name in sorted(sources)]
+                written = run_pipeline([source for source, _ in ordered], sink, executor,
+                                       max_pending=self.jobs * 2,
+                                       costs=[cost for _, cost in ordered], budget=budget)
+                if aed is not None:
+                    extras = aed_remaining()
+                    for arcname in sorted(extras):
+                        aed.add(extras[arcname])
+            
+            self.output_files.append(standard_path)
+            print(f"✅ 标准压缩包创建完成: {standard_path}（{written} 个dylib）")
+            if budget is not None:
+                print(f"📊 预估峰值占用: 内存 {_format_mb(budget.peak[0])}，"
+                      f"临时磁盘 {_format_mb(budget.peak[1])}")
+            if aed_files:
+                self.output_files.append(aed_path)
+                print(f"✅ AED版本压缩包创建完成: {aed_path}")
+            return True
+            
+        except Exception as e:
+            print(f"❌ 流水线处理失败: {e}")
+            return False
+        finally:
+            # 失败时尚未写入的沿用成员仍持有上次压缩包的文件句柄
+            close_members(reused_members or [])
+            if aed_future is not None and aed_future.done() and not aed_future.exception():
+                close_members(aed_future.result())
+    
+    def _thin_aed_file(self, aed_file):
+        """指定架构时把AED文件切片到临时目录，返回要压缩的文件路径"""
+        if not self.arch:
+            return aed_file
+        thin_dir = self.temp_dir / "aed"
+        thin_dir.mkdir(parents=True, exist_ok=True)
+        thin_path = thin_dir / aed_file.name
+        thin_file(aed_file, thin_path, self.arch)
+        return thin_path
+    
+    def _verify_dependencies(self):
+        """检查生成的压缩包中dylib的依赖图"""
+        try:
+            print("🔗 检查dylib依赖关系...")
+            ok = True
+            with self.metrics.stage("verify"):
+                for zip_path in self.output_files:
+                    print(f"📦 {zip_path.name}")
+                    graph = build_graph_from_zip(zip_path, "agora_sdk/", self.compress_jobs)
+                    ok = print_graph_report(graph) and ok
+            if not ok:
+                print("❌ 依赖检查未通过")
+            return ok
+            
+        except Exception as e:
+            print(f"❌ 检查依赖关系失败: {e}")
+            return False
     
     def _cleanup(self):
         """清理临时文件"""
@@ -293,27 +960,175 @@ class AgoraSDKProcessor:
             if self.sdk_dir.exists():
                 shutil.rmtree(self.sdk_dir)
                 print("🧹 临时SDK目录清理完成")
+            
+            if self.journal is not None:
+                self.journal.remove()
         except Exception as e:
             print(f"⚠️  清理临时文件失败: {e}")
 
+def _read_member(zip_ref, info):
+    """按块把zip成员解压到预先分配的bytearray中（不会同时存在两份完整数据）"""
+    data = bytearray(info.file_size)
+    view = memoryview(data)
+    try:
+        with zip_ref.open(info) as f:
+            offset = 0
+            while offset < len(data):
+                read = f.readinto(view[offset:offset + READ_CHUNK_SIZE])
+                if not read:
+                    raise EOFError(f"{info.filename} 数据不完整")
+                offset += read
+    finally:
+        view.release()
+    return data
+
+
+def _format_mb(size):
+    return f"{size / (1024 * 1024):.1f} MB"
+
+
+def process_sdk_archs(sdk_zip_path, archs, metrics=None, **options):
+    """
+    按架构依次处理同一个SDK（--arch split 或多个架构时每个架构生成一组压缩包）
+    
+    Args:
+        sdk_zip_path: SDK zip文件的路径
+        archs: parse_arch_option 的结果，None 表示通用二进制
+        metrics: 所有架构共用的 MetricsRecorder
+        **options: 传给 AgoraSDKProcessor 的其他参数
+        
+    Returns:
+        tuple: (是否全部成功, 生成的压缩包路径列表)
+    """
+    metrics = metrics or MetricsRecorder()
+    output_files = []
+    for arch in archs:
+        processor = AgoraSDKProcessor(metrics=metrics, arch=arch, **options)
+        if arch is None:
+            success = processor.process_sdk(sdk_zip_path)
+        else:
+            print(f"🧬 输出架构: {arch}")
+            with metrics.stage(f"arch:{arch}"):
+                success = processor.process_sdk(sdk_zip_path)
+        output_files.extend(processor.output_files)
+        if not success:
+            return False, output_files
+    return True, output_files
+
+def _megabytes(value):
+    """命令行中的MB转换为字节数，None 表示不限制"""
+    return value * 1024 * 1024 if value is not None else None
+
+def _batch_main(args):
+    """批量模式入口，返回进程退出码"""
+    from sdk_batch import expand_sdk_inputs, print_batch_summary, process_batch
+    
+    sdk_zips = expand_sdk_inputs(args.sdk_zip)
+    if not sdk_zips:
+        print(f"❌ 错误: 没有找到SDK文件: {' '.join(args.sdk_zip)}")
+        return 1
+    
+    options = {
+        "sdk_dir": args.sdk_dir,
+        "aed_dir": args.aed_dir,
+        "jobs": args.jobs,
+        "stream": args.stream,
+        "pipeline": args.pipeline,
+        "cache": not args.no_cache,
+        "cache_dir": args.cache_dir,
+        "cache_max_bytes": args.cache_max_size * 1024 * 1024,
+        "incremental": not args.full_rebuild,
+        "compress_level": args.compress_level,
+        "compress_jobs": args.compress_jobs,
+        "store_compressed": args.store_compressed,
+        "verify_deps": args.verify_deps,
+        "archs": parse_arch_option(args.arch),
+        "max_memory": _megabytes(args.max_memory),
+        "max_disk": _megabytes(args.max_disk),
+        "resume": args.resume,
+    }
+    results = process_batch(sdk_zips, args.output_dir, args.batch_jobs, options)
+    print_batch_summary(results)
+    
+    if args.metrics_table:
+        for result in results:
+            if result.metrics:
+                print(f"\n📈 {result.sdk_zip.name} 各阶段度量")
+                print(format_metrics_table(result.metrics))
+    if args.metrics_out:
+        report = [dict(result.metrics or {}, sdk_zip=str(result.sdk_zip)) for result in results]
+        with open(args.metrics_out, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"📈 度量结果已写入: {args.metrics_out}")
+    return 0 if all(result.success for result in results) else 1
+
 def main():
     """主函数"""
     parser = argparse.ArgumentParser(description="Agora SDK 自动化处理工具")
-    parser.add_argument("sdk_zip", help="SDK zip文件路径")
+    parser.add_argument("sdk_zip", nargs="+", help="SDK zip文件路径；传入多个文件、目录或通配符时进入批量模式")
     parser.add_argument("--sdk-dir", default="agora_sdk", help="输出SDK目录")
     parser.add_argument("--aed-dir", default="aed", help="AED文件目录")
     parser.add_argument("--output-dir", help="zip包输出目录")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="并行转换framework的任务数（默认1，即串行）")
+    parser.add_argument("--stream", action="store_true", help="流式模式：直接从zip读取并转换framework，不解压到磁盘")
+    parser.add_argument("--pipeline", action="store_true", help="流水线模式：在流式模式的基础上，转换、压缩与写入压缩包同时进行")
+    parser.add_argument("--max-memory", type=int,
+                        help="低占用模式：转换中的framework占用内存的上限（MB），超过的大文件改为在临时文件中转换")
+    parser.add_argument("--max-disk", type=int,
+                        help="低占用模式：临时文件占用磁盘的上限（MB，不含输出的压缩包）")
+    parser.add_argument("--cache-dir", help="转换缓存目录（默认 ~/.cache/framework_to_dylib）")
+    parser.add_argument("--cache-max-size", type=int, default=2048, help="转换缓存大小上限（MB，默认2048）")
+    parser.add_argument("--no-cache", action="store_true", help="不使用转换缓存")
+    parser.add_argument("--batch-jobs", type=int, default=2, help="批量模式下同时处理的SDK数量（默认2）")
+    parser.add_argument("--compress-level", type=int, default=DEFAULT_LEVEL, choices=range(10),
+                        metavar="0-9", help=f"zlib压缩级别（默认{DEFAULT_LEVEL}）")
+    parser.add_argument("--compress-jobs", type=int, help="并行压缩的线程数（默认使用全部CPU）")
+    parser.add_argument("--store-compressed", action="store_true", help="嵌套zip、图片等已压缩的内容直接存储，不再压缩")
+    parser.add_argument("--verify-deps", action="store_true", help="生成压缩包后检查dylib依赖图（未解析的@rpath、循环依赖等）")
+    parser.add_argument("--arch", default=UNIVERSAL,
+                        help="输出架构：universal（默认，保持通用二进制）、单个架构如 arm64、"
+                             "逗号分隔的多个架构或 split（arm64与x86_64各生成一组压缩包）")
+    parser.add_argument("--resume", action="store_true",
+                        help="断点续传：从上次失败或中断的处理（解压模式下总会保留断点）继续，不必在失败的那次运行中指定")
+    parser.add_argument("--full-rebuild", action="store_true", help="忽略上次的构建清单，完整重新处理")
+    parser.add_argument("--metrics-out", help="把各阶段的耗时、CPU、读写字节数与峰值内存写入JSON文件")
+    parser.add_argument("--metrics-table", action="store_true", help="处理结束后输出各阶段度量表格")
     
     args = parser.parse_args()
+    try:
+        archs = parse_arch_option(args.arch)
+    except ValueError as e:
+        parser.error(str(e))
     
-    # 检查输入文件
-    if not os.path.exists(args.sdk_zip):
-        print(f"❌ 错误: SDK文件不存在: {args.sdk_zip}")
-        sys.exit(1)
+    # 单个文件以外的输入（多个文件、目录、通配符）进入批量模式
+    if len(args.sdk_zip) > 1 or not os.path.isfile(args.sdk_zip[0]):
+        sys.exit(_batch_main(args))
+    sdk_zip = args.sdk_zip[0]
     
     # 创建处理器并处理
-    processor = AgoraSDKProcessor(args.sdk_dir, args.aed_dir, args.output_dir)
-    success = processor.process_sdk(args.sdk_zip)
+    cache = None
+    if not args.no_cache:
+        cache = ConversionCache(args.cache_dir, max_bytes=args.cache_max_size * 1024 * 1024)
+    metrics = MetricsRecorder()
+    success, _ = process_sdk_archs(sdk_zip, archs, metrics=metrics, sdk_dir=args.sdk_dir,
+                                   aed_dir=args.aed_dir, output_dir=args.output_dir,
+                                   jobs=args.jobs, stream=args.stream, cache=cache,
+                                   pipeline=args.pipeline,
+                                   max_memory=_megabytes(args.max_memory),
+                                   max_disk=_megabytes(args.max_disk),
+                                   resume=args.resume,
+                                   incremental=not args.full_rebuild,
+                                   compress_level=args.compress_level,
+                                   compress_jobs=args.compress_jobs,
+                                   store_compressed=args.store_compressed,
+                                   verify_deps=args.verify_deps)
+    
+    if args.metrics_table:
+        print("\n📈 各阶段度量")
+        print(metrics.format_table())
+    if args.metrics_out:
+        metrics.write_json(args.metrics_out)
+        print(f"📈 度量结果已写入: {args.metrics_out}")
     
     if success:
         print("🎉 处理成功完成!")
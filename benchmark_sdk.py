@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SDK处理性能基准
+生成合成的Agora SDK zip，多次运行完整处理流程并统计总耗时与各阶段耗时，
+结果写入JSON，可与其他提交的结果对比以发现性能回退（Linux下无需Xcode即可运行）
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from auto_process_sdk import AgoraSDKProcessor
+from macho_fixtures import build_dylib, make_body, write_sdk_zip
+from sdk_metrics import MetricsRecorder
+
+BENCH_ZIP_NAME = "Agora_Native_SDK_for_Mac_v4.4.30_BENCH.zip"
+
+
+def git_commit():
+    """当前提交的哈希，不在git仓库中时返回None"""
+    try:
+        result = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                                cwd=Path(__file__).parent, check=True)
+        return result.stdout.strip()
+    except (subprocess.CalledProcessError, OSError):
+        return None
+
+
+def _stage_key(name):
+    """把 convert:<framework> 合并为 convert:*，便于不同规模的结果互相比较"""
+    return "convert:*" if name.startswith("convert:") else name
+
+
+def run_once(sdk_zip, aed_dir, work_dir, mode, jobs, compress_jobs=None):
+    """
+    运行一次完整处理流程
+
+    Returns:
+        dict: {"total": 秒, "stages": {阶段: 秒}}
+    """
+    output_dir = Path(work_dir) / "out"
+    shutil.rmtree(output_dir, ignore_errors=True)
+    output_dir.mkdir(parents=True)
+
+    metrics = MetricsRecorder()
+    processor = AgoraSDKProcessor("agora_sdk", aed_dir, output_dir, jobs=jobs,
+                                  stream=(mode != "extract"), pipeline=(mode == "pipeline"),
+                                  cache=None, work_dir=work_dir,
+                                  metrics=metrics, incremental=False,
+                                  compress_jobs=compress_jobs)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()) as log:
+        success = processor.process_sdk(str(sdk_zip))
+    total = time.perf_counter() - start
+    if not success:
+        raise RuntimeError(f"{mode} 模式处理失败:\n{log.getvalue()}")
+
+    stages = {}
+    for stage in metrics.to_dict()["stages"]:
+        key = _stage_key(stage["name"])
+        stages[key] = stages.get(key, 0.0) + stage["wall_time"]
+    return {"total": total, "stages": stages}
+
+
+def run_benchmark(frameworks=8, size_mb=16.0, archs=("arm64", "x86_64"), modes=("extract",),
+                  jobs=1, runs=3, work_root=None, compress_jobs=None):
+    """
+    生成合成SDK并运行基准
+
+    Args:
+        frameworks: framework数量
+        size_mb: 每个framework动态库的大小（MB，所有架构合计）
+        modes: 要测试的处理模式（"extract" 解压模式 / "stream" 流式模式 / "pipeline" 流水线模式）
+        runs: 每种模式运行次数，结果取中位数
+
+    Returns:
+        dict: 基准结果
+    """
+    work_root = Path(tempfile.mkdtemp(prefix="sdk_bench_", dir=work_root))
+    try:
+        names = [f"AgoraBench{i:02d}Kit" for i in range(frameworks)]
+        body_size = max(1, int(size_mb * 1024 * 1024 / len(archs)))
+        sdk_zip = work_root / BENCH_ZIP_NAME
+        start = time.perf_counter()
+        input_bytes = write_sdk_zip(sdk_zip, names, body_size, archs)
+        # AED目录中放一个dylib，使AED压缩包也参与计时
+        aed_dir = work_root / "aed"
+        aed_dir.mkdir()
+        (aed_dir / "libAgoraBenchAed.dylib").write_bytes(
+            build_dylib("@rpath/libAgoraBenchAed.dylib", body=make_body(body_size)))
+        print(f"🧪 生成合成SDK: {frameworks} 个framework，共 {input_bytes / 1024 / 1024:.1f} MB "
+              f"({time.perf_counter() - start:.1f}s)")
+
+        results = {}
+        for mode in modes:
+            samples = []
+            for i in range(runs):
+                sample = run_once(sdk_zip, aed_dir, work_root / mode, mode, jobs, compress_jobs)
+                samples.append(sample)
+                print(f"  ⏱️  {mode} #{i + 1}: {sample['total']:.3f}s")
+            stage_names = list(dict.fromkeys(name for s in samples for name in s["stages"]))
+            totals = [s["total"] for s in samples]
+            results[mode] = {
+                "total": statistics.median(totals),
+                "min": min(totals),
+                "max": max(totals),
+                "throughput_mb_s": input_bytes / 1024 / 1024 / statistics.median(totals),
+                "stages": {name: statistics.median(s["stages"].get(name, 0.0) for s in samples)
+                           for name in stage_names},
+            }
+
+        return {
+            "commit": git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "config": {"frameworks": frameworks, "size_mb": size_mb, "archs": list(archs),
+                       "jobs": jobs, "compress_jobs": compress_jobs, "runs": runs, "input_bytes": input_bytes},
+            "results": results,
+        }
+    finally:
+        shutil.rmtree(work_root, ignore_errors=True)
+
+
+def print_report(report):
+    """输出基准结果"""
+    commit = (report.get("commit") or "unknown")[:10]
+    print(f"\n📊 基准结果（提交 {commit}）")
+    print("=" * 60)
+    for mode, result in report["results"].items():
+        print(f"{mode}: {result['total']:.3f}s（{result['throughput_mb_s']:.1f} MB/s，"
+              f"最小 {result['min']:.3f}s，最大 {result['max']:.3f}s）")
+        for name, seconds in result["stages"].items():
+            print(f"    {name:<20}{seconds:>10.3f}s")
+
+
+def compare_reports(baseline, current, threshold=0.10):
+    """
+    与基准结果对比
+
+    Args:
+        threshold: 总耗时变慢超过该比例视为性能回退
+
+    Returns:
+        bool: 是否没有性能回退
+    """
+    if baseline.get("config") != current.get("config"):
+        print("⚠️  两次基准的配置不同，对比结果仅供参考")
+    base_commit = (baseline.get("commit") or "unknown")[:10]
+    print(f"\n🔍 与提交 {base_commit} 对比（回退阈值 {threshold:.0%}）")
+    print("=" * 60)
+    ok = True
+    for mode, result in current["results"].items():
+        base = baseline.get("results", {}).get(mode)
+        if base is None:
+            print(f"{mode}: 基准中没有该模式")
+            continue
+        change = result["total"] / base["total"] - 1 if base["total"] else 0.0
+        regressed = change > threshold
+        ok = ok and not regressed
+        status = "❌" if regressed else "✅"
+        print(f"{status} {mode}: {base['total']:.3f}s -> {result['total']:.3f}s ({change:+.1%})")
+        for name, seconds in result["stages"].items():
+            before = base["stages"].get(name)
+            if before:
+                print(f"    {name:<20}{before:>10.3f}s -> {seconds:.3f}s "
+                      f"({seconds / before - 1:+.1%})")
+    return ok
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="Agora SDK 处理性能基准")
+    parser.add_argument("--frameworks", type=int, default=8, help="合成SDK中的framework数量（默认8）")
+    parser.add_argument("--size", type=float, default=16.0, help="每个framework动态库的大小（MB，默认16）")
+    parser.add_argument("--archs", default="arm64,x86_64", help="架构列表，逗号分隔（默认 arm64,x86_64）")
+    parser.add_argument("--modes", default="extract,stream,pipeline", help="处理模式，逗号分隔（extract、stream、pipeline）")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="并行转换framework的任务数")
+    parser.add_argument("--compress-jobs", type=int, help="并行压缩的线程数（默认使用全部CPU）")
+    parser.add_argument("--runs", type=int, default=3, help="每种模式运行次数（取中位数，默认3）")
+    parser.add_argument("--work-dir", help="存放合成SDK与输出的临时目录位置")
+    parser.add_argument("--output", help="把结果写入JSON文件")
+    parser.add_argument("--compare", help="与之前保存的JSON结果对比")
+    parser.add_argument("--threshold", type=float, default=0.10, help="性能回退阈值（默认0.10，即慢10%%）")
+
+    args = parser.parse_args()
+
+    report = run_benchmark(args.frameworks, args.size, tuple(args.archs.split(",")),
+                           tuple(args.modes.split(",")), args.jobs, args.runs, args.work_dir,
+                           args.compress_jobs)
+    print_report(report)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"💾 结果已写入: {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if not compare_reports(baseline, report, args.threshold):
+            print("❌ 检测到性能回退")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+断点续传日志模块
+解压模式下每完成一个阶段（解压、标准压缩包）或一个framework的转换就写入日志，
+处理失败或进程被终止后使用 --resume 再次运行时，从第一个未完成的单元继续，
+不再重新解压与转换
+"""
+
+import json
+import threading
+from pathlib import Path
+
+from build_manifest import file_signature, write_json_atomic
+
+# 日志结构变化时递增，旧日志会被忽略
+JOURNAL_VERSION = 1
+
+
+def journal_path(sdk_dir):
+    """日志文件路径，放在转换输出目录旁边，例如 .agora_sdk.journal.json"""
+    sdk_dir = Path(sdk_dir)
+    return sdk_dir.parent / f".{sdk_dir.name}.journal.json"
+
+
+def journal_key(sdk_zip_path, params):
+    """
+    日志对应的输入：源zip的文件名、大小、修改时间与影响输出的参数，任一项变化时日志失效
+    """
+    key = {"source": Path(sdk_zip_path).name, "params": dict(params)}
+    key.update(file_signature(sdk_zip_path))
+    return key
+
+
+class BuildJournal:
+    """一次处理中已经完成的单元"""
+
+    def __init__(self, path, key):
+        self.path = Path(path)
+        self.key = key
+        # 已完成的阶段，例如 ["extract"]
+        self.stages = []
+        # 已转换的framework {lib_name: {"sha256": 转换后dylib哈希}}
+        self.frameworks = {}
+        # 已生成的压缩包 {文件名: 构建清单中的记录 {"size", "mtime_ns", "sha256"}}
+        self.outputs = {}
+        # 并行转换时多个线程同时记录
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path, key):
+        """读取日志，文件不存在、损坏、版本不符或输入已变化时返回None"""
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != JOURNAL_VERSION or data.get("key") != key:
+                return None
+            journal = cls(path, key)
+            journal.stages = data["stages"]
+            journal.frameworks = data["frameworks"]
+            journal.outputs = data["outputs"]
+            return journal
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def save(self):
+        with self._lock:
+            self._save()
+
+    def _save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        write_json_atomic(self.path, {
+            "version": JOURNAL_VERSION,
+            "key": self.key,
+            "stages": self.stages,
+            "frameworks": self.frameworks,
+            "outputs": self.outputs,
+        })
+
+    def stage_done(self, name):
+        return name in self.stages
+
+    def complete_stage(self, name):
+        """记录完成的阶段并立即写入"""
+        with self._lock:
+            if name not in self.stages:
+                self.stages.append(name)
+            self._save()
+
+    def complete_framework(self, lib_name, sha256):
+        """记录转换完成的framework并立即写入"""
+        with self._lock:
+            self.frameworks[lib_name] = {"sha256": sha256}
+            self._save()
+
+    def complete_output(self, name, record):
+        """记录生成完成的压缩包并立即写入"""
+        with self._lock:
+            self.outputs[name] = dict(record)
+            self._save()
+
+    def remove(self):
+        """处理成功后删除日志"""
+        if self.path.exists():
+            self.path.unlink()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+构建清单模块
+在输出目录中记录每次处理的输入（framework成员CRC、AED文件哈希）与产物
+（转换后dylib的哈希、压缩包摘要），再次处理同一SDK时只重做输入发生变化的部分
+"""
+
+import json
+import os
+import stat
+import tempfile
+import threading
+from pathlib import Path
+
+from conversion_cache import hash_file
+
+# 清单结构或输出格式变化时递增，旧清单会被忽略
+MANIFEST_VERSION = 1
+
+# 进程的umask，第一次写入时读取
+_umask = None
+_umask_lock = threading.Lock()
+
+
+def _process_umask():
+    """
+    读取进程的umask
+
+    Linux下从 /proc/self/status 读取，不改变umask；其他平台只能通过设置umask来读取，
+    在锁内只做一次，临时值用常见的022而不是0，避免其他线程恰好创建出所有人可写的文件
+    """
+    global _umask
+    with _umask_lock:
+        if _umask is None:
+            try:
+                with open("/proc/self/status", encoding="ascii") as f:
+                    _umask = next(int(line.split()[1], 8) for line in f
+                                  if line.startswith("Umask:"))
+            except (OSError, StopIteration, ValueError, IndexError):
+                _umask = os.umask(0o022)
+                os.umask(_umask)
+        return _umask
+
+
+def manifest_path(output_dir, version_suffix):
+    """清单文件路径，与压缩包放在同一目录，例如 agora_sdk_mac_v4.4.30_xxx.manifest.json"""
+    return Path(output_dir) / f"agora_sdk_mac_{version_suffix}.manifest.json"
+
+
+def file_signature(path):
+    """文件的大小与修改时间，用于快速判断产物是否被改动"""
+    st = os.stat(path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def output_matches(record, zip_path):
+    """压缩包的大小与修改时间是否与记录一致，record为None时返回False"""
+    if record is None:
+        return False
+    try:
+        signature = file_signature(zip_path)
+    except OSError:
+        return False
+    return signature["size"] == record["size"] and signature["mtime_ns"] == record["mtime_ns"]
+
+
+def write_json_atomic(path, data):
+    """
+    先写临时文件再原子替换，写入过程中被中断不会留下不完整的文件
+
+    mkstemp 创建的临时文件权限为0600，替换前改为原文件的权限（新文件按umask），
+    其他用户仍然可以读取清单、日志与索引
+    """
+    path = Path(path)
+    try:
+        mode = stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        mode = 0o666 & ~_process_umask()
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.stem}_", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2, sort_keys=True)
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+class BuildManifest:
+    """一次处理的输入与产物记录"""
+
+    def __init__(self, params=None):
+        # 影响输出内容的参数，不同时清单整体失效
+        self.params = dict(params or {})
+        # 源SDK zip文件名
+        self.source = None
+        # {lib_name: {"member": 成员路径, "crc": CRC, "file_size": 大小, "sha256": 转换后dylib哈希}}
+        self.frameworks = {}
+        # {AED文件名: sha256}
+        self.aed = {}
+        # {压缩包文件名: {"size", "mtime_ns", "sha256"}}
+        self.outputs = {}
+
+    @classmethod
+    def load(cls, path):
+        """读取清单，文件不存在、损坏或版本不符时返回None"""
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != MANIFEST_VERSION:
+                return None
+            manifest = cls(data["params"])
+            manifest.source = data.get("source")
+            manifest.frameworks = data["frameworks"]
+            manifest.aed = data["aed"]
+            manifest.outputs = data["outputs"]
+            return manifest
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def save(self, path):
+        """写入清单（先写临时文件再原子替换）"""
+        data = {
+            "version": MANIFEST_VERSION,
+            "params": self.params,
+            "source": self.source,
+            "frameworks": self.frameworks,
+            "aed": self.aed,
+            "outputs": self.outputs,
+        }
+        write_json_atomic(path, data)
+
+    def add_framework(self, lib_name, info, sha256):
+        """记录framework的源成员（ZipInfo）与转换后dylib的哈希"""
+        self.frameworks[lib_name] = {"member": info.filename, "crc": info.CRC,
+                                     "file_size": info.file_size, "sha256": sha256}
+
+    def framework_unchanged(self, lib_name, info):
+        """源成员的CRC与大小是否与清单一致"""
+        record = self.frameworks.get(lib_name)
+        return (record is not None and record["crc"] == info.CRC and
+                record["file_size"] == info.file_size)
+
+    def add_output(self, zip_path, sha256=None):
+        """记录压缩包摘要，sha256为None时重新计算"""
+        zip_path = Path(zip_path)
+        record = file_signature(zip_path)
+        record["sha256"] = sha256 or hash_file(zip_path)
+        self.outputs[zip_path.name] = record
+
+    def output_unchanged(self, zip_path):
+        """压缩包是否仍是清单记录的那个文件（大小与修改时间一致）"""
+        return output_matches(self.outputs.get(Path(zip_path).name), zip_path)
@@ -1,11 +1,130 @@
+import argparse
+import json
 import os
-import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from dylib_graph import build_graph_from_dir, print_graph_report
+from macho_parser import MachOError, format_version, read_macho
+
+def _format_optional_version(version):
+    return format_version(version) if version is not None else None
+
+def dylib_report(dylib_path):
+    """
+    一次解析dylib，汇总ID、依赖、运行路径、架构、文件类型与最低系统版本
+    （替代 otool -L / otool -D / file / lipo -info 四个子进程）
+
+    Args:
+        dylib_path: dylib文件的路径
+
+    Returns:
+        dict: 可直接序列化为JSON的报告，解析失败时 "error" 不为None
+    """
+    report = {"path": str(dylib_path), "error": None}
+    try:
+        macho = read_macho(dylib_path)
+    except (MachOError, OSError) as e:
+        report["error"] = str(e)
+        return report
+
+    slices = []
+    dependencies = {}
+    for macho_slice in macho.slices:
+        for dylib in macho_slice.dylibs:
+            dependencies.setdefault(dylib.name, {
+                "name": dylib.name,
+                "kind": dylib.kind,
+                "current_version": format_version(dylib.current_version),
+                "compatibility_version": format_version(dylib.compatibility_version),
+            })
+        slices.append({
+            "arch": macho_slice.arch,
+            "offset": macho_slice.offset,
+            "size": macho_slice.size,
+            "filetype": macho_slice.filetype_name,
+            "platform": macho_slice.platform,
+            "min_os": _format_optional_version(macho_slice.min_os),
+            "sdk": _format_optional_version(macho_slice.sdk),
+            "id": macho_slice.id,
+            "dependencies": macho_slice.dependencies,
+            "rpaths": macho_slice.rpaths,
+        })
+
+    first = slices[0]
+    report.update({
+        "fat": macho.is_fat,
+        "id": macho.id,
+        "filetype": first["filetype"],
+        "platform": first["platform"],
+        "min_os": first["min_os"],
+        "archs": macho.archs,
+        "dependencies": list(dependencies.values()),
+        "rpaths": macho.rpaths,
+        "slices": slices,
+    })
+    return report
+
+def collect_reports(dylib_paths, jobs=None):
+    """并行生成多个dylib的报告（结果顺序与输入一致）"""
+    if len(dylib_paths) <= 1:
+        return [dylib_report(path) for path in dylib_paths]
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count() or 1) as executor:
+        return list(executor.map(dylib_report, dylib_paths))
+
+def print_dylib_report(report):
+    """按原来的文本格式输出单个dylib的报告"""
+    dylib_path = report["path"]
+    print(f"=== 分析dylib依赖: {dylib_path} ===\n")
+
+    if report["error"]:
+        print(f"错误: 无法分析dylib文件: {report['error']}")
+        return False
+
+    print("依赖列表:")
+    print("-" * 50)
+
+    first = report["slices"][0]
+    if first["id"]:
+        print(f"自身ID: {first['id']}")
+    for i, dylib in enumerate(report["dependencies"], 1):
+        print(f"依赖 {i}: {dylib['name']} (compatibility version {dylib['compatibility_version']}, "
+              f"current version {dylib['current_version']})")
+    for rpath in report["rpaths"]:
+        print(f"运行路径: {rpath}")
+
+    print("\n" + "=" * 50)
+
+    print("动态库ID:")
+    print("-" * 20)
+    print(report["id"] or "无法获取动态库ID")
+
+    print("\n" + "=" * 50)
+
+    print("文件信息:")
+    print("-" * 20)
+    kind = f"universal binary with {len(report['slices'])} architectures" if report["fat"] else "Mach-O"
+    print(f"{dylib_path}: {kind}")
+    for macho_slice in report["slices"]:
+        min_os = (f", {macho_slice['platform']} {macho_slice['min_os']}+"
+                  if macho_slice["min_os"] else "")
+        print(f"  {macho_slice['arch']}: {macho_slice['filetype']}{min_os}")
+
+    print("\n" + "=" * 50)
+
+    print("架构信息:")
+    print("-" * 20)
+    if report["fat"]:
+        print(f"Architectures in the fat file: {dylib_path} are: {' '.join(report['archs'])}")
+    else:
+        print(f"Non-fat file: {dylib_path} is architecture: {report['archs'][0]}")
+
+    return True
 
 def check_dylib_dependencies(dylib_path):
     """
     查看dylib文件的依赖关系
-    
+
     Args:
         dylib_path: dylib文件的路径
     """
@@ -13,120 +132,107 @@ def check_dylib_dependencies(dylib_path):
     if not os.path.exists(dylib_path):
         print(f"错误: 文件不存在: {dylib_path}")
         return False
-    
+
     # 检查是否为dylib文件
     if not dylib_path.endswith(".dylib"):
         print(f"警告: 文件不是dylib格式: {dylib_path}")
-    
-    print(f"=== 分析dylib依赖: {dylib_path} ===\n")
-    
-    try:
-        # 使用otool -L查看依赖
-        rpaths_output = subprocess.check_output(["otool", "-L", dylib_path])
-        dependencies = rpaths_output.decode("utf-8").split("\n")
-        
-        print("依赖列表:")
-        print("-" * 50)
-        
-        for i, dep in enumerate(dependencies):
-            dep_stripped = dep.strip()
-            if dep_stripped and not dep_stripped.startswith(dylib_path):
-                # 跳过文件自身的引用
-                if i == 0:
-                    print(f"自身ID: {dep_stripped}")
-                else:
-                    print(f"依赖 {i}: {dep_stripped}")
-        
-        print("\n" + "=" * 50)
-        
-        # 使用otool -D查看动态库ID
-        try:
-            id_output = subprocess.check_output(["otool", "-D", dylib_path])
-            print("动态库ID:")
-            print("-" * 20)
-            print(id_output.decode("utf-8").strip())
-        except subprocess.CalledProcessError:
-            print("无法获取动态库ID")
-        
-        print("\n" + "=" * 50)
-        
-        # 使用file命令查看文件信息
-        try:
-            file_output = subprocess.check_output(["file", dylib_path])
-            print("文件信息:")
-            print("-" * 20)
-            print(file_output.decode("utf-8").strip())
-        except subprocess.CalledProcessError:
-            print("无法获取文件信息")
-        
-        print("\n" + "=" * 50)
-        
-        # 使用lipo -info查看架构信息
-        try:
-            lipo_output = subprocess.check_output(["lipo", "-info", dylib_path])
-            print("架构信息:")
-            print("-" * 20)
-            print(lipo_output.decode("utf-8").strip())
-        except subprocess.CalledProcessError:
-            print("无法获取架构信息")
-        
-        return True
-        
-    except subprocess.CalledProcessError as e:
-        print(f"错误: 无法分析dylib文件: {e}")
-        return False
 
-def check_multiple_dylibs(directory_path):
+    # 直接解析加载命令（替代 otool -L / otool -D / file / lipo -info）
+    return print_dylib_report(dylib_report(dylib_path))
+
+def _list_dylibs(directory_path):
+    return sorted(os.path.join(directory_path, file_name)
+                  for file_name in os.listdir(directory_path) if file_name.endswith(".dylib"))
+
+def check_multiple_dylibs(directory_path, jobs=None):
     """
     批量检查目录中所有dylib文件的依赖
-    
+
     Args:
         directory_path: 包含dylib文件的目录路径
+        jobs: 并行解析的线程数，None 表示使用全部CPU
     """
     if not os.path.exists(directory_path):
         print(f"错误: 目录不存在: {directory_path}")
         return False
-    
+
     if not os.path.isdir(directory_path):
         print(f"错误: 路径不是目录: {directory_path}")
         return False
-    
-    dylib_files = []
-    for file_name in os.listdir(directory_path):
-        if file_name.endswith(".dylib"):
-            dylib_files.append(os.path.join(directory_path, file_name))
-    
+
+    dylib_files = _list_dylibs(directory_path)
+
     if not dylib_files:
         print(f"在目录中没有找到dylib文件: {directory_path}")
         return False
-    
+
     print(f"找到 {len(dylib_files)} 个dylib文件\n")
-    
-    for dylib_file in dylib_files:
+
+    ok = True
+    for report in collect_reports(dylib_files, jobs):
         print(f"\n{'='*60}")
-        check_dylib_dependencies(dylib_file)
+        ok = print_dylib_report(report) and ok
         print(f"{'='*60}\n")
 
+    # 汇总目录内dylib之间的依赖关系
+    return print_graph_report(build_graph_from_dir(directory_path, jobs)) and ok
+
+def json_report(path, jobs=None):
+    """
+    生成供发布工具直接使用的JSON报告
+
+    Args:
+        path: dylib文件或目录
+        jobs: 并行解析的线程数
+
+    Returns:
+        dict: {"ok", "files": [每个dylib的报告], "graph": 目录内的依赖图（仅目录）}
+    """
+    if os.path.isdir(path):
+        files = collect_reports(_list_dylibs(path), jobs)
+        graph = build_graph_from_dir(path, jobs).to_dict()
+        # 节点信息已包含在files中
+        graph.pop("nodes")
+        ok = graph["ok"] and all(report["error"] is None for report in files)
+        return {"ok": ok, "files": files, "graph": graph}
+    report = dylib_report(path)
+    return {"ok": report["error"] is None, "files": [report], "graph": None}
+
 def main():
-    if len(sys.argv) < 2:
-        print("用法:")
-        print("  查看单个dylib: python check_dylib_dependencies.py <dylib_path>")
-        print("  批量查看目录: python check_dylib_dependencies.py -d <directory_path>")
-        print("\n示例:")
-        print("  python check_dylib_dependencies.py ./libAgoraRtcKit.dylib")
-        print("  python check_dylib_dependencies.py -d ./agora_sdk")
+    parser = argparse.ArgumentParser(
+        description="查看dylib的依赖关系",
+        epilog="示例:\n"
+               "  python check_dylib_dependencies.py ./libAgoraRtcKit.dylib\n"
+               "  python check_dylib_dependencies.py -d ./agora_sdk\n"
+               "  python check_dylib_dependencies.py -d ./agora_sdk --json > report.json",
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("dylib_path", nargs="?", help="单个dylib文件")
+    parser.add_argument("-d", "--directory", help="批量查看目录中的所有dylib")
+    parser.add_argument("--json", action="store_true", help="以JSON格式输出（ID、依赖、运行路径、架构、文件类型、最低系统版本）")
+    parser.add_argument("-j", "--jobs", type=int, help="批量查看时并行解析的线程数（默认使用全部CPU）")
+    args = parser.parse_args()
+
+    path = args.directory or args.dylib_path
+    if not path or (args.directory and args.dylib_path):
+        parser.print_help()
         sys.exit(1)
-    
-    if sys.argv[1] == "-d" and len(sys.argv) == 3:
+
+    if args.json:
+        if not os.path.exists(path):
+            print(f"错误: 路径不存在: {path}", file=sys.stderr)
+            sys.exit(1)
+        report = json_report(path, args.jobs)
+        json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+        ok = report["ok"]
+    elif args.directory:
         # 批量检查目录
-        directory_path = sys.argv[2]
-        check_multiple_dylibs(directory_path)
-    elif len(sys.argv) == 2:
-        # 检查单个文件
-        dylib_path = sys.argv[1]
-        check_dylib_dependencies(dylib_path)
+        ok = check_multiple_dylibs(args.directory, args.jobs)
     else:
-        print("参数错误，请检查用法")
+        # 检查单个文件
+        ok = check_dylib_dependencies(args.dylib_path)
+
+    if not ok:
         sys.exit(1)
 
 if __name__ == "__main__":
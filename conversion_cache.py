@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+framework转换缓存模块
+以 源动态库内容的SHA-256 + 改写参数 为键保存转换后的dylib，
+命中时直接硬链接或复制缓存文件，跳过复制与install name改写；
+缓存按最近使用时间（LRU）淘汰，总大小不超过上限
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+from fast_copy import copy_file
+
+# 改写逻辑变化时递增，使旧缓存全部失效
+CACHE_FORMAT_VERSION = 1
+DEFAULT_MAX_BYTES = 2 * 1024 * 1024 * 1024
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def default_cache_dir():
+    """默认缓存目录：$XDG_CACHE_HOME/framework_to_dylib 或 ~/.cache/framework_to_dylib"""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return Path(base) / "framework_to_dylib"
+
+
+def hash_file(path):
+    """计算文件内容的SHA-256"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(HASH_CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hash_bytes(data):
+    """计算内存数据的SHA-256"""
+    return hashlib.sha256(data).hexdigest()
+
+
+class ConversionCache:
+    """内容寻址的转换结果缓存"""
+
+    def __init__(self, root=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.root = Path(root) if root else default_cache_dir()
+        self.objects_dir = self.root / "objects"
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def make_key(self, source_digest, **params):
+        """
+        生成缓存键
+
+        Args:
+            source_digest: 源动态库的SHA-256
+            **params: 影响转换结果的参数，例如 lib_name
+
+        Returns:
+            str: 缓存键（十六进制）
+        """
+        payload = json.dumps({"version": CACHE_FORMAT_VERSION, "source": source_digest,
+                              "params": params}, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return self.objects_dir / key[:2] / f"{key}.dylib"
+
+    def lookup(self, key):
+        """查找缓存文件，命中时更新其使用时间并返回路径"""
+        path = self._path(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def fetch(self, key, dest, link=False):
+        """
+        把缓存的转换结果放到dest
+
+        Args:
+            key: 缓存键
+            dest: 目标文件路径
+            link: 是否优先使用硬链接（目标文件之后不能被原地修改）
+
+        Returns:
+            bool: 是否命中
+        """
+        path = self.lookup(key)
+        if path is None:
+            return False
+        try:
+            # 依次尝试 reflink、硬链接（link=True时）、内核内复制
+            copy_file(path, dest, link=link, copy_stat=False)
+            return True
+        except FileNotFoundError:
+            # 缓存文件恰好被其他进程淘汰
+            return False
+
+    def store(self, key, src):
+        """把转换好的文件复制进缓存（先写临时文件再原子替换）"""
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        os.close(fd)
+        try:
+            copy_file(src, tmp_path, copy_stat=False)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        self.evict()
+
+    def _entries(self):
+        entries = []
+        if not self.objects_dir.exists():
+            return entries
+        for bucket in os.scandir(self.objects_dir):
+            if not bucket.is_dir():
+                continue
+            for entry in os.scandir(bucket.path):
+                if not entry.name.endswith(".dylib"):
+                    continue
+                try:
+                    st = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, entry.path))
+        return entries
+
+    def evict(self):
+        """按最近使用时间淘汰，直到总大小不超过 max_bytes"""
+        with self._lock:
+            entries = self._entries()
+            total = sum(size for _, size, _ in entries)
+            removed = 0
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+                removed += 1
+            return removed
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+dylib依赖图模块
+一次并行扫描目录或zip中的所有dylib，根据 LC_LOAD_DYLIB 等加载命令建立依赖图，
+检查未解析的@rpath引用、循环依赖、未改写的.framework路径以及ID与文件名不一致
+"""
+
+import argparse
+import json
+import os
+import posixpath
+import sys
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from macho_parser import MachOError, parse_macho, read_macho
+
+# 需要在同一目录中找到的相对引用前缀
+RELATIVE_PREFIXES = ("@rpath/", "@loader_path/", "@executable_path/")
+
+
+class DylibNode:
+    """依赖图中的一个dylib"""
+
+    def __init__(self, name, path):
+        # 文件名，例如 "libAgoraRtcKit.dylib"
+        self.name = name
+        # 目录中的文件路径或zip中的成员路径
+        self.path = path
+        self.id = None
+        self.archs = []
+        # [(install name, 依赖类型)]，所有架构去重
+        self.dependencies = []
+        self.rpaths = []
+        # 解析失败时的错误信息
+        self.error = None
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "path": str(self.path),
+            "id": self.id,
+            "archs": self.archs,
+            "dependencies": [{"name": name, "kind": kind} for name, kind in self.dependencies],
+            "rpaths": self.rpaths,
+            "error": self.error,
+        }
+
+
+def _node_from_macho(name, path, macho):
+    node = DylibNode(name, path)
+    node.id = macho.id
+    node.archs = macho.archs
+    node.rpaths = macho.rpaths
+    seen = set()
+    for macho_slice in macho.slices:
+        for dylib in macho_slice.dylibs:
+            if dylib.name not in seen:
+                seen.add(dylib.name)
+                node.dependencies.append((dylib.name, dylib.kind))
+    return node
+
+
+class DylibGraph:
+    """dylib依赖图与检查结果"""
+
+    def __init__(self, nodes, source=None):
+        self.source = source
+        # {文件名: DylibNode}
+        self.nodes = {node.name: node for node in nodes}
+        # {文件名: [依赖的文件名]}，只包含图中的节点
+        self.edges = {}
+        # [(文件名, install name)] 找不到目标的相对引用
+        self.unresolved = []
+        # [(文件名, install name)] 仍指向 .framework 的相对引用
+        self.framework_refs = []
+        # [(文件名, 自身ID)] ID与文件名不一致
+        self.id_mismatches = []
+        # [[文件名, ...]] 循环依赖（不含 LC_LOAD_UPWARD_DYLIB 形成的环）
+        self.cycles = []
+        # 解析失败的文件
+        self.errors = [node for node in nodes if node.error]
+        self._analyze()
+
+    def _analyze(self):
+        cycle_edges = {}
+        for name, node in self.nodes.items():
+            if node.error:
+                continue
+            expected_id = f"@rpath/{name}"
+            if node.id != expected_id:
+                self.id_mismatches.append((name, node.id))
+
+            targets = []
+            for install_name, kind in node.dependencies:
+                if not install_name.startswith(RELATIVE_PREFIXES):
+                    continue  # 系统库等绝对路径
+                if ".framework/" in install_name:
+                    self.framework_refs.append((name, install_name))
+                    continue
+                target = posixpath.basename(install_name)
+                if target == name and install_name == node.id:
+                    continue
+                if target not in self.nodes:
+                    self.unresolved.append((name, install_name))
+                    continue
+                targets.append(target)
+                if kind != "upward":
+                    cycle_edges.setdefault(name, []).append(target)
+            self.edges[name] = targets
+        self.cycles = _find_cycles(self.nodes, cycle_edges)
+
+    @property
+    def ok(self):
+        """没有发现任何问题"""
+        return not (self.errors or self.unresolved or self.framework_refs or
+                    self.id_mismatches or self.cycles)
+
+    def topological_order(self):
+        """按依赖顺序排列（被依赖的在前），存在循环依赖时返回None"""
+        if self.cycles:
+            return None
+        order = []
+        visited = set()
+        for name in sorted(self.nodes):
+            if name in visited:
+                continue
+            visited.add(name)
+            stack = [(name, iter(sorted(self.edges.get(name, []))))]
+            while stack:
+                current, children = stack[-1]
+                child = next(children, None)
+                if child is None:
+                    stack.pop()
+                    order.append(current)
+                elif child not in visited:
+                    visited.add(child)
+                    stack.append((child, iter(sorted(self.edges.get(child, [])))))
+        return order
+
+    def to_dict(self):
+        return {
+            "source": str(self.source) if self.source else None,
+            "ok": self.ok,
+            "nodes": [self.nodes[name].to_dict() for name in sorted(self.nodes)],
+            "edges": {name: targets for name, targets in sorted(self.edges.items())},
+            "order": self.topological_order(),
+            "unresolved": [{"dylib": name, "reference": ref} for name, ref in self.unresolved],
+            "framework_refs": [{"dylib": name, "reference": ref}
+                               for name, ref in self.framework_refs],
+            "id_mismatches": [{"dylib": name, "id": dylib_id}
+                              for name, dylib_id in self.id_mismatches],
+            "cycles": self.cycles,
+            "errors": [{"dylib": node.name, "error": node.error} for node in self.errors],
+        }
+
+
+def _find_cycles(nodes, edges):
+    """Tarjan强连通分量算法（迭代实现），返回包含环的分量"""
+    index = {}
+    lowlink = {}
+    on_stack = set()
+    stack = []
+    cycles = []
+    counter = 0
+
+    for root in sorted(nodes):
+        if root in index:
+            continue
+        work = [(root, iter(edges.get(root, [])))]
+        index[root] = lowlink[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+        while work:
+            node, children = work[-1]
+            child = next(children, None)
+            if child is not None:
+                if child not in index:
+                    index[child] = lowlink[child] = counter
+                    counter += 1
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, iter(edges.get(child, []))))
+                elif child in on_stack:
+                    lowlink[node] = min(lowlink[node], index[child])
+                continue
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                lowlink[parent] = min(lowlink[parent], lowlink[node])
+            if lowlink[node] == index[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == node:
+                        break
+                if len(component) > 1 or node in edges.get(node, []):
+                    cycles.append(sorted(component))
+    return cycles
+
+
+def _scan_file(path):
+    node_name = os.path.basename(path)
+    try:
+        return _node_from_macho(node_name, path, read_macho(path))
+    except (MachOError, OSError) as e:
+        node = DylibNode(node_name, path)
+        node.error = str(e)
+        return node
+
+
+def build_graph_from_dir(directory, jobs=None):
+    """
+    扫描目录中的所有dylib并建立依赖图
+
+    Args:
+        directory: dylib所在目录（不递归）
+        jobs: 并行扫描的线程数，None 表示使用全部CPU
+
+    Returns:
+        DylibGraph: 依赖图
+    """
+    paths = sorted(str(path) for path in Path(directory).glob("*.dylib") if path.is_file())
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count() or 1) as executor:
+        nodes = list(executor.map(_scan_file, paths))
+    return DylibGraph(nodes, directory)
+
+
+def build_graph_from_zip(zip_path, prefix=None, jobs=None):
+    """
+    直接扫描zip中的dylib并建立依赖图（无需解压）
+
+    Args:
+        zip_path: zip文件路径
+        prefix: 只扫描该目录下的dylib，例如 "agora_sdk/"；None 表示全部
+        jobs: 并行扫描的线程数（解压时zlib会释放GIL）
+
+    Returns:
+        DylibGraph: 依赖图
+    """
+    with zipfile.ZipFile(zip_path, "r") as zip_ref:
+        infos = [info for info in zip_ref.infolist()
+                 if info.filename.endswith(".dylib") and not info.is_dir() and
+                 (prefix is None or info.filename.startswith(prefix))]
+
+        def scan(info):
+            name = posixpath.basename(info.filename)
+            try:
+                # ZipFile 支持多线程同时读取不同成员
+                return _node_from_macho(name, info.filename, parse_macho(zip_ref.read(info)))
+            except (MachOError, OSError, zipfile.BadZipFile) as e:
+                node = DylibNode(name, info.filename)
+                node.error = str(e)
+                return node
+
+        with ThreadPoolExecutor(max_workers=jobs or os.cpu_count() or 1) as executor:
+            nodes = list(executor.map(scan, infos))
+    return DylibGraph(nodes, zip_path)
+
+
+def build_graph(path, jobs=None):
+    """根据路径类型扫描目录或zip"""
+    if zipfile.is_zipfile(path) and not os.path.isdir(path):
+        return build_graph_from_zip(path, jobs=jobs)
+    return build_graph_from_dir(path, jobs=jobs)
+
+
+def print_graph_report(graph):
+    """输出依赖图检查结果"""
+    print(f"🔗 依赖图: {len(graph.nodes)} 个dylib, "
+          f"{sum(len(targets) for targets in graph.edges.values())} 条内部依赖")
+    for node in graph.errors:
+        print(f"  ❌ 无法解析: {node.path}: {node.error}")
+    for name, ref in graph.framework_refs:
+        print(f"  ❌ 未改写的framework引用: {name} -> {ref}")
+    for name, ref in graph.unresolved:
+        print(f"  ❌ 未解析的引用: {name} -> {ref}")
+    for name, dylib_id in graph.id_mismatches:
+        print(f"  ❌ ID与文件名不一致: {name} (ID: {dylib_id})")
+    for cycle in graph.cycles:
+        print(f"  ❌ 循环依赖: {' -> '.join(cycle + cycle[:1])}")
+    if graph.ok:
+        print(f"✅ 依赖检查通过，加载顺序: {', '.join(graph.topological_order())}")
+    return graph.ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="检查dylib依赖图")
+    parser.add_argument("path", help="dylib目录或zip文件")
+    parser.add_argument("--json", action="store_true", help="以JSON格式输出")
+    parser.add_argument("-j", "--jobs", type=int, help="并行扫描的线程数")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.path):
+        print(f"错误: 路径不存在: {args.path}")
+        sys.exit(1)
+    graph = build_graph(args.path, args.jobs)
+    if args.json:
+        json.dump(graph.to_dict(), sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    else:
+        print_graph_report(graph)
+    sys.exit(0 if graph.ok else 1)
+
+
+if __name__ == "__main__":
+    main()
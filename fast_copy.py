@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+快速文件复制模块
+依次尝试 reflink克隆（APFS clonefile / Linux FICLONE）、硬链接（仅限之后不会被修改的文件）、
+内核内复制（copy_file_range / sendfile），最后才退回到普通的缓冲复制，
+同一文件系统上复制大文件几乎没有开销
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import shutil
+import stat
+import sys
+
+# linux/fs.h: _IOW(0x94, 9, int)
+FICLONE = 0x40049409
+# 内核内复制每次调用的最大字节数
+_KERNEL_COPY_CHUNK = 1024 * 1024 * 1024
+# 这些错误表示当前文件系统或内核不支持该复制方式，换下一种方式即可
+_UNSUPPORTED_ERRNOS = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.ENOTSUP,
+                       errno.EOPNOTSUPP, errno.ENOTTY, errno.EPERM, errno.EBADF}
+
+_clonefile = None
+if sys.platform == "darwin":
+    try:
+        _libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        _clonefile = _libc.clonefile
+        _clonefile.argtypes = [ctypes.c_char_p, ctypes.c_char_p, ctypes.c_uint32]
+        _clonefile.restype = ctypes.c_int
+    except (OSError, AttributeError):
+        _clonefile = None
+
+
+def _is_unsupported(error):
+    return error.errno in _UNSUPPORTED_ERRNOS
+
+
+def _try_clonefile(src, dst):
+    """macOS：APFS上的 clonefile（目标文件不能已存在）"""
+    if _clonefile is None:
+        return False
+    if _clonefile(os.fsencode(src), os.fsencode(dst), 0) == 0:
+        return True
+    return False
+
+
+def _try_ficlone(src_fd, dst_fd):
+    """Linux：btrfs/XFS等文件系统上的 FICLONE"""
+    if not sys.platform.startswith("linux"):
+        return False
+    try:
+        import fcntl
+        fcntl.ioctl(dst_fd, FICLONE, src_fd)
+        return True
+    except (ImportError, OSError):
+        return False
+
+
+def _try_copy_file_range(src_fd, dst_fd, size, offset=0):
+    if not hasattr(os, "copy_file_range"):
+        return False
+    copied = 0
+    try:
+        while copied < size:
+            n = os.copy_file_range(src_fd, dst_fd, min(size - copied, _KERNEL_COPY_CHUNK),
+                                   offset + copied)
+            if n == 0:
+                break
+            copied += n
+    except OSError as e:
+        if copied == 0 and _is_unsupported(e):
+            return False
+        raise
+    return copied == size
+
+
+def _try_sendfile(src_fd, dst_fd, size, offset=0):
+    # macOS的sendfile只支持套接字
+    if not sys.platform.startswith("linux") or not hasattr(os, "sendfile"):
+        return False
+    copied = 0
+    try:
+        while copied < size:
+            n = os.sendfile(dst_fd, src_fd, offset + copied, min(size - copied, _KERNEL_COPY_CHUNK))
+            if n == 0:
+                break
+            copied += n
+    except OSError as e:
+        if copied == 0 and _is_unsupported(e):
+            return False
+        raise
+    return copied == size
+
+
+def _copy_data(src, dst):
+    """复制文件内容，返回使用的方式"""
+    with open(src, "rb") as fsrc:
+        size = os.fstat(fsrc.fileno()).st_size
+        with open(dst, "wb") as fdst:
+            src_fd, dst_fd = fsrc.fileno(), fdst.fileno()
+            if _try_ficlone(src_fd, dst_fd):
+                return "reflink"
+            if _try_copy_file_range(src_fd, dst_fd, size):
+                return "copy_file_range"
+            # 内核内复制失败时可能已写入部分数据，从头开始
+            fdst.seek(0)
+            fdst.truncate()
+            if _try_sendfile(src_fd, dst_fd, size):
+                return "sendfile"
+            fdst.seek(0)
+            fdst.truncate()
+            fsrc.seek(0)
+            shutil.copyfileobj(fsrc, fdst, 1024 * 1024)
+            return "copy"
+
+
+def copy_file(src, dst, link=False, copy_stat=True):
+    """
+    复制单个文件
+
+    Args:
+        src: 源文件
+        dst: 目标文件，已存在时会被替换
+        link: 目标文件之后不会被修改时允许使用硬链接
+        copy_stat: 是否复制权限与修改时间（与 shutil.copy2 一致）
+
+    Returns:
+        str: 使用的方式（"reflink"、"hardlink"、"copy_file_range"、"sendfile" 或 "copy"）
+    """
+    src, dst = os.fspath(src), os.fspath(dst)
+    if os.path.lexists(dst):
+        os.unlink(dst)
+
+    if _try_clonefile(src, dst):
+        # clonefile 同时保留了权限与时间
+        return "reflink"
+    if link:
+        try:
+            os.link(src, dst)
+            return "hardlink"
+        except OSError as e:
+            if not _is_unsupported(e) and e.errno not in (errno.EMLINK, errno.EACCES):
+                raise
+
+    method = _copy_data(src, dst)
+    if copy_stat:
+        shutil.copystat(src, dst)
+    return method
+
+
+def copy_range(src, dst, offset, size, copy_stat=True):
+    """
+    把源文件中的一段数据复制为新文件，例如从FAT文件中取出单个架构
+
+    Args:
+        src: 源文件
+        dst: 目标文件，已存在时会被替换
+        offset: 数据在源文件中的偏移
+        size: 数据大小
+        copy_stat: 是否复制权限与修改时间
+
+    Returns:
+        str: 使用的方式（"copy_file_range"、"sendfile" 或 "copy"）
+    """
+    src, dst = os.fspath(src), os.fspath(dst)
+    if os.path.lexists(dst):
+        os.unlink(dst)
+
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        src_fd, dst_fd = fsrc.fileno(), fdst.fileno()
+        if _try_copy_file_range(src_fd, dst_fd, size, offset):
+            method = "copy_file_range"
+        else:
+            fdst.seek(0)
+            fdst.truncate()
+            if _try_sendfile(src_fd, dst_fd, size, offset):
+                method = "sendfile"
+            else:
+                fdst.seek(0)
+                fdst.truncate()
+                fsrc.seek(offset)
+                remaining = size
+                while remaining:
+                    chunk = fsrc.read(min(remaining, 1024 * 1024))
+                    if not chunk:
+                        raise OSError(errno.EIO, f"源文件长度不足: {src}")
+                    fdst.write(chunk)
+                    remaining -= len(chunk)
+                method = "copy"
+    if copy_stat:
+        shutil.copystat(src, dst)
+    return method
+
+
+def copy_tree(src, dst, link=False):
+    """
+    复制目录（符号链接保持为符号链接，与 cp -R 一致）
+
+    Args:
+        src: 源目录，例如 xxx.framework
+        dst: 目标目录
+        link: 目标文件之后不会被修改时允许使用硬链接
+
+    Returns:
+        dict: {方式: 文件数}
+    """
+    counts = {}
+    src, dst = os.fspath(src), os.fspath(dst)
+    os.makedirs(dst, exist_ok=True)
+    for root, dirs, files in os.walk(src):
+        rel = os.path.relpath(root, src)
+        target_root = dst if rel == "." else os.path.join(dst, rel)
+        for name in list(dirs):
+            source = os.path.join(root, name)
+            target = os.path.join(target_root, name)
+            if os.path.islink(source):
+                # os.walk 不会进入指向目录的符号链接，这里原样复制链接
+                dirs.remove(name)
+                _copy_symlink(source, target)
+            else:
+                os.makedirs(target, exist_ok=True)
+        for name in files:
+            source = os.path.join(root, name)
+            target = os.path.join(target_root, name)
+            if os.path.islink(source):
+                _copy_symlink(source, target)
+                method = "symlink"
+            elif stat.S_ISREG(os.stat(source).st_mode):
+                method = copy_file(source, target, link=link)
+            else:
+                continue
+            counts[method] = counts.get(method, 0) + 1
+    return counts
+
+
+def _copy_symlink(source, target):
+    if os.path.lexists(target):
+        os.unlink(target)
+    os.symlink(os.readlink(source), target)
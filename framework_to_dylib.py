@@ -1,13 +1,23 @@
 import os
-import subprocess
 
-def convert_xcframework_to_dylib(xcframework_path, lib_name, output_path):
+from conversion_cache import ConversionCache, hash_file
+from fast_copy import copy_file, copy_tree
+from macho_parser import MachOError, read_macho
+from macho_rewriter import dylib_install_names, rewrite_install_names
+from macho_slicer import thin_file
+from xcframework import resolve_framework
+
+def convert_xcframework_to_dylib(xcframework_path, lib_name, output_path, cache=None, arch=None):
+  # arch: 只输出该架构（例如 "arm64"），None 表示保持通用二进制
   # Create the output directory if it doesn't exist
   if not os.path.exists(output_path):
     os.makedirs(output_path, mode=0o755)
 
-  # 动态查找动态库文件
-  framework_path = os.path.join(xcframework_path, "macos-arm64_x86_64", lib_name + ".framework")
+  # 根据 Info.plist 选择macOS slice（指定架构时要求slice包含该架构）
+  framework_path = resolve_framework(xcframework_path, arch=arch)
+  if framework_path is None:
+    print(f"❌ 找不到macOS slice: {xcframework_path}")
+    return False
   lib_path = None
   
   # 尝试多种可能的路径
@@ -34,29 +44,39 @@ def convert_xcframework_to_dylib(xcframework_path, lib_name, output_path):
   out_lib_name = "lib" + lib_name + ".dylib"
   out_lib_path = os.path.join(output_path, out_lib_name)
   
-  # Construct the command to convert xcframework to dylib
-  command = "cp \"{0}\" \"{1}\"".format(lib_path, out_lib_path)
-  print("copy: " + command)
-  result = subprocess.call(command, shell=True)
+  # 命中转换缓存时直接复制缓存结果
+  cache_key = None
+  if cache is not None:
+    params = {"lib_name": lib_name}
+    if arch:
+      params["arch"] = arch
+    cache_key = cache.make_key(hash_file(lib_path), **params)
+    if cache.fetch(cache_key, out_lib_path):
+      print(f"⚡ 命中转换缓存: {lib_name}")
+      return True
   
-  if result != 0:
-    print(f"❌ 复制文件失败: {lib_name}")
+  # 复制动态库（之后会原地改写，不能使用硬链接）；指定架构时只复制该架构的slice
+  try:
+    if arch:
+      method = thin_file(lib_path, out_lib_path, arch)
+      print(f"thin {arch} ({method}): {lib_path} -> {out_lib_path}")
+    else:
+      method = copy_file(lib_path, out_lib_path)
+      print(f"copy ({method}): {lib_path} -> {out_lib_path}")
+  except (OSError, MachOError) as e:
+    print(f"❌ 复制文件失败: {lib_name}: {e}")
     return False
   
-  command = "install_name_tool -id @rpath/{0} {1}".format(out_lib_name, out_lib_path)
-  subprocess.call(command, shell=True)
-
-  # otool -L lib_path
-  rpaths_output = subprocess.check_output(["otool", "-L", out_lib_path])
-  rpaths = rpaths_output.decode("utf-8").split("\n")
-  for rpath in rpaths:
-    rpath_stripped = rpath.strip()
-    if rpath_stripped.startswith("@rpath") and not rpath_stripped.endswith(".dylib"):
-      # @rpath/Agoraffmpeg.framework/Versions/A/Agoraffmpeg (compatibility version 0.0.0, current version 0.0.0)
-      rpath_stripped = rpath_stripped.split(" ")[0]
-      dep_lib = rpath_stripped.split("/")[-1]
-      command = "install_name_tool -change {0} @rpath/lib{1}.dylib {2}".format(rpath_stripped, dep_lib, out_lib_path)
-      subprocess.call(command, shell=True)
+  # 一次性改写动态库ID与依赖的@rpath引用，替代 install_name_tool -id/-change
+  try:
+    new_id, changes = dylib_install_names(read_macho(out_lib_path), lib_name)
+    rewrite_install_names(out_lib_path, new_id, changes)
+  except MachOError as e:
+    print(f"❌ 修改install name失败: {lib_name}: {e}")
+    return False
+  
+  if cache_key is not None:
+    cache.store(cache_key, out_lib_path)
   
   return True
 
@@ -66,15 +86,16 @@ def cp_framework_from_xcframework(xcframework_path, lib_name, output_path):
   if not os.path.exists(output_path):
     os.makedirs(output_path, mode=0o755)
 
-  lib_path = os.path.join(xcframework_path, "macos-arm64_x86_64", lib_name + ".framework")
+  lib_path = resolve_framework(xcframework_path)
+  if lib_path is None:
+    print(f"❌ 找不到macOS slice: {xcframework_path}")
+    return False
   out_lib_path = os.path.join(output_path, lib_name + ".framework")
-  # Construct the command to convert xcframework to dylib
-  command = "cp -r {0} {1}".format(lib_path, out_lib_path)
-
-  # Execute the command
-  subprocess.call(command, shell=True)
+  # 复制出的framework不会再被修改，可以直接使用硬链接
+  copy_tree(lib_path, out_lib_path, link=True)
+  return True
 
-def process_xcframeworks(xcframework_path, output_path):
+def process_xcframeworks(xcframework_path, output_path, cache=None, arch=None):
     """处理指定路径下的所有xcframework文件"""
     # Read the contents of the directory
     for file_name in os.listdir(xcframework_path):
@@ -82,7 +103,7 @@ def process_xcframeworks(xcframework_path, output_path):
         if not file_name.endswith(".xcframework") or os.path.isfile(os.path.join(xcframework_path, file_name)):
             continue
         lib_name = file_name.split(".")[0]
-        convert_xcframework_to_dylib(os.path.join(xcframework_path, file_name), lib_name, output_path)
+        convert_xcframework_to_dylib(os.path.join(xcframework_path, file_name), lib_name, output_path, cache, arch)
 
 # 如果直接运行此脚本，使用默认路径
 if __name__ == "__main__":
@@ -92,4 +113,4 @@ if __name__ == "__main__":
     # Path to the output folder for dylib libraries
     output_path = "./agora_sdk"
     
-    process_xcframeworks(xcframework_path, output_path)
+    process_xcframeworks(xcframework_path, output_path, ConversionCache())
@@ -1,14 +1,19 @@
 import os
-import subprocess
 import sys
 
-def convert_framework_to_dylib(framework_path, output_path):
+from conversion_cache import ConversionCache, hash_file
+from fast_copy import copy_file
+from macho_parser import MachOError, read_macho
+from macho_rewriter import dylib_install_names, rewrite_install_names
+
+def convert_framework_to_dylib(framework_path, output_path, cache=None):
     """
     将单个Framework转换为dylib文件
     
     Args:
         framework_path: Framework的路径，例如 "/path/to/MyFramework.framework"
         output_path: 输出dylib文件的目录路径
+        cache: 可选的 ConversionCache，命中时直接复制缓存结果
     """
     # 检查Framework路径是否存在
     if not os.path.exists(framework_path):
@@ -48,43 +53,35 @@ def convert_framework_to_dylib(framework_path, output_path):
     out_lib_name = f"lib{framework_name}.dylib"
     out_lib_path = os.path.join(output_path, out_lib_name)
     
-    # 复制动态库文件
-    command = f'cp "{lib_path}" "{out_lib_path}"'
-    print(f"复制文件: {command}")
-    result = subprocess.call(command, shell=True)
-    if result != 0:
-        print(f"错误: 复制文件失败")
-        return False
+    # 源动态库与参数相同时直接使用缓存
+    cache_key = None
+    if cache is not None:
+        cache_key = cache.make_key(hash_file(lib_path), lib_name=framework_name)
+        if cache.fetch(cache_key, out_lib_path):
+            print(f"命中转换缓存: {out_lib_path}")
+            return True
     
-    # 修改动态库的ID
-    command = f'install_name_tool -id @rpath/{out_lib_name} "{out_lib_path}"'
-    print(f"修改ID: {command}")
-    result = subprocess.call(command, shell=True)
-    if result != 0:
-        print(f"错误: 修改动态库ID失败")
+    # 复制动态库文件（之后会原地改写，不能使用硬链接）
+    try:
+        method = copy_file(lib_path, out_lib_path)
+        print(f"复制文件 ({method}): {lib_path} -> {out_lib_path}")
+    except OSError as e:
+        print(f"错误: 复制文件失败: {e}")
         return False
     
-    # 处理依赖的@rpath引用
+    # 一次性修改动态库ID与依赖的@rpath引用
     try:
-        rpaths_output = subprocess.check_output(["otool", "-L", out_lib_path])
-        rpaths = rpaths_output.decode("utf-8").split("\n")
-        
-        for rpath in rpaths:
-            rpath_stripped = rpath.strip()
-            if rpath_stripped.startswith("@rpath") and not rpath_stripped.endswith(".dylib"):
-                # 处理类似 @rpath/SomeFramework.framework/Versions/A/SomeFramework 的引用
-                rpath_stripped = rpath_stripped.split(" ")[0]
-                dep_lib = rpath_stripped.split("/")[-1]
-                
-                # 跳过自身的引用
-                if dep_lib == framework_name:
-                    continue
-                    
-                command = f'install_name_tool -change "{rpath_stripped}" @rpath/lib{dep_lib}.dylib "{out_lib_path}"'
-                print(f"修改依赖: {command}")
-                subprocess.call(command, shell=True)
-    except subprocess.CalledProcessError as e:
-        print(f"警告: 获取依赖信息失败: {e}")
+        new_id, changes = dylib_install_names(read_macho(out_lib_path), framework_name)
+        print(f"修改ID: {new_id}")
+        for old_name, new_name in changes.items():
+            print(f"修改依赖: {old_name} -> {new_name}")
+        rewrite_install_names(out_lib_path, new_id, changes)
+    except MachOError as e:
+        print(f"错误: 修改install name失败: {e}")
+        return False
+    
+    if cache_key is not None:
+        cache.store(cache_key, out_lib_path)
     
     print(f"成功转换Framework为dylib: {out_lib_path}")
     return True
@@ -98,7 +95,7 @@ def main():
     framework_path = sys.argv[1]
     output_path = sys.argv[2]
     
-    success = convert_framework_to_dylib(framework_path, output_path)
+    success = convert_framework_to_dylib(framework_path, output_path, ConversionCache())
     if success:
         print("转换完成!")
     else:
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+合成测试数据模块
+生成最小但合法的Mach-O动态库（带@rpath framework依赖）以及
+与Agora Mac SDK目录结构一致的zip，用于测试与性能基准，无需Xcode
+"""
+
+import plistlib
+import random
+import stat
+import struct
+import zipfile
+
+from macho_parser import (CPU_TYPE_ARM64, CPU_TYPE_X86, CPU_TYPE_X86_64, FAT_MAGIC,
+                          LC_BUILD_VERSION, LC_ID_DYLIB, LC_LOAD_DYLIB, LC_RPATH, LC_SEGMENT,
+                          LC_SEGMENT_64, MH_DYLIB, MH_MAGIC, MH_MAGIC_64)
+
+# {架构名: (cputype, cpusubtype)}
+ARCHS = {
+    "arm64": (CPU_TYPE_ARM64, 0),
+    "x86_64": (CPU_TYPE_X86_64, 3),
+    "i386": (CPU_TYPE_X86, 3),
+}
+
+# 第一个section的文件偏移，加载命令必须放得下
+DEFAULT_DATA_OFFSET = 0x4000
+FAT_ALIGN = 14
+# LC_BUILD_VERSION 中的 PLATFORM_MACOS
+PLATFORM_MACOS = 1
+
+
+def _align(value, alignment):
+    return (value + alignment - 1) // alignment * alignment
+
+
+def _dylib_command(cmd, name, byteorder, alignment):
+    raw = name.encode("utf-8") + b"\0"
+    size = _align(24 + len(raw), alignment)
+    return (struct.pack(byteorder + "6I", cmd, size, 24, 2, 0x10000, 0x10000) +
+            raw.ljust(size - 24, b"\0"))
+
+
+def _pack_version(major, minor=0, patch=0):
+    return (major << 16) | (minor << 8) | patch
+
+
+def _rpath_command(path, byteorder, alignment):
+    raw = path.encode("utf-8") + b"\0"
+    size = _align(12 + len(raw), alignment)
+    return struct.pack(byteorder + "3I", LC_RPATH, size, 12) + raw.ljust(size - 12, b"\0")
+
+
+def make_body(size, seed=0):
+    """
+    生成代码段内容：一半随机字节、一半重复片段，压缩率接近真实的动态库
+    """
+    rng = random.Random(seed)
+    chunk = rng.randbytes(4096) + bytes(range(256)) * 16
+    return (chunk * (size // len(chunk) + 1))[:size]
+
+
+def build_dylib(install_name, dependencies=(), rpaths=(), arch="arm64", byteorder="<",
+                body=b"", data_offset=DEFAULT_DATA_OFFSET, min_os=None):
+    """
+    生成单架构的Mach-O动态库
+
+    Args:
+        install_name: LC_ID_DYLIB，None 表示不写入
+        dependencies: 依赖的install name，也可以是 (cmd, name) 指定其他依赖命令
+        rpaths: LC_RPATH 列表
+        arch: "arm64"、"x86_64" 或 "i386"
+        byteorder: "<" 小端 或 ">" 大端
+        body: __TEXT,__text 的内容
+        min_os: 最低macOS版本，例如 (11, 0)，写入 LC_BUILD_VERSION；None 表示不写入
+
+    Returns:
+        bytes: 动态库数据
+    """
+    is_64 = arch in ("arm64", "x86_64")
+    alignment = 8 if is_64 else 4
+    file_size = data_offset + len(body)
+
+    if is_64:
+        segment = struct.pack(byteorder + "2I16s4Q2i2I", LC_SEGMENT_64, 72 + 80, b"__TEXT",
+                              0, _align(file_size, 0x1000), 0, file_size, 5, 5, 1, 0)
+        section = struct.pack(byteorder + "16s16s2Q8I", b"__text", b"__TEXT", data_offset,
+                              len(body), data_offset, 0, 0, 0, 0x80000400, 0, 0, 0)
+    else:
+        segment = struct.pack(byteorder + "2I16s4I2i2I", LC_SEGMENT, 56 + 68, b"__TEXT",
+                              0, _align(file_size, 0x1000), 0, file_size, 5, 5, 1, 0)
+        section = struct.pack(byteorder + "16s16s9I", b"__text", b"__TEXT", data_offset,
+                              len(body), data_offset, 0, 0, 0, 0x80000400, 0, 0)
+    commands = [segment + section]
+    if install_name:
+        commands.append(_dylib_command(LC_ID_DYLIB, install_name, byteorder, alignment))
+    for dependency in dependencies:
+        cmd, name = dependency if isinstance(dependency, tuple) else (LC_LOAD_DYLIB, dependency)
+        commands.append(_dylib_command(cmd, name, byteorder, alignment))
+    for rpath in rpaths:
+        commands.append(_rpath_command(rpath, byteorder, alignment))
+    if min_os:
+        version = _pack_version(*min_os)
+        commands.append(struct.pack(byteorder + "6I", LC_BUILD_VERSION, 24, PLATFORM_MACOS,
+                                    version, version, 0))
+
+    load_commands = b"".join(commands)
+    cputype, cpusubtype = ARCHS[arch]
+    header = struct.pack(byteorder + "7I", MH_MAGIC_64 if is_64 else MH_MAGIC, cputype,
+                         cpusubtype, MH_DYLIB, len(commands), len(load_commands), 0)
+    if is_64:
+        header += b"\0" * 4
+    data = header + load_commands
+    if len(data) > data_offset:
+        raise ValueError(f"加载命令超出 data_offset: {len(data)} > {data_offset}")
+    return data.ljust(data_offset, b"\0") + body
+
+
+def build_fat(slices):
+    """把多个单架构Mach-O合并为FAT（universal）文件"""
+    header = struct.pack(">2I", FAT_MAGIC, len(slices))
+    offset = _align(8 + 20 * len(slices), 1 << FAT_ALIGN)
+    payload = b""
+    for data in slices:
+        byteorder = "<" if struct.unpack_from("<I", data)[0] in (MH_MAGIC, MH_MAGIC_64) else ">"
+        cputype, cpusubtype = struct.unpack_from(byteorder + "2I", data, 4)
+        header += struct.pack(">5I", cputype, cpusubtype, offset + len(payload), len(data),
+                              FAT_ALIGN)
+        payload += data.ljust(_align(len(data), 1 << FAT_ALIGN), b"\0")
+    return header.ljust(offset, b"\0") + payload
+
+
+def framework_install_name(name):
+    """framework风格的install name，例如 @rpath/AgoraRtcKit.framework/Versions/A/AgoraRtcKit"""
+    return f"@rpath/{name}.framework/Versions/A/{name}"
+
+
+def build_framework_binary(name, dependencies=(), archs=("arm64", "x86_64"), body_size=4096,
+                           seed=0):
+    """生成framework中的动态库（依赖同SDK中其他framework，附带系统库依赖）"""
+    deps = [framework_install_name(dep) for dep in dependencies]
+    deps.append("/usr/lib/libSystem.B.dylib")
+    body = make_body(body_size, seed)
+    slices = [build_dylib(framework_install_name(name), deps, ["@loader_path/../Frameworks"],
+                          arch=arch, body=body)
+              for arch in archs]
+    return slices[0] if len(slices) == 1 else build_fat(slices)
+
+
+def _write_symlink(zip_ref, arcname, target):
+    info = zipfile.ZipInfo(arcname)
+    info.external_attr = (stat.S_IFLNK | 0o755) << 16
+    zip_ref.writestr(info, target)
+
+
+def _write_xcframework(zip_ref, path, name, archs, dependencies):
+    """写入xcframework的 Info.plist 与iOS、模拟器slice，返回macOS slice中framework的路径"""
+    macos_id = f"macos-{'_'.join(archs)}"
+    libraries = [
+        {"LibraryIdentifier": macos_id, "LibraryPath": f"{name}.framework",
+         "SupportedArchitectures": list(archs), "SupportedPlatform": "macos"},
+        {"LibraryIdentifier": "ios-arm64", "LibraryPath": f"{name}.framework",
+         "SupportedArchitectures": ["arm64"], "SupportedPlatform": "ios"},
+        {"LibraryIdentifier": "ios-arm64_x86_64-simulator", "LibraryPath": f"{name}.framework",
+         "SupportedArchitectures": ["arm64", "x86_64"], "SupportedPlatform": "ios",
+         "SupportedPlatformVariant": "simulator"},
+    ]
+    zip_ref.writestr(f"{path}/Info.plist", plistlib.dumps(
+        {"AvailableLibraries": libraries, "CFBundlePackageType": "XFWK",
+         "XCFrameworkFormatVersion": "1.0"}))
+    # iOS风格的扁平framework，与macOS slice中的framework同名
+    for library in libraries[1:]:
+        zip_ref.writestr(f"{path}/{library['LibraryIdentifier']}/{name}.framework/{name}",
+                         build_framework_binary(name, dependencies, ("arm64",), 64))
+    return f"{path}/{macos_id}/{name}.framework"
+
+
+def write_sdk_zip(path, framework_names, body_size=4096, archs=("arm64", "x86_64"),
+                  extra_size=0, root="Agora_Native_SDK_for_Mac_FULL", xcframework=False):
+    """
+    生成与Agora Mac SDK结构一致的zip
+
+    Args:
+        path: 输出zip路径，文件名中建议包含版本号，例如
+              Agora_Native_SDK_for_Mac_v4.4.30_BENCH.zip
+        framework_names: framework名称列表，每个framework依赖其前一个framework
+        body_size: 每个架构切片的代码段大小（字节）
+        archs: 架构列表
+        extra_size: 附带的非framework文件（示例代码等）的总大小
+        xcframework: 打包为xcframework（macOS slice之外再附带iOS与模拟器slice）
+
+    Returns:
+        int: 所有framework动态库的总大小（字节）
+    """
+    total = 0
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zip_ref:
+        for index, name in enumerate(framework_names):
+            dependencies = framework_names[max(0, index - 1):index]
+            binary = build_framework_binary(name, dependencies, archs, body_size, seed=index)
+            total += len(binary)
+            base = f"{root}/libs/{name}.framework"
+            if xcframework:
+                base = _write_xcframework(zip_ref, f"{root}/libs/{name}.xcframework", name,
+                                          archs, dependencies)
+            zip_ref.writestr(f"{base}/Versions/A/{name}", binary)
+            zip_ref.writestr(f"{base}/Versions/A/Resources/Info.plist",
+                             f"<plist><dict><key>CFBundleExecutable</key>"
+                             f"<string>{name}</string></dict></plist>")
+            _write_symlink(zip_ref, f"{base}/Versions/Current", "A")
+            _write_symlink(zip_ref, f"{base}/{name}", f"Versions/Current/{name}")
+            _write_symlink(zip_ref, f"{base}/Resources", "Versions/Current/Resources")
+        if extra_size:
+            zip_ref.writestr(f"{root}/samples/README.txt", make_body(extra_size, seed=-1))
+    return total
@@ -0,0 +1,441 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Mach-O 加载命令解析模块
+纯Python实现，直接从内存映射的文件中读取加载命令，不依赖otool/Xcode，
+支持thin与FAT(通用)二进制、32/64位以及大小端
+"""
+
+import mmap
+import struct
+
+# Mach-O 头部魔数
+MH_MAGIC = 0xfeedface
+MH_CIGAM = 0xcefaedfe
+MH_MAGIC_64 = 0xfeedfacf
+MH_CIGAM_64 = 0xcffaedfe
+
+# FAT 头部魔数（FAT头部始终为大端）
+FAT_MAGIC = 0xcafebabe
+FAT_MAGIC_64 = 0xcafebabf
+
+# 加载命令
+LC_REQ_DYLD = 0x80000000
+LC_SEGMENT = 0x1
+LC_LOAD_DYLIB = 0xc
+LC_ID_DYLIB = 0xd
+LC_LOAD_WEAK_DYLIB = 0x18 | LC_REQ_DYLD
+LC_SEGMENT_64 = 0x19
+LC_RPATH = 0x1c | LC_REQ_DYLD
+LC_REEXPORT_DYLIB = 0x1f | LC_REQ_DYLD
+LC_LAZY_LOAD_DYLIB = 0x20
+LC_LOAD_UPWARD_DYLIB = 0x23 | LC_REQ_DYLD
+LC_VERSION_MIN_MACOSX = 0x24
+LC_VERSION_MIN_IPHONEOS = 0x25
+LC_VERSION_MIN_TVOS = 0x2f
+LC_VERSION_MIN_WATCHOS = 0x30
+LC_BUILD_VERSION = 0x32
+
+# 引用其他动态库的加载命令（与 otool -L 列出的依赖一致）
+DEPENDENCY_COMMANDS = {
+    LC_LOAD_DYLIB: "load",
+    LC_LOAD_WEAK_DYLIB: "weak",
+    LC_REEXPORT_DYLIB: "reexport",
+    LC_LAZY_LOAD_DYLIB: "lazy",
+    LC_LOAD_UPWARD_DYLIB: "upward",
+}
+
+# 旧式最低系统版本命令对应的平台
+VERSION_MIN_COMMANDS = {
+    LC_VERSION_MIN_MACOSX: "macos",
+    LC_VERSION_MIN_IPHONEOS: "ios",
+    LC_VERSION_MIN_TVOS: "tvos",
+    LC_VERSION_MIN_WATCHOS: "watchos",
+}
+
+# LC_BUILD_VERSION 中的平台
+PLATFORM_NAMES = {
+    1: "macos",
+    2: "ios",
+    3: "tvos",
+    4: "watchos",
+    5: "bridgeos",
+    6: "maccatalyst",
+    7: "iossimulator",
+    8: "tvossimulator",
+    9: "watchossimulator",
+    10: "driverkit",
+    11: "visionos",
+    12: "visionossimulator",
+}
+
+# 文件类型
+MH_OBJECT = 0x1
+MH_EXECUTE = 0x2
+MH_DYLIB = 0x6
+MH_DYLINKER = 0x7
+MH_BUNDLE = 0x8
+MH_DYLIB_STUB = 0x9
+MH_DSYM = 0xa
+MH_KEXT_BUNDLE = 0xb
+
+FILETYPE_NAMES = {
+    MH_OBJECT: "object",
+    MH_EXECUTE: "execute",
+    MH_DYLIB: "dylib",
+    MH_DYLINKER: "dylinker",
+    MH_BUNDLE: "bundle",
+    MH_DYLIB_STUB: "dylib_stub",
+    MH_DSYM: "dsym",
+    MH_KEXT_BUNDLE: "kext_bundle",
+}
+
+# CPU类型
+CPU_ARCH_ABI64 = 0x01000000
+CPU_ARCH_ABI64_32 = 0x02000000
+CPU_TYPE_X86 = 7
+CPU_TYPE_X86_64 = CPU_TYPE_X86 | CPU_ARCH_ABI64
+CPU_TYPE_ARM = 12
+CPU_TYPE_ARM64 = CPU_TYPE_ARM | CPU_ARCH_ABI64
+CPU_TYPE_ARM64_32 = CPU_TYPE_ARM | CPU_ARCH_ABI64_32
+CPU_TYPE_POWERPC = 18
+CPU_TYPE_POWERPC64 = CPU_TYPE_POWERPC | CPU_ARCH_ABI64
+
+CPU_SUBTYPE_MASK = 0xff000000
+CPU_SUBTYPE_X86_64_H = 8
+CPU_SUBTYPE_ARM64E = 2
+
+S_ZEROFILL = 0x1
+S_GB_ZEROFILL = 0xc
+S_THREAD_LOCAL_ZEROFILL = 0x12
+SECTION_TYPE = 0xff
+
+
+class MachOError(Exception):
+    """Mach-O 文件格式错误"""
+
+
+class LoadCommand:
+    """单条加载命令在slice中的位置"""
+
+    def __init__(self, cmd, offset, cmdsize):
+        self.cmd = cmd
+        self.offset = offset
+        self.cmdsize = cmdsize
+
+
+class DylibCommand(LoadCommand):
+    """LC_ID_DYLIB / LC_LOAD_DYLIB 等引用动态库的加载命令"""
+
+    def __init__(self, cmd, offset, cmdsize, name, timestamp,
+                 current_version, compatibility_version):
+        super().__init__(cmd, offset, cmdsize)
+        self.name = name
+        self.timestamp = timestamp
+        self.current_version = current_version
+        self.compatibility_version = compatibility_version
+
+    @property
+    def kind(self):
+        if self.cmd == LC_ID_DYLIB:
+            return "id"
+        return DEPENDENCY_COMMANDS.get(self.cmd, "unknown")
+
+    def __repr__(self):
+        return f"DylibCommand({self.kind}, {self.name!r})"
+
+
+class MachOSlice:
+    """FAT文件中的单个架构（thin文件只有一个slice）"""
+
+    def __init__(self, offset, size, cputype, cpusubtype, filetype, flags,
+                 is_64, byteorder, ncmds, sizeofcmds):
+        self.offset = offset
+        self.size = size
+        self.cputype = cputype
+        self.cpusubtype = cpusubtype
+        self.filetype = filetype
+        self.flags = flags
+        self.is_64 = is_64
+        self.byteorder = byteorder
+        self.ncmds = ncmds
+        self.sizeofcmds = sizeofcmds
+        self.commands = []
+        self.dylib_id = None
+        self.dylibs = []
+        self.rpaths = []
+        # LC_BUILD_VERSION / LC_VERSION_MIN_* 中的平台、最低系统版本与SDK版本（打包的32位版本号）
+        self.platform = None
+        self.min_os = None
+        self.sdk = None
+        # 第一个section数据在slice中的偏移，加载命令区不能超过这个位置
+        self.data_offset = None
+
+    @property
+    def header_size(self):
+        return 32 if self.is_64 else 28
+
+    @property
+    def arch(self):
+        return arch_name(self.cputype, self.cpusubtype)
+
+    @property
+    def filetype_name(self):
+        return FILETYPE_NAMES.get(self.filetype, f"filetype({self.filetype})")
+
+    @property
+    def id(self):
+        return self.dylib_id.name if self.dylib_id else None
+
+    @property
+    def dependencies(self):
+        return [dylib.name for dylib in self.dylibs]
+
+    def __repr__(self):
+        return f"MachOSlice({self.arch}, offset={self.offset}, ncmds={self.ncmds})"
+
+
+class MachOFile:
+    """解析后的Mach-O文件"""
+
+    def __init__(self, path, is_fat, slices):
+        self.path = path
+        self.is_fat = is_fat
+        self.slices = slices
+
+    @property
+    def archs(self):
+        return [macho_slice.arch for macho_slice in self.slices]
+
+    @property
+    def id(self):
+        for macho_slice in self.slices:
+            if macho_slice.id:
+                return macho_slice.id
+        return None
+
+    @property
+    def dependencies(self):
+        """所有slice中的依赖（保持首次出现的顺序并去重）"""
+        return _unique(name for macho_slice in self.slices
+                       for name in macho_slice.dependencies)
+
+    @property
+    def rpaths(self):
+        return _unique(rpath for macho_slice in self.slices
+                       for rpath in macho_slice.rpaths)
+
+    def __repr__(self):
+        return f"MachOFile({self.path!r}, archs={self.archs})"
+
+
+def _unique(items):
+    seen = set()
+    result = []
+    for item in items:
+        if item not in seen:
+            seen.add(item)
+            result.append(item)
+    return result
+
+
+def arch_name(cputype, cpusubtype):
+    """将cputype/cpusubtype转换为lipo使用的架构名称"""
+    subtype = cpusubtype & ~CPU_SUBTYPE_MASK
+    if cputype == CPU_TYPE_X86_64:
+        return "x86_64h" if subtype == CPU_SUBTYPE_X86_64_H else "x86_64"
+    if cputype == CPU_TYPE_ARM64:
+        return "arm64e" if subtype == CPU_SUBTYPE_ARM64E else "arm64"
+    if cputype == CPU_TYPE_ARM64_32:
+        return "arm64_32"
+    if cputype == CPU_TYPE_X86:
+        return "i386"
+    if cputype == CPU_TYPE_ARM:
+        return "armv7s" if subtype == 11 else "armv7k" if subtype == 12 else "armv7"
+    if cputype == CPU_TYPE_POWERPC:
+        return "ppc"
+    if cputype == CPU_TYPE_POWERPC64:
+        return "ppc64"
+    return f"cputype({cputype})"
+
+
+def format_version(version):
+    """将32位打包版本号转换为 X.Y.Z 形式"""
+    return f"{version >> 16}.{(version >> 8) & 0xff}.{version & 0xff}"
+
+
+def _read_cstring(data, start, end):
+    raw = bytes(data[start:end])
+    return raw.split(b"\0", 1)[0].decode("utf-8", "surrogateescape")
+
+
+def is_macho(data):
+    """判断数据是否以Mach-O或FAT魔数开头"""
+    if len(data) < 4:
+        return False
+    magic = struct.unpack_from(">I", data, 0)[0]
+    return magic in (FAT_MAGIC, FAT_MAGIC_64, MH_MAGIC, MH_CIGAM,
+                     MH_MAGIC_64, MH_CIGAM_64)
+
+
+def _parse_slice(data, offset, size):
+    """解析位于offset处的单个thin Mach-O"""
+    if offset + 28 > len(data):
+        raise MachOError(f"Mach-O头部越界: offset={offset}")
+
+    magic = struct.unpack_from("<I", data, offset)[0]
+    if magic in (MH_MAGIC, MH_MAGIC_64):
+        byteorder = "<"
+    elif magic in (MH_CIGAM, MH_CIGAM_64):
+        byteorder = ">"
+    else:
+        raise MachOError(f"无效的Mach-O魔数: 0x{magic:08x} (offset={offset})")
+    is_64 = magic in (MH_MAGIC_64, MH_CIGAM_64)
+
+    (_, cputype, cpusubtype, filetype, ncmds, sizeofcmds,
+     flags) = struct.unpack_from(byteorder + "7I", data, offset)
+    macho_slice = MachOSlice(offset, size, _signed(cputype), cpusubtype,
+                             filetype, flags, is_64, byteorder, ncmds,
+                             sizeofcmds)
+
+    cmd_offset = macho_slice.header_size
+    cmds_end = cmd_offset + sizeofcmds
+    if offset + cmds_end > len(data) or cmds_end > size:
+        raise MachOError(f"加载命令区越界: sizeofcmds={sizeofcmds}")
+
+    for _ in range(ncmds):
+        if cmd_offset + 8 > cmds_end:
+            raise MachOError("加载命令数量与sizeofcmds不一致")
+        cmd, cmdsize = struct.unpack_from(byteorder + "2I", data, offset + cmd_offset)
+        if cmdsize < 8 or cmd_offset + cmdsize > cmds_end:
+            raise MachOError(f"无效的加载命令大小: cmd=0x{cmd:x}, cmdsize={cmdsize}")
+
+        start = offset + cmd_offset
+        if cmd == LC_ID_DYLIB or cmd in DEPENDENCY_COMMANDS:
+            name_offset, timestamp, current, compat = struct.unpack_from(
+                byteorder + "4I", data, start + 8)
+            name = _read_cstring(data, start + name_offset, start + cmdsize)
+            command = DylibCommand(cmd, cmd_offset, cmdsize, name, timestamp,
+                                   current, compat)
+            if cmd == LC_ID_DYLIB:
+                macho_slice.dylib_id = command
+            else:
+                macho_slice.dylibs.append(command)
+        else:
+            command = LoadCommand(cmd, cmd_offset, cmdsize)
+            if cmd == LC_RPATH:
+                path_offset = struct.unpack_from(byteorder + "I", data, start + 8)[0]
+                macho_slice.rpaths.append(
+                    _read_cstring(data, start + path_offset, start + cmdsize))
+            elif cmd in (LC_SEGMENT, LC_SEGMENT_64):
+                _update_data_offset(macho_slice, data, start, cmd == LC_SEGMENT_64)
+            elif cmd == LC_BUILD_VERSION and macho_slice.platform is None:
+                platform, macho_slice.min_os, macho_slice.sdk = struct.unpack_from(
+                    byteorder + "3I", data, start + 8)
+                macho_slice.platform = PLATFORM_NAMES.get(platform, f"platform({platform})")
+            elif cmd in VERSION_MIN_COMMANDS and macho_slice.platform is None:
+                macho_slice.min_os, macho_slice.sdk = struct.unpack_from(
+                    byteorder + "2I", data, start + 8)
+                macho_slice.platform = VERSION_MIN_COMMANDS[cmd]
+
+        macho_slice.commands.append(command)
+        cmd_offset += cmdsize
+
+    return macho_slice
+
+
+def _update_data_offset(macho_slice, data, start, is_64):
+    """根据segment中的section记录第一个section数据的文件偏移"""
+    byteorder = macho_slice.byteorder
+    if is_64:
+        fileoff, filesize = struct.unpack_from(byteorder + "2Q", data, start + 40)
+        nsects = struct.unpack_from(byteorder + "I", data, start + 64)[0]
+        section_start, section_size = start + 72, 80
+        offset_field, flags_field = 48, 64
+    else:
+        fileoff, filesize = struct.unpack_from(byteorder + "2I", data, start + 32)
+        nsects = struct.unpack_from(byteorder + "I", data, start + 48)[0]
+        section_start, section_size = start + 56, 68
+        offset_field, flags_field = 40, 56
+
+    candidates = []
+    for index in range(nsects):
+        section = section_start + index * section_size
+        sect_offset = struct.unpack_from(byteorder + "I", data, section + offset_field)[0]
+        sect_flags = struct.unpack_from(byteorder + "I", data, section + flags_field)[0]
+        if sect_flags & SECTION_TYPE in (S_ZEROFILL, S_GB_ZEROFILL, S_THREAD_LOCAL_ZEROFILL):
+            continue
+        if sect_offset:
+            candidates.append(sect_offset)
+    if not nsects and fileoff and filesize:
+        candidates.append(fileoff)
+
+    if candidates:
+        lowest = min(candidates)
+        if macho_slice.data_offset is None or lowest < macho_slice.data_offset:
+            macho_slice.data_offset = lowest
+
+
+def _signed(value):
+    return value - (1 << 32) if value & 0x80000000 else value
+
+
+def parse_macho(data, path=None):
+    """
+    解析内存中的Mach-O数据
+
+    Args:
+        data: bytes/bytearray/mmap 等支持缓冲区协议的对象
+        path: 可选的文件路径，仅用于展示
+
+    Returns:
+        MachOFile: 解析结果
+    """
+    if len(data) < 8:
+        raise MachOError("文件过小，不是Mach-O文件")
+
+    magic = struct.unpack_from(">I", data, 0)[0]
+    if magic in (FAT_MAGIC, FAT_MAGIC_64):
+        is_fat_64 = magic == FAT_MAGIC_64
+        nfat_arch = struct.unpack_from(">I", data, 4)[0]
+        if nfat_arch == 0:
+            raise MachOError("FAT文件中没有任何架构")
+        arch_size = 32 if is_fat_64 else 20
+        if 8 + nfat_arch * arch_size > len(data):
+            raise MachOError(f"FAT头部越界: nfat_arch={nfat_arch}")
+
+        slices = []
+        for index in range(nfat_arch):
+            entry = 8 + index * arch_size
+            if is_fat_64:
+                _, _, offset, size, _, _ = struct.unpack_from(">iIQQII", data, entry)
+            else:
+                _, _, offset, size, _ = struct.unpack_from(">iIIII", data, entry)
+            if offset + size > len(data):
+                raise MachOError(f"FAT slice越界: offset={offset}, size={size}")
+            slices.append(_parse_slice(data, offset, size))
+        return MachOFile(path, True, slices)
+
+    return MachOFile(path, False, [_parse_slice(data, 0, len(data))])
+
+
+def read_macho(path):
+    """
+    通过内存映射读取并解析Mach-O文件
+
+    Args:
+        path: Mach-O文件路径
+
+    Returns:
+        MachOFile: 解析结果
+    """
+    with open(path, "rb") as f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # 空文件无法映射
+            raise MachOError(f"文件为空: {path}")
+        try:
+            return parse_macho(data, str(path))
+        finally:
+            data.close()
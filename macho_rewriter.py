@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Mach-O install name 改写模块
+一次读-改-写即可完成 install_name_tool -id 与多次 -change 的工作，
+对每个架构slice的加载命令区原地打补丁，不需要启动任何子进程
+"""
+
+import mmap
+import struct
+
+from macho_parser import (DEPENDENCY_COMMANDS, LC_ID_DYLIB, DylibCommand,
+                          MachOError, parse_macho)
+
+
+class MachORewriteError(MachOError):
+    """加载命令无法在现有填充空间内完成改写"""
+
+
+def dylib_install_names(macho, lib_name):
+    """
+    计算framework转换为dylib时需要的install name映射
+
+    Args:
+        macho: 源二进制的 MachOFile
+        lib_name: framework名称，例如 "AgoraRtcKit"
+
+    Returns:
+        tuple: (新ID, {旧依赖名: 新依赖名})
+    """
+    new_id = f"@rpath/lib{lib_name}.dylib"
+    changes = {}
+    for dependency in macho.dependencies:
+        if dependency.startswith("@rpath") and not dependency.endswith(".dylib"):
+            # @rpath/Agoraffmpeg.framework/Versions/A/Agoraffmpeg -> @rpath/libAgoraffmpeg.dylib
+            dep_lib = dependency.split("/")[-1]
+            if dep_lib == lib_name:
+                continue
+            changes[dependency] = f"@rpath/lib{dep_lib}.dylib"
+    return new_id, changes
+
+
+def _build_dylib_command(macho_slice, command, name):
+    """用新的名称重新生成一条dylib加载命令"""
+    align = 8 if macho_slice.is_64 else 4
+    raw_name = name.encode("utf-8", "surrogateescape") + b"\0"
+    cmdsize = (24 + len(raw_name) + align - 1) // align * align
+    header = struct.pack(macho_slice.byteorder + "6I", command.cmd, cmdsize, 24,
+                         command.timestamp, command.current_version,
+                         command.compatibility_version)
+    return header + raw_name.ljust(cmdsize - 24, b"\0")
+
+
+def _plan_slice(data, macho_slice, new_id, changes):
+    """生成单个slice的新加载命令区，返回 (新加载命令数据, 改写数量)"""
+    base = macho_slice.offset
+    blobs = []
+    modified = 0
+    for command in macho_slice.commands:
+        new_name = None
+        if isinstance(command, DylibCommand):
+            if command.cmd == LC_ID_DYLIB:
+                new_name = new_id
+            elif command.cmd in DEPENDENCY_COMMANDS:
+                new_name = changes.get(command.name)
+        if new_name is not None and new_name != command.name:
+            blobs.append(_build_dylib_command(macho_slice, command, new_name))
+            modified += 1
+        else:
+            start = base + command.offset
+            blobs.append(bytes(data[start:start + command.cmdsize]))
+
+    new_commands = b"".join(blobs)
+    limit = (macho_slice.data_offset or macho_slice.size) - macho_slice.header_size
+    if len(new_commands) > limit:
+        raise MachORewriteError(
+            f"{macho_slice.arch}: 加载命令需要 {len(new_commands)} 字节，"
+            f"但只有 {limit} 字节可用（填充空间不足）")
+    return new_commands, modified
+
+
+def rewrite_buffer(data, new_id=None, changes=None):
+    """
+    在可写缓冲区中改写所有slice的install name
+
+    所有slice都先完成校验再统一写入，任何一个slice空间不足都不会修改数据。
+
+    Args:
+        data: bytearray 或可写的 mmap
+        new_id: 新的 LC_ID_DYLIB 名称，None 表示不修改
+        changes: {旧依赖名: 新依赖名}
+
+    Returns:
+        int: 被改写的加载命令数量
+    """
+    changes = changes or {}
+    macho = parse_macho(data)
+
+    plans = []
+    total = 0
+    for macho_slice in macho.slices:
+        new_commands, modified = _plan_slice(data, macho_slice, new_id, changes)
+        if modified:
+            plans.append((macho_slice, new_commands))
+            total += modified
+
+    for macho_slice, new_commands in plans:
+        start = macho_slice.offset + macho_slice.header_size
+        # 旧命令区比新命令区长时，剩余部分填0作为新的填充空间
+        span = max(len(new_commands), macho_slice.sizeofcmds)
+        data[start:start + span] = new_commands.ljust(span, b"\0")
+        struct.pack_into(macho_slice.byteorder + "I", data,
+                         macho_slice.offset + 20, len(new_commands))
+    return total
+
+
+def rewrite_install_names(path, new_id=None, changes=None):
+    """
+    原地改写Mach-O文件的install name
+
+    文件通过可写内存映射打开，只有加载命令所在的页会被写回磁盘。
+
+    Args:
+        path: Mach-O文件路径
+        new_id: 新的 LC_ID_DYLIB 名称
+        changes: {旧依赖名: 新依赖名}
+
+    Returns:
+        int: 被改写的加载命令数量
+    """
+    with open(path, "r+b") as f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_WRITE)
+        except ValueError:
+            raise MachOError(f"文件为空: {path}")
+        try:
+            modified = rewrite_buffer(data, new_id, changes)
+            if modified:
+                data.flush()
+            return modified
+        finally:
+            data.close()
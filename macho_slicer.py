@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Mach-O 架构切片模块
+根据FAT头部直接取出单个架构的slice（替代 lipo -thin / -extract），
+转换时可以只输出某一个架构的dylib，减少下载与压缩的数据量
+"""
+
+from fast_copy import copy_file, copy_range
+from macho_parser import MachOError, parse_macho, read_macho
+
+# 通用二进制（保持所有架构）
+UNIVERSAL = "universal"
+# split 模式依次输出的架构
+SPLIT_ARCHS = ("arm64", "x86_64")
+
+
+def parse_arch_option(value):
+    """
+    解析 --arch 参数
+
+    Args:
+        value: "universal"、"split"、单个架构（如 "arm64"）或逗号分隔的多个架构
+
+    Returns:
+        list: 需要分别输出的架构列表，None 表示通用二进制
+    """
+    value = (value or UNIVERSAL).strip()
+    if value == UNIVERSAL:
+        return [None]
+    if value == "split":
+        return list(SPLIT_ARCHS)
+    archs = [arch.strip() for arch in value.split(",") if arch.strip()]
+    if not archs:
+        raise ValueError(f"无效的架构参数: {value}")
+    return list(dict.fromkeys(archs))
+
+
+def select_slice(macho, arch):
+    """返回指定架构的slice，不存在时抛出 MachOError"""
+    for macho_slice in macho.slices:
+        if macho_slice.arch == arch:
+            return macho_slice
+    raise MachOError(f"不包含架构 {arch}（现有架构: {', '.join(macho.archs)}）")
+
+
+def thin_buffer(data, arch):
+    """
+    取出内存中Mach-O数据的单个架构
+
+    Args:
+        data: bytes/bytearray/mmap 等支持缓冲区协议的对象
+        arch: 架构名称，例如 "arm64"
+
+    Returns:
+        memoryview: thin Mach-O数据（与data共享内存，不复制）
+    """
+    macho_slice = select_slice(parse_macho(data), arch)
+    return memoryview(data)[macho_slice.offset:macho_slice.offset + macho_slice.size]
+
+
+def thin_file(src, dst, arch):
+    """
+    把Mach-O文件的单个架构写入新文件（thin文件架构相符时直接复制）
+
+    Args:
+        src: 源文件
+        dst: 目标文件，已存在时会被替换
+        arch: 架构名称
+
+    Returns:
+        str: 使用的复制方式
+    """
+    macho = read_macho(src)
+    macho_slice = select_slice(macho, arch)
+    if not macho.is_fat:
+        return copy_file(src, dst)
+    return copy_range(src, dst, macho_slice.offset, macho_slice.size)
@@ -7,25 +7,22 @@ Agora SDK 快速启动脚本
 
 import os
 import sys
-import subprocess
-from pathlib import Path
 from auto_process_sdk import AgoraSDKProcessor
+from sdk_catalog import STATUS_FAILED, STATUS_PROCESSED, SdkCatalog
 
-def find_sdk_files():
-    """查找可用的SDK文件"""
-    sdk_dir = Path("SDK")
-    if not sdk_dir.exists():
-        return []
-    
-    sdk_files = []
-    for version_dir in sdk_dir.iterdir():
-        if version_dir.is_dir() and not version_dir.name.startswith('.'):
-            zip_files = list(version_dir.glob("*.zip"))
-            for zip_file in zip_files:
-                if "Agora_Native_SDK_for_Mac" in zip_file.name:
-                    sdk_files.append(zip_file)
-    
-    return sorted(sdk_files, key=lambda x: x.stat().st_mtime, reverse=True)
+# 处理状态的显示文字
+STATUS_LABELS = {STATUS_PROCESSED: "✅ 已处理", STATUS_FAILED: "❌ 处理失败"}
+
+def load_catalog():
+    """读取并增量更新SDK目录索引（只重新扫描有变化的版本目录）"""
+    catalog = SdkCatalog.load("SDK").refresh()
+    catalog.save()
+    return catalog
+
+def find_sdk_files(catalog=None, include_processed=True):
+    """查找可用的SDK文件（索引项，按修改时间从新到旧）"""
+    catalog = catalog or load_catalog()
+    return catalog.sdk_files(include_processed)
 
 def display_sdk_files(sdk_files):
     """显示SDK文件列表"""
@@ -37,18 +34,21 @@ def display_sdk_files(sdk_files):
         print("请确保SDK目录中有Agora_Native_SDK_for_Mac开头的zip文件")
         return
     
-    for i, sdk_file in enumerate(sdk_files, 1):
-        # 获取文件大小
-        size_mb = sdk_file.stat().st_size / (1024 * 1024)
-        # 获取修改时间
-        mtime = sdk_file.stat().st_mtime
-        from datetime import datetime
-        mtime_str = datetime.fromtimestamp(mtime).strftime("%Y-%m-%d %H:%M")
+    from datetime import datetime
+    for i, entry in enumerate(sdk_files, 1):
+        # 大小、修改时间与处理状态直接来自索引，不再stat文件
+        size_mb = entry.size / (1024 * 1024)
+        mtime_str = datetime.fromtimestamp(entry.mtime_ns / 1e9).strftime("%Y-%m-%d %H:%M")
         
-        print(f"{i:2d}. {sdk_file.name}")
-        print(f"    路径: {sdk_file}")
+        print(f"{i:2d}. {entry.path.name}")
+        print(f"    路径: {entry.path}")
+        if entry.sdk_version is not None:
+            print(f"    版本: {entry.sdk_version.describe()}")
         print(f"    大小: {size_mb:.1f} MB")
         print(f"    时间: {mtime_str}")
+        print(f"    状态: {STATUS_LABELS.get(entry.status, '⏳ 未处理')}")
+        for name in sorted(entry.outputs):
+            print(f"    产物: {name} (sha256 {entry.outputs[name][:12]})")
         print()
 
 def get_user_selection(sdk_files):
@@ -62,7 +62,7 @@ def get_user_selection(sdk_files):
             
             choice_num = int(choice)
             if 1 <= choice_num <= len(sdk_files):
-                return sdk_files[choice_num - 1]
+                return sdk_files[choice_num - 1].path
             else:
                 print(f"❌ 请输入 1-{len(sdk_files)} 之间的数字")
         except ValueError:
@@ -125,6 +125,23 @@ def process_sdk(sdk_file):
     
     return True
 
+def process_all_sdk(sdk_files, catalog=None):
+    """批量处理所有SDK文件，共享转换缓存；提供索引时记录各SDK的处理结果"""
+    from sdk_batch import print_batch_summary, process_batch
+    
+    print(f"\n🚀 开始批量处理 {len(sdk_files)} 个SDK文件...")
+    print("⏳ 请耐心等待，处理过程可能需要几分钟...")
+    print("-" * 50)
+    
+    # 与单个处理一致：输出到各SDK文件所在目录，AED文件来自 SDK/aed
+    results = process_batch(sdk_files, batch_jobs=2, options={"aed_dir": "SDK/aed"})
+    print_batch_summary(results)
+    if catalog is not None:
+        for result in results:
+            catalog.record_result(result.sdk_zip, result.success)
+        catalog.save()
+    return all(result.success for result in results)
+
 def show_help():
     """显示帮助信息"""
     print("\n📖 帮助信息:")
@@ -151,19 +168,21 @@ def main():
         print("请确保在正确的目录中运行此脚本")
         sys.exit(1)
     
-    # 查找SDK文件
-    sdk_files = find_sdk_files()
-    
     while True:
+        # 每次操作前增量更新索引，新放入或已处理的SDK立即可见
+        catalog = load_catalog()
+        sdk_files = find_sdk_files(catalog)
+        
         print("\n" + "=" * 50)
         print("请选择操作:")
         print("1. 查看可用的SDK文件")
         print("2. 处理SDK文件")
         print("3. 显示帮助信息")
         print("4. 退出")
+        print("5. 批量处理全部未处理的SDK文件")
         
         try:
-            choice = input("\n请输入选择 (1-4): ").strip()
+            choice = input("\n请输入选择 (1-5): ").strip()
             
             if choice == "1":
                 display_sdk_files(sdk_files)
@@ -178,7 +197,10 @@ def main():
                 
                 if selected_file:
                     if confirm_processing(selected_file):
-                        if process_sdk(selected_file):
+                        success = process_sdk(selected_file)
+                        catalog.record_result(selected_file, success)
+                        catalog.save()
+                        if success:
                             print("\n✅ 处理成功完成!")
                             print("👋 脚本执行完毕，即将退出...")
                             sys.exit(0)
@@ -194,8 +216,29 @@ def main():
                 print("👋 再见!")
                 break
                 
+            elif choice == "5":
+                if not sdk_files:
+                    print("❌ 没有可用的SDK文件")
+                    continue
+                
+                # 已处理且产物未变化的SDK不再重复处理
+                pending = find_sdk_files(catalog, include_processed=False)
+                if not pending:
+                    print("✅ 所有SDK文件均已处理")
+                    continue
+                
+                display_sdk_files(pending)
+                confirm = input(f"\n是否批量处理以上 {len(pending)} 个SDK文件? (y/N): ").strip().lower()
+                if confirm in ['y', 'yes']:
+                    if process_all_sdk([entry.path for entry in pending], catalog):
+                        print("\n✅ 批量处理成功完成!")
+                    else:
+                        print("\n❌ 部分SDK处理失败，请检查上方汇总")
+                else:
+                    print("👋 取消处理")
+                
             else:
-                print("❌ 请输入 1-4 之间的数字")
+                print("❌ 请输入 1-5 之间的数字")
                 
         except KeyboardInterrupt:
             print("\n👋 再见!")
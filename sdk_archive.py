@@ -0,0 +1,494 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SDK 压缩包写入模块
+每个文件只DEFLATE一次，得到的压缩数据（含CRC与大小）可以原样写入多个zip，
+标准包与AED包因此共享同一份压缩结果；
+提供线程池时多个成员并行压缩，大文件按块并行压缩（与pigz相同的做法）
+"""
+
+import collections
+import os
+import struct
+import tempfile
+import threading
+import time
+import zipfile
+import zlib
+from concurrent.futures import Future
+from pathlib import Path
+
+ZIP_STORED = 0
+ZIP_DEFLATED = 8
+
+# 单个成员的压缩数据超过该大小后落盘到临时文件
+SPOOL_MAX_SIZE = 8 * 1024 * 1024
+READ_CHUNK_SIZE = 1024 * 1024
+DEFAULT_LEVEL = 6
+# 超过该大小的文件在调用线程中按块并行压缩，较小的文件整体交给线程池
+PARALLEL_MIN_SIZE = 4 * READ_CHUNK_SIZE
+# 按块并行压缩时同时在途的块数
+PARALLEL_WINDOW = 2 * (os.cpu_count() or 1)
+# 每个块使用前一块末尾的32KB作为预设字典，压缩率与整体压缩基本一致
+_DICT_SIZE = 32 * 1024
+
+# 本身已经压缩过的内容，store_compressed=True 时直接存储不再压缩
+COMPRESSED_SUFFIXES = (".zip", ".gz", ".tgz", ".bz2", ".xz", ".7z", ".jar", ".aar",
+                       ".png", ".jpg", ".jpeg")
+
+_LOCAL_HEADER_SIZE = 30
+_FLAG_ENCRYPTED = 0x1
+_ZIP64_LIMIT = 0xFFFFFFFF
+_ZIP_FILECOUNT_LIMIT = 0xFFFF
+_FLAG_UTF8 = 0x800
+# 与 zipfile 一致：version made by = 2.0，系统 = Unix
+_CREATE_VERSION = (3 << 8) | 20
+
+
+def _dos_datetime(date_time):
+    year, month, day, hour, minute, second = date_time
+    if year < 1980:
+        year, month, day, hour, minute, second = 1980, 1, 1, 0, 0, 0
+    dos_date = (year - 1980) << 9 | month << 5 | day
+    dos_time = hour << 11 | minute << 5 | (second // 2)
+    return dos_time, dos_date
+
+
+class CompressedMember:
+    """已经压缩好的zip成员，可以写入任意多个压缩包"""
+
+    def __init__(self, arcname, crc, compress_size, file_size, compress_type,
+                 date_time, external_attr, data):
+        self.arcname = arcname
+        self.crc = crc
+        self.compress_size = compress_size
+        self.file_size = file_size
+        self.compress_type = compress_type
+        self.date_time = date_time
+        self.external_attr = external_attr
+        self._data = data
+
+    def open(self):
+        """返回定位到开头的压缩数据流"""
+        self._data.seek(0)
+        return self._data
+
+    def close(self):
+        self._data.close()
+
+    def __repr__(self):
+        return (f"CompressedMember({self.arcname!r}, size={self.file_size}, "
+                f"compress_size={self.compress_size})")
+
+
+class _SharedZipFile:
+    """
+    多个成员共用的已有zip文件句柄：只打开一次，所有成员关闭后才关闭
+
+    生成的新压缩包替换该路径后，仍然从原来的文件读取，不会按旧偏移读到新文件
+    """
+
+    def __init__(self, zip_path, file):
+        self.zip_path = zip_path
+        self._file = file
+        self._refs = 0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            self._refs += 1
+
+    def release(self):
+        with self._lock:
+            self._refs -= 1
+            if self._refs <= 0:
+                self._file.close()
+
+    def pread(self, offset, size):
+        with self._lock:
+            self._file.seek(offset)
+            return self._file.read(size)
+
+
+class _ZipDataSlice:
+    """已有zip中某个成员的原始压缩数据（从共用的文件句柄按偏移读取）"""
+
+    def __init__(self, source, header_offset, compress_size):
+        self.source = source
+        self.header_offset = header_offset
+        self.compress_size = compress_size
+        self._position = 0
+        self._remaining = 0
+        self._closed = False
+        source.acquire()
+
+    def seek(self, offset):
+        if offset != 0:
+            raise ValueError("只支持定位到开头")
+        header = self.source.pread(self.header_offset, _LOCAL_HEADER_SIZE)
+        if len(header) != _LOCAL_HEADER_SIZE or header[:4] != b"PK\x03\x04":
+            raise ValueError(f"无效的本地文件头: {self.source.zip_path}@{self.header_offset}")
+        name_length, extra_length = struct.unpack("<HH", header[26:30])
+        self._position = self.header_offset + _LOCAL_HEADER_SIZE + name_length + extra_length
+        self._remaining = self.compress_size
+
+    def read(self, size=-1):
+        if size < 0 or size > self._remaining:
+            size = self._remaining
+        if not size:
+            return b""
+        chunk = self.source.pread(self._position, size)
+        if len(chunk) != size:
+            raise ValueError(f"压缩数据不完整: {self.source.zip_path}@{self.header_offset}")
+        self._position += size
+        self._remaining -= size
+        return chunk
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            self.source.release()
+
+
+def read_raw_members(zip_path, arcnames=None):
+    """
+    读取已有zip中成员的原始压缩数据，不解压、不重新压缩
+
+    Args:
+        zip_path: 已有的zip文件（例如上次生成的压缩包）
+        arcnames: 需要的成员路径列表，None 表示全部文件成员
+
+    Returns:
+        list: CompressedMember 列表（沿用zip中记录的CRC、大小与属性），
+              共用同一个文件句柄，全部 close 后才关闭
+    """
+    file = open(zip_path, "rb")
+    source = _SharedZipFile(zip_path, file)
+    members = []
+    try:
+        with zipfile.ZipFile(file, "r") as zip_ref:
+            if arcnames is None:
+                infos = [info for info in zip_ref.infolist() if not info.is_dir()]
+            else:
+                infos = [zip_ref.getinfo(arcname) for arcname in arcnames]
+        for info in infos:
+            if info.flag_bits & _FLAG_ENCRYPTED:
+                raise ValueError(f"不支持加密的成员: {info.filename}")
+            data = _ZipDataSlice(source, info.header_offset, info.compress_size)
+            members.append(CompressedMember(info.filename, info.CRC, info.compress_size,
+                                            info.file_size, info.compress_type, info.date_time,
+                                            info.external_attr, data))
+    except BaseException:
+        close_members(members)
+        file.close()
+        raise
+    if not members:
+        file.close()
+    return members
+
+
+def is_precompressed(name):
+    """是否为本身已经压缩过的内容（嵌套zip、图片等）"""
+    return name.lower().endswith(COMPRESSED_SUFFIXES)
+
+
+def _compress_chunks(chunks, level, executor=None):
+    """压缩数据块序列，返回 (压缩数据, CRC, 原始大小)"""
+    if executor is not None:
+        return _compress_chunks_parallel(chunks, level, executor)
+    data = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    crc = 0
+    file_size = 0
+    try:
+        for chunk in chunks:
+            file_size += len(chunk)
+            crc = zlib.crc32(chunk, crc)
+            data.write(compressor.compress(chunk))
+        data.write(compressor.flush())
+    except BaseException:
+        data.close()
+        raise
+    return data, crc, file_size
+
+
+def _deflate_block(block, dictionary, level, last):
+    """压缩一个块；非最后一块以 Z_SYNC_FLUSH 结束（字节对齐），各块可以直接拼接"""
+    if dictionary:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -15, zdict=dictionary)
+    else:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    return compressor.compress(block) + compressor.flush(zlib.Z_FINISH if last
+                                                         else zlib.Z_SYNC_FLUSH)
+
+
+def _compress_chunks_parallel(chunks, level, executor):
+    """按块在线程池中并行压缩（zlib压缩时释放GIL），CRC在调用线程中顺序计算"""
+    data = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    window = collections.deque()
+    crc = 0
+    file_size = 0
+    try:
+        chunks = iter(chunks)
+        previous = None
+        chunk = next(chunks, None)
+        while chunk is not None:
+            following = next(chunks, None)
+            file_size += len(chunk)
+            crc = zlib.crc32(chunk, crc)
+            dictionary = previous[-_DICT_SIZE:] if previous is not None else None
+            window.append(executor.submit(_deflate_block, chunk, dictionary, level,
+                                          following is None))
+            if len(window) >= PARALLEL_WINDOW:
+                data.write(window.popleft().result())
+            previous, chunk = chunk, following
+        while window:
+            data.write(window.popleft().result())
+        if file_size == 0:
+            data.write(zlib.compressobj(level, zlib.DEFLATED, -15).flush())
+    except BaseException:
+        for future in window:
+            future.cancel()
+        data.close()
+        raise
+    return data, crc, file_size
+
+
+def _store_chunks(chunks):
+    """不压缩，直接存储数据块序列，返回 (数据, CRC, 原始大小)"""
+    data = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    crc = 0
+    file_size = 0
+    try:
+        for chunk in chunks:
+            file_size += len(chunk)
+            crc = zlib.crc32(chunk, crc)
+            data.write(chunk)
+    except BaseException:
+        data.close()
+        raise
+    return data, crc, file_size
+
+
+def _read_chunks(f):
+    while True:
+        chunk = f.read(READ_CHUNK_SIZE)
+        if not chunk:
+            break
+        yield chunk
+
+
+def _encode_chunks(chunks, arcname, level, executor, store_compressed):
+    """按压缩选项处理数据块，返回 (数据, CRC, 原始大小, 压缩方式)"""
+    if store_compressed and is_precompressed(arcname):
+        return _store_chunks(chunks) + (ZIP_STORED,)
+    return _compress_chunks(chunks, level, executor) + (ZIP_DEFLATED,)
+
+
+def compress_file(path, arcname, level=DEFAULT_LEVEL, executor=None, store_compressed=False):
+    """
+    将文件压缩为raw DEFLATE数据
+
+    Args:
+        path: 源文件路径
+        arcname: 压缩包内的路径
+        level: zlib压缩级别
+        executor: 线程池，提供时按块并行压缩
+        store_compressed: 已压缩的内容（嵌套zip等）直接存储
+
+    Returns:
+        CompressedMember: 压缩结果
+    """
+    st = os.stat(path)
+    date_time = time.localtime(st.st_mtime)[0:6]
+    external_attr = (st.st_mode & 0xFFFF) << 16
+
+    with open(path, "rb") as f:
+        data, crc, file_size, compress_type = _encode_chunks(
+            _read_chunks(f), arcname, level, executor, store_compressed)
+    return CompressedMember(arcname, crc, data.tell(), file_size, compress_type,
+                            date_time, external_attr, data)
+
+
+def compress_bytes(buffer, arcname, date_time, external_attr, level=DEFAULT_LEVEL,
+                   executor=None, store_compressed=False):
+    """
+    将内存中的数据压缩为raw DEFLATE数据
+
+    Args:
+        buffer: bytes/bytearray 等支持缓冲区协议的对象
+        arcname: 压缩包内的路径
+        date_time: (年, 月, 日, 时, 分, 秒)
+        external_attr: zip外部属性（高16位为Unix权限）
+        executor: 线程池，提供时按块并行压缩
+
+    Returns:
+        CompressedMember: 压缩结果
+    """
+    view = memoryview(buffer)
+    chunks = (view[i:i + READ_CHUNK_SIZE] for i in range(0, len(view), READ_CHUNK_SIZE))
+    data, crc, file_size, compress_type = _encode_chunks(chunks, arcname, level, executor,
+                                                         store_compressed)
+    return CompressedMember(arcname, crc, data.tell(), file_size, compress_type,
+                            date_time, external_attr, data)
+
+
+def compress_files(items, level=DEFAULT_LEVEL, executor=None, store_compressed=False):
+    """
+    压缩多个文件，提供线程池时并行压缩
+
+    小文件整体提交给线程池；大文件在调用线程中按块提交，
+    两者共用同一个线程池且互不等待，不会死锁
+
+    Args:
+        items: (文件路径, 压缩包内路径) 列表
+
+    Returns:
+        list: 与items顺序一致的 CompressedMember 列表
+    """
+    futures = []
+    try:
+        for path, arcname in items:
+            if executor is None or os.path.getsize(path) >= PARALLEL_MIN_SIZE:
+                future = Future()
+                future.set_result(compress_file(path, arcname, level, executor,
+                                                store_compressed))
+            else:
+                future = executor.submit(compress_file, path, arcname, level, None,
+                                         store_compressed)
+            futures.append(future)
+        return [future.result() for future in futures]
+    except BaseException:
+        for future in futures:
+            if not future.cancel() and future.exception() is None:
+                future.result().close()
+        raise
+
+
+def compress_directory(directory, arc_prefix, level=DEFAULT_LEVEL, executor=None,
+                       store_compressed=False):
+    """
+    压缩目录下的所有文件（按路径排序）
+
+    Args:
+        directory: 源目录
+        arc_prefix: 压缩包内的顶层目录名，例如 "agora_sdk"
+        executor: 线程池，提供时并行压缩
+
+    Returns:
+        list: CompressedMember 列表
+    """
+    directory = Path(directory)
+    items = [(file_path, (Path(arc_prefix) / file_path.relative_to(directory)).as_posix())
+             for file_path in sorted(directory.rglob('*')) if file_path.is_file()]
+    return compress_files(items, level, executor, store_compressed)
+
+
+def close_members(members):
+    for member in members:
+        member.close()
+
+
+class ZipArchiveWriter:
+    """把预先压缩好的成员顺序追加到zip文件中，需要时自动使用ZIP64"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._file = open(self.path, "wb")
+        self._entries = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._file.close()
+
+    def add(self, member):
+        """写入一个 CompressedMember 的本地文件头与压缩数据"""
+        offset = self._file.tell()
+        name = member.arcname.encode("utf-8")
+        flags = 0 if member.arcname.isascii() else _FLAG_UTF8
+        dos_time, dos_date = _dos_datetime(member.date_time)
+
+        zip64 = (member.file_size >= _ZIP64_LIMIT or
+                 member.compress_size >= _ZIP64_LIMIT)
+        if zip64:
+            extra = struct.pack("<HHQQ", 1, 16, member.file_size, member.compress_size)
+            file_size = compress_size = _ZIP64_LIMIT
+        else:
+            extra = b""
+            file_size, compress_size = member.file_size, member.compress_size
+        version = 45 if zip64 else 20
+
+        header = struct.pack("<IHHHHHIIIHH", 0x04034b50, version, flags,
+                             member.compress_type, dos_time, dos_date,
+                             member.crc, compress_size, file_size,
+                             len(name), len(extra))
+        self._file.write(header + name + extra)
+
+        stream = member.open()
+        while True:
+            chunk = stream.read(READ_CHUNK_SIZE)
+            if not chunk:
+                break
+            self._file.write(chunk)
+
+        self._entries.append((member, offset, flags, version))
+
+    def close(self):
+        """写入中央目录并关闭文件"""
+        if self._file.closed:
+            return
+        cd_start = self._file.tell()
+        for member, offset, flags, version in self._entries:
+            self._write_central_entry(member, offset, flags, version)
+        cd_end = self._file.tell()
+        self._write_end_records(cd_start, cd_end - cd_start)
+        self._file.close()
+
+    def _write_central_entry(self, member, offset, flags, version):
+        name = member.arcname.encode("utf-8")
+        dos_time, dos_date = _dos_datetime(member.date_time)
+
+        zip64_fields = []
+        file_size, compress_size, header_offset = (member.file_size,
+                                                   member.compress_size, offset)
+        if file_size >= _ZIP64_LIMIT:
+            zip64_fields.append(file_size)
+            file_size = _ZIP64_LIMIT
+        if compress_size >= _ZIP64_LIMIT:
+            zip64_fields.append(compress_size)
+            compress_size = _ZIP64_LIMIT
+        if header_offset >= _ZIP64_LIMIT:
+            zip64_fields.append(header_offset)
+            header_offset = _ZIP64_LIMIT
+        extra = b""
+        if zip64_fields:
+            extra = struct.pack("<HH%dQ" % len(zip64_fields), 1,
+                                8 * len(zip64_fields), *zip64_fields)
+            version = 45
+
+        header = struct.pack("<IHHHHHHIIIHHHHHII", 0x02014b50, _CREATE_VERSION,
+                             version, flags, member.compress_type, dos_time,
+                             dos_date, member.crc, compress_size, file_size,
+                             len(name), len(extra), 0, 0, 0,
+                             member.external_attr, header_offset)
+        self._file.write(header + name + extra)
+
+    def _write_end_records(self, cd_offset, cd_size):
+        count = len(self._entries)
+        if (count >= _ZIP_FILECOUNT_LIMIT or cd_offset >= _ZIP64_LIMIT or
+                cd_size >= _ZIP64_LIMIT):
+            zip64_eocd_offset = self._file.tell()
+            self._file.write(struct.pack("<IQHHIIQQQQ", 0x06064b50, 44, 45, 45,
+                                         0, 0, count, count, cd_size, cd_offset))
+            self._file.write(struct.pack("<IIQI", 0x07064b50, 0,
+                                         zip64_eocd_offset, 1))
+            count = min(count, _ZIP_FILECOUNT_LIMIT)
+            cd_size = min(cd_size, _ZIP64_LIMIT)
+            cd_offset = min(cd_offset, _ZIP64_LIMIT)
+        self._file.write(struct.pack("<IHHHHIIH", 0x06054b50, 0, 0, count,
+                                     count, cd_size, cd_offset, 0))
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Agora SDK 批量处理模块
+一次处理多个SDK zip（支持目录与通配符），使用有限大小的进程池并发执行，
+每个任务使用独立的临时目录，所有任务共享同一个转换缓存
+"""
+
+import contextlib
+import glob
+import io
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from auto_process_sdk import process_sdk_archs
+from conversion_cache import ConversionCache
+from sdk_archive import DEFAULT_LEVEL
+from sdk_metrics import MetricsRecorder
+from sdk_version import version_suffix
+
+
+def is_source_sdk_zip(path):
+    """是否为原始的Agora Mac SDK压缩包（排除本工具生成的agora_sdk_mac_*.zip）"""
+    path = Path(path)
+    return path.suffix == ".zip" and "Agora_Native_SDK_for_Mac" in path.name
+
+
+def expand_sdk_inputs(inputs):
+    """
+    展开批量输入
+
+    Args:
+        inputs: 文件路径、目录或通配符列表；目录与通配符只保留原始SDK压缩包
+
+    Returns:
+        list: 去重后的zip路径列表（Path）
+    """
+    zips = {}
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            candidates = [p for p in sorted(path.rglob("*.zip")) if is_source_sdk_zip(p)]
+        elif path.is_file():
+            candidates = [path]
+        else:
+            candidates = [Path(p) for p in sorted(glob.glob(item, recursive=True))
+                          if is_source_sdk_zip(p)]
+        for candidate in candidates:
+            zips.setdefault(candidate.resolve(), candidate)
+    return list(zips.values())
+
+
+class BatchResult:
+    """单个SDK zip的批量处理结果"""
+
+    def __init__(self, sdk_zip, success, duration, output_files=None, log="", error=None,
+                 metrics=None):
+        self.sdk_zip = Path(sdk_zip)
+        self.success = success
+        self.duration = duration
+        self.output_files = [Path(p) for p in (output_files or [])]
+        self.log = log
+        self.error = error
+        # 各阶段度量（MetricsRecorder.to_dict() 的结果）
+        self.metrics = metrics
+
+
+def prepare_options(options, batch_jobs):
+    """补全多个SDK同时处理时的参数（process_batch 的options，见其说明）"""
+    options = dict(options or {})
+    options.setdefault("cache_max_bytes", 2 * 1024 * 1024 * 1024)
+    if not options.get("compress_jobs"):
+        # 多个SDK同时处理时平分CPU，避免压缩线程过多
+        options["compress_jobs"] = max(1, (os.cpu_count() or 1) // max(1, batch_jobs))
+    for key in ("max_memory", "max_disk"):
+        if options.get(key) is not None:
+            options[key] //= max(1, batch_jobs)
+    # AED目录在子进程中解析，提前转为绝对路径
+    options["aed_dir"] = str(Path(options.get("aed_dir", "aed")).absolute())
+    return options
+
+
+def run_job(sdk_zip, output_dir, options, capture=True):
+    """
+    在独立的工作目录中处理一个SDK zip（可在子进程中运行）
+
+    Args:
+        sdk_zip: SDK zip路径
+        output_dir: 压缩包输出目录
+        options: prepare_options 补全后的参数
+        capture: 是否把日志收集到 BatchResult.log 中（子进程中运行时）
+    """
+    start = time.perf_counter()
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    resume = options.get("resume", False)
+    if resume:
+        # 断点续传时工作目录固定，失败后保留供下次继续
+        work_dir = output_dir / f".agora_sdk_job_{version_suffix(Path(sdk_zip).name)}"
+        work_dir.mkdir(exist_ok=True)
+    else:
+        work_dir = tempfile.mkdtemp(prefix=".agora_sdk_job_", dir=output_dir)
+    success = False
+    buffer = io.StringIO()
+    redirect = contextlib.redirect_stdout(buffer) if capture else contextlib.nullcontext()
+    metrics = MetricsRecorder()
+    output_files = []
+    error = None
+    try:
+        with redirect:
+            cache = None
+            if options.get("cache", True):
+                cache = ConversionCache(options.get("cache_dir"),
+                                        max_bytes=options.get("cache_max_bytes"))
+            success, output_files = process_sdk_archs(
+                str(sdk_zip), options.get("archs", [None]), metrics=metrics,
+                sdk_dir=options.get("sdk_dir", "agora_sdk"),
+                aed_dir=options.get("aed_dir", "aed"), output_dir=output_dir,
+                jobs=options.get("jobs", 1),
+                stream=options.get("stream", False),
+                pipeline=options.get("pipeline", False),
+                max_memory=options.get("max_memory"),
+                max_disk=options.get("max_disk"),
+                resume=resume,
+                cache=cache, work_dir=work_dir,
+                incremental=options.get("incremental", True),
+                compress_level=options.get("compress_level", DEFAULT_LEVEL),
+                compress_jobs=options.get("compress_jobs"),
+                store_compressed=options.get("store_compressed", False),
+                verify_deps=options.get("verify_deps", False))
+    except Exception as e:
+        success = False
+        error = str(e)
+    finally:
+        if success or not resume:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    return BatchResult(sdk_zip, success, time.perf_counter() - start, output_files,
+                       buffer.getvalue(), error, metrics.to_dict())
+
+
+def process_batch(sdk_zips, output_dir=None, batch_jobs=2, options=None):
+    """
+    批量处理多个SDK zip
+
+    Args:
+        sdk_zips: zip路径列表
+        output_dir: 统一的输出目录，None 表示输出到各zip所在目录
+        batch_jobs: 同时处理的SDK数量
+        options: 传给 AgoraSDKProcessor 的参数
+            (sdk_dir, aed_dir, jobs, stream, pipeline, cache, cache_dir, cache_max_bytes, incremental,
+             compress_level, compress_jobs, store_compressed, verify_deps,
+             archs: parse_arch_option 的结果,
+             max_memory/max_disk: 所有SDK合计的预算（字节），同时处理的SDK平分,
+             resume: 失败时保留固定的工作目录，再次运行时从断点继续)
+
+    Returns:
+        list: 与输入顺序一致的 BatchResult 列表
+    """
+    options = prepare_options(options, batch_jobs)
+
+    jobs = []
+    results = {}
+    claimed = {}
+    for sdk_zip in sdk_zips:
+        target_dir = Path(output_dir) if output_dir else Path(sdk_zip).parent
+        # 输出文件名相同的任务会互相覆盖，只处理第一个
+        key = (target_dir.resolve(), version_suffix(Path(sdk_zip).name))
+        if key in claimed:
+            results[sdk_zip] = BatchResult(
+                sdk_zip, False, 0.0,
+                error=f"输出文件名与 {claimed[key].name} 冲突（版本后缀: {key[1]}）")
+            continue
+        claimed[key] = Path(sdk_zip)
+        jobs.append((sdk_zip, target_dir))
+
+    print(f"📦 批量处理 {len(jobs)} 个SDK文件（并发数: {batch_jobs}）")
+    if batch_jobs <= 1 or len(jobs) <= 1:
+        for sdk_zip, target_dir in jobs:
+            results[sdk_zip] = run_job(sdk_zip, target_dir, options, capture=False)
+    else:
+        with ProcessPoolExecutor(max_workers=batch_jobs) as executor:
+            futures = [(sdk_zip, executor.submit(run_job, sdk_zip, target_dir, options))
+                       for sdk_zip, target_dir in jobs]
+            for sdk_zip, future in futures:
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = BatchResult(sdk_zip, False, 0.0, error=str(e))
+                print(f"\n{'=' * 60}\n📋 {Path(sdk_zip).name}\n{'=' * 60}")
+                print(result.log, end="")
+                results[sdk_zip] = result
+
+    return [results[sdk_zip] for sdk_zip in sdk_zips]
+
+
+def print_batch_summary(results):
+    """输出批量处理汇总"""
+    print(f"\n📊 批量处理结果汇总")
+    print("=" * 60)
+    for result in results:
+        status = "✅" if result.success else "❌"
+        print(f"{status} {result.sdk_zip.name} ({result.duration:.1f}s)")
+        for output_file in result.output_files:
+            print(f"    📦 {output_file}")
+        if result.error:
+            print(f"    ⚠️  {result.error}")
+    succeeded = sum(1 for result in results if result.success)
+    print("-" * 60)
+    print(f"总数: {len(results)}  成功: {succeeded}  失败: {len(results) - succeeded}")
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SDK 目录索引模块
+在 SDK/.sdk_catalog.json 中记录每个原始SDK zip的大小、修改时间、版本信息、处理状态与产物摘要；
+按版本目录的修改时间增量更新，目录未变化时只stat已知的SDK zip与构建清单（不重新扫描目录），
+处理状态根据压缩包旁的构建清单判断
+"""
+
+import json
+import os
+from pathlib import Path
+
+from build_manifest import BuildManifest, manifest_path, output_matches, write_json_atomic
+from sdk_batch import is_source_sdk_zip
+from sdk_version import SdkVersion, parse_sdk_version, version_suffix
+
+# 索引结构变化时递增，旧索引会被忽略
+CATALOG_VERSION = 3
+CATALOG_NAME = ".sdk_catalog.json"
+
+# 处理状态
+STATUS_NEW = "new"
+STATUS_PROCESSED = "processed"
+STATUS_FAILED = "failed"
+
+
+class CatalogEntry:
+    """索引中的一个SDK zip"""
+
+    def __init__(self, path, size, mtime_ns, version_suffix, status=STATUS_NEW, outputs=None,
+                 sdk_version=None, manifest_signature=None):
+        self.path = Path(path)
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.version_suffix = version_suffix
+        # 解析出的版本信息（SdkVersion），无法识别时为None
+        self.sdk_version = sdk_version
+        self.status = status
+        # 生成的压缩包 {文件名: sha256}
+        self.outputs = dict(outputs or {})
+        # 判断处理状态时构建清单的 [大小, 修改时间]，清单不存在时为None
+        self.manifest_signature = manifest_signature
+
+    @property
+    def manifest_path(self):
+        return manifest_path(self.path.parent, self.version_suffix)
+
+    @property
+    def processed(self):
+        return self.status == STATUS_PROCESSED
+
+    def to_dict(self):
+        return {"size": self.size, "mtime_ns": self.mtime_ns,
+                "version_suffix": self.version_suffix, "status": self.status,
+                "outputs": self.outputs,
+                "sdk_version": self.sdk_version.to_dict() if self.sdk_version else None,
+                "manifest_signature": self.manifest_signature}
+
+    def __repr__(self):
+        return f"CatalogEntry({self.path.name!r}, status={self.status!r})"
+
+
+def _signature(path):
+    """文件的 [大小, 修改时间]，不存在时返回None（与JSON中保存的形式一致）"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+def _processing_result(zip_path, version_suffix):
+    """根据构建清单判断SDK是否已处理，返回 (状态, 产物摘要)"""
+    manifest = BuildManifest.load(manifest_path(zip_path.parent, version_suffix))
+    if manifest is None or manifest.source != zip_path.name or not manifest.outputs:
+        return STATUS_NEW, {}
+    for name, record in manifest.outputs.items():
+        if not output_matches(record, zip_path.parent / name):
+            return STATUS_NEW, {}
+    return STATUS_PROCESSED, {name: record["sha256"] for name, record in manifest.outputs.items()}
+
+
+class SdkCatalog:
+    """SDK目录下所有版本目录中的原始SDK zip"""
+
+    def __init__(self, root="SDK"):
+        self.root = Path(root)
+        self.path = self.root / CATALOG_NAME
+        # {版本目录名: 目录的修改时间}
+        self.dirs = {}
+        # {相对root的路径: CatalogEntry}
+        self.entries = {}
+        self.changed = False
+
+    @classmethod
+    def load(cls, root="SDK"):
+        """读取索引，不存在或损坏时返回空索引"""
+        catalog = cls(root)
+        try:
+            with open(catalog.path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != CATALOG_VERSION:
+                return catalog
+            catalog.dirs = data["dirs"]
+            catalog.entries = {
+                name: CatalogEntry(catalog.root / name, record["size"], record["mtime_ns"],
+                                   record["version_suffix"], record["status"],
+                                   record["outputs"],
+                                   SdkVersion.from_dict(record["sdk_version"])
+                                   if record["sdk_version"] else None,
+                                   record["manifest_signature"])
+                for name, record in data["entries"].items()}
+        except (OSError, ValueError, KeyError, TypeError):
+            catalog.dirs = {}
+            catalog.entries = {}
+        return catalog
+
+    def save(self):
+        """有变化时写入索引"""
+        if not self.changed or not self.root.is_dir():
+            return
+        write_json_atomic(self.path, {
+            "version": CATALOG_VERSION,
+            "dirs": self.dirs,
+            "entries": {name: entry.to_dict() for name, entry in self.entries.items()},
+        })
+        self.changed = False
+
+    def refresh(self):
+        """
+        增量更新：只重新扫描有变化的版本目录
+
+        新增、删除文件会改变目录的修改时间；原地替换同名文件（os.replace）不一定改变
+        目录的修改时间（例如时间戳精度较粗的文件系统），因此目录未变化时还会检查
+        已知的SDK zip与构建清单的大小、修改时间
+
+        Returns:
+            SdkCatalog: self
+        """
+        dirs = {}
+        if self.root.is_dir():
+            with os.scandir(self.root) as it:
+                for entry in it:
+                    if entry.is_dir() and not entry.name.startswith("."):
+                        dirs[entry.name] = entry.stat().st_mtime_ns
+
+        for name in set(self.dirs) - set(dirs):
+            self._drop_dir(name)
+        for name, mtime_ns in dirs.items():
+            if self.dirs.get(name) != mtime_ns or not self._dir_fresh(name):
+                self._scan_dir(name)
+                self.dirs[name] = mtime_ns
+                self.changed = True
+        return self
+
+    def _dir_fresh(self, name):
+        """目录中已知的SDK zip与构建清单是否都没有变化"""
+        prefix = f"{name}/"
+        for key, entry in self.entries.items():
+            if not key.startswith(prefix):
+                continue
+            if _signature(entry.path) != [entry.size, entry.mtime_ns]:
+                return False
+            if _signature(entry.manifest_path) != entry.manifest_signature:
+                return False
+        return True
+
+    def _drop_dir(self, name):
+        prefix = f"{name}/"
+        for key in [key for key in self.entries if key.startswith(prefix)]:
+            del self.entries[key]
+        del self.dirs[name]
+        self.changed = True
+
+    def _scan_dir(self, name):
+        prefix = f"{name}/"
+        seen = set()
+        with os.scandir(self.root / name) as it:
+            for dir_entry in it:
+                if not dir_entry.is_file() or not is_source_sdk_zip(dir_entry.name):
+                    continue
+                key = prefix + dir_entry.name
+                seen.add(key)
+                st = dir_entry.stat()
+                entry = self.entries.get(key)
+                if entry is None or (entry.size, entry.mtime_ns) != (st.st_size, st.st_mtime_ns):
+                    entry = CatalogEntry(self.root / key, st.st_size, st.st_mtime_ns,
+                                         version_suffix(dir_entry.name),
+                                         sdk_version=parse_sdk_version(dir_entry.name))
+                    self.entries[key] = entry
+                # 目录变化可能来自新生成或被删除的压缩包，重新判断处理状态
+                entry.manifest_signature = _signature(entry.manifest_path)
+                status, outputs = _processing_result(entry.path, entry.version_suffix)
+                if status == STATUS_PROCESSED or entry.status != STATUS_FAILED:
+                    entry.status, entry.outputs = status, outputs
+        for key in [key for key in self.entries if key.startswith(prefix) and key not in seen]:
+            del self.entries[key]
+
+    def record_result(self, sdk_zip, success):
+        """记录处理结果（失败的SDK在文件变化或处理成功前保持失败状态）"""
+        self.refresh()
+        try:
+            key = Path(sdk_zip).resolve().relative_to(self.root.resolve()).as_posix()
+        except ValueError:
+            return
+        entry = self.entries.get(key)
+        if entry is not None and not success and entry.status != STATUS_PROCESSED:
+            entry.status = STATUS_FAILED
+            self.changed = True
+
+    def sdk_files(self, include_processed=True):
+        """SDK zip列表（按修改时间从新到旧）"""
+        entries = [entry for entry in self.entries.values()
+                   if include_processed or not entry.processed]
+        return sorted(entries, key=lambda entry: entry.mtime_ns, reverse=True)
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SDK zip 索引模块
+只读取zip的中央目录（以及体积很小的符号链接成员），建立
+framework名称 -> 动态库成员、符号链接、Versions布局 的索引，
+解压与转换时无需再扫描文件系统或逐个路径探测
+"""
+
+import posixpath
+import stat
+
+from xcframework import (DEFAULT_PLATFORM, LEGACY_MACOS_IDENTIFIER, XCFrameworkError,
+                         parse_info_plist, select_library)
+
+# 符号链接最多跟随的层数，防止链接成环
+MAX_SYMLINK_DEPTH = 16
+
+
+def is_symlink(info):
+    """zip成员是否为符号链接（framework中的Versions/Current等）"""
+    return stat.S_ISLNK(info.external_attr >> 16)
+
+
+class FrameworkEntry:
+    """zip中的单个 .framework"""
+
+    def __init__(self, name, path):
+        # framework名称，例如 "AgoraRtcKit"
+        self.name = name
+        # framework目录在zip中的路径，例如 "libs/AgoraRtcKit.framework"
+        self.path = path
+        # 动态库成员（ZipInfo），找不到时为None
+        self.binary = None
+        # {成员路径: 链接目标}
+        self.symlinks = {}
+        # Versions目录下的实际版本目录，例如 ["A"]
+        self.versions = []
+        # Versions/Current 指向的版本
+        self.current_version = None
+
+    def __repr__(self):
+        binary = self.binary.filename if self.binary else None
+        return f"FrameworkEntry({self.name!r}, binary={binary!r})"
+
+
+class SdkZipIndex:
+    """基于zip中央目录建立的framework索引"""
+
+    def __init__(self, zip_ref, platform=DEFAULT_PLATFORM, variant=None, arch=None):
+        """
+        Args:
+            zip_ref: 已打开的 ZipFile
+            platform/variant/arch: xcframework中要选择的slice（默认macOS）
+        """
+        self.zip_ref = zip_ref
+        # {规范化成员路径: ZipInfo}，目录成员去掉末尾的 "/"
+        self.infos = {}
+        # {成员路径: 链接目标}
+        self.symlinks = {}
+        self.frameworks = []
+        # {xcframework路径: (选中的slice目录, framework相对路径)}，没有可用slice时为None
+        self.xcframeworks = {}
+
+        frameworks = {}
+        for info in zip_ref.infolist():
+            name = info.filename.rstrip('/')
+            self.infos[name] = info
+
+            parts = name.split('/')
+            innermost = None
+            for i, part in enumerate(parts):
+                if part.endswith('.framework'):
+                    prefix = '/'.join(parts[:i + 1])
+                    if prefix not in frameworks:
+                        entry = FrameworkEntry(part[:-len('.framework')], prefix)
+                        frameworks[prefix] = entry
+                        self.frameworks.append(entry)
+                    innermost = (frameworks[prefix], i)
+            if innermost is None:
+                continue
+
+            entry, depth = innermost
+            rest = parts[depth + 1:]
+            if len(rest) >= 2 and rest[0] == "Versions" and rest[1] != "Current":
+                if rest[1] not in entry.versions:
+                    entry.versions.append(rest[1])
+            if is_symlink(info):
+                target = zip_ref.read(info).decode('utf-8')
+                self.symlinks[name] = target
+                entry.symlinks[name] = target
+                if rest == ["Versions", "Current"]:
+                    entry.current_version = target.rstrip('/')
+
+        # xcframework中只保留选中的slice，iOS、模拟器等slice不参与转换，也不会覆盖同名输出
+        self.frameworks = [entry for entry in self.frameworks
+                           if self._in_selected_slice(entry, platform, variant, arch)]
+        for entry in self.frameworks:
+            entry.binary = self._find_binary(entry)
+
+    def _select_xcframework(self, xcframework, platform, variant, arch):
+        """读取一次xcframework的 Info.plist 并选出slice"""
+        info = self.infos.get(f"{xcframework}/Info.plist")
+        try:
+            if info is None:
+                raise XCFrameworkError("缺少 Info.plist")
+            library = select_library(parse_info_plist(self.zip_ref.read(info)),
+                                     platform, variant, arch)
+        except XCFrameworkError:
+            # 没有 Info.plist 的旧版SDK，沿用固定的macOS slice目录
+            if platform == DEFAULT_PLATFORM and variant is None:
+                return LEGACY_MACOS_IDENTIFIER, None
+            return None
+        if library is None:
+            return None
+        return library.identifier, library.library_path
+
+    def _in_selected_slice(self, entry, platform, variant, arch):
+        parts = entry.path.split('/')
+        for i, part in enumerate(parts):
+            if part.endswith('.xcframework'):
+                break
+        else:
+            return True
+        xcframework = '/'.join(parts[:i + 1])
+        if xcframework not in self.xcframeworks:
+            self.xcframeworks[xcframework] = self._select_xcframework(
+                xcframework, platform, variant, arch)
+        selected = self.xcframeworks[xcframework]
+        rest = parts[i + 1:]
+        if selected is None or not rest or rest[0] != selected[0]:
+            return False
+        library_path = selected[1]
+        # 选中slice中的framework（以及其中嵌套的framework）
+        return library_path is None or (len(rest) > 1 and rest[1] == library_path)
+
+    def _find_binary(self, entry):
+        """按 Versions/A、Versions/Current、Versions/B、扁平布局 的顺序查找动态库"""
+        possible_paths = [
+            f"{entry.path}/Versions/A/{entry.name}",
+            f"{entry.path}/Versions/Current/{entry.name}",
+            f"{entry.path}/Versions/B/{entry.name}",
+            f"{entry.path}/{entry.name}"
+        ]
+        for path in possible_paths:
+            info = self.resolve(path)
+            if info is not None:
+                return info
+        return None
+
+    def resolve(self, path, depth=0):
+        """
+        沿符号链接解析zip内路径
+
+        Args:
+            path: zip内路径
+
+        Returns:
+            ZipInfo: 最终指向的普通文件成员，不存在时返回None
+        """
+        parts = path.split('/')
+        resolved = ''
+        for i, part in enumerate(parts):
+            candidate = f"{resolved}/{part}" if resolved else part
+            target = self.symlinks.get(candidate)
+            if target is not None:
+                if depth >= MAX_SYMLINK_DEPTH:
+                    return None
+                linked = posixpath.normpath(posixpath.join(posixpath.dirname(candidate), target))
+                remaining = parts[i + 1:]
+                return self.resolve('/'.join([linked] + remaining), depth + 1)
+            resolved = candidate
+
+        info = self.infos.get(resolved)
+        if info is None or info.is_dir() or is_symlink(info):
+            return None
+        return info
+
+    def needed_members(self, exclude=()):
+        """
+        转换所需的成员（每个framework的动态库，去重并保持顺序）
+
+        Args:
+            exclude: 不需要的framework名称（例如可以沿用上次结果的framework）
+        """
+        members = {}
+        for entry in self.frameworks:
+            if entry.binary is not None and entry.name not in exclude:
+                members.setdefault(entry.binary.filename, entry.binary)
+        return list(members.values())
+
+    def __iter__(self):
+        return iter(self.frameworks)
+
+    def __len__(self):
+        return len(self.frameworks)
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+处理过程度量模块
+记录每个阶段的墙钟时间、CPU时间、读写字节数与峰值内存，
+可输出为JSON或便于阅读的表格
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+import unicodedata
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def _read_proc_io():
+    """Linux下从 /proc/self/io 读取进程累计读写字节数"""
+    try:
+        with open("/proc/self/io") as f:
+            values = dict(line.split(":", 1) for line in f if ":" in line)
+        return int(values["rchar"]), int(values["wchar"])
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def io_counters():
+    """
+    进程累计读写字节数
+
+    Linux使用 /proc/self/io 的 rchar/wchar（不含mmap访问），
+    其他平台退回到 getrusage 的块计数（按512字节估算）。
+    """
+    counters = _read_proc_io()
+    if counters is not None:
+        return counters
+    if resource is not None:
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        return usage.ru_inblock * 512, usage.ru_oublock * 512
+    return 0, 0
+
+
+def peak_rss():
+    """进程峰值常驻内存（字节）"""
+    if resource is None:
+        return 0
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS返回字节，Linux返回KB
+    return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+
+class StageRecord:
+    """单个阶段的度量结果"""
+
+    def __init__(self, name, start, wall_time, cpu_time, thread_cpu_time,
+                 read_bytes, write_bytes, peak_rss, extra=None):
+        self.name = name
+        self.start = start
+        self.wall_time = wall_time
+        self.cpu_time = cpu_time
+        self.thread_cpu_time = thread_cpu_time
+        self.read_bytes = read_bytes
+        self.write_bytes = write_bytes
+        self.peak_rss = peak_rss
+        self.extra = extra or {}
+
+    def to_dict(self):
+        data = {
+            "name": self.name,
+            "start": round(self.start, 6),
+            "wall_time": round(self.wall_time, 6),
+            "cpu_time": round(self.cpu_time, 6),
+            "thread_cpu_time": round(self.thread_cpu_time, 6),
+            "read_bytes": self.read_bytes,
+            "write_bytes": self.write_bytes,
+            "peak_rss": self.peak_rss,
+        }
+        data.update(self.extra)
+        return data
+
+
+class MetricsRecorder:
+    """
+    阶段度量记录器（线程安全）
+
+    cpu_time 与读写字节数是进程级计数，并行执行的阶段之间会互相包含；
+    thread_cpu_time 只统计执行该阶段的线程。
+    """
+
+    def __init__(self):
+        self.records = []
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name, **extra):
+        """
+        记录一个阶段，extra中的值会附加到结果里；
+        with块中可以修改返回的字典补充结果（例如输出文件大小）
+        """
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        thread_start = time.thread_time()
+        read_start, write_start = io_counters()
+        details = dict(extra)
+        try:
+            yield details
+        finally:
+            read_end, write_end = io_counters()
+            record = StageRecord(name, wall_start - self._origin,
+                                 time.perf_counter() - wall_start,
+                                 time.process_time() - cpu_start,
+                                 time.thread_time() - thread_start,
+                                 read_end - read_start, write_end - write_start,
+                                 peak_rss(), details)
+            with self._lock:
+                self.records.append(record)
+
+    def to_dict(self):
+        with self._lock:
+            records = sorted(self.records, key=lambda record: record.start)
+        return {
+            "pid": os.getpid(),
+            "total_wall_time": round(time.perf_counter() - self._origin, 6),
+            "peak_rss": peak_rss(),
+            "stages": [record.to_dict() for record in records],
+        }
+
+    def write_json(self, path):
+        """把度量结果写入JSON文件"""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+
+    def format_table(self):
+        """返回便于阅读的阶段度量表格"""
+        return format_metrics_table(self.to_dict())
+
+
+def _display_width(text):
+    """终端显示宽度（中文等全角字符占两列）"""
+    return sum(2 if unicodedata.east_asian_width(ch) in "WF" else 1 for ch in text)
+
+
+def _cell(text, width, left=False):
+    padding = " " * max(0, width - _display_width(text))
+    return text + padding if left else padding + text
+
+
+def format_metrics_table(metrics):
+    """把 to_dict() 的结果格式化为表格"""
+    mb = 1024 * 1024
+    headers = ["阶段", "墙钟(s)", "CPU(s)", "读取(MB)", "写入(MB)", "峰值RSS(MB)"]
+    rows = []
+    for stage in metrics["stages"]:
+        rows.append([stage["name"], f"{stage['wall_time']:.3f}", f"{stage['cpu_time']:.3f}",
+                     f"{stage['read_bytes'] / mb:.1f}", f"{stage['write_bytes'] / mb:.1f}",
+                     f"{stage['peak_rss'] / mb:.1f}"])
+    total = ["total", f"{metrics['total_wall_time']:.3f}", "", "", "",
+             f"{metrics['peak_rss'] / mb:.1f}"]
+
+    widths = [max(_display_width(row[i]) for row in [headers, total] + rows) + 2
+              for i in range(len(headers))]
+
+    def line(row):
+        return "".join(_cell(value, widths[i], left=(i == 0)) for i, value in enumerate(row))
+
+    separator = "-" * sum(widths)
+    return "\n".join([line(headers), separator] + [line(row) for row in rows] +
+                     [separator, line(total)])
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+流水线模块
+每个成员的读取、改写与压缩作为一个任务提交到线程池，任务一完成就按顺序写入压缩包，
+写入与后续成员的转换同时进行；任务队列长度有限，内存中最多同时保留 max_pending 个成员，
+总耗时接近最慢的一个阶段，而不是所有阶段之和；
+提供 ResourceBudget 时按顺序放行任务，已提交但尚未写入的任务占用的内存与磁盘不超过上限
+"""
+
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+
+def _inherit_context(context):
+    for var, value in context.items():
+        var.set(value)
+
+
+def context_executor(max_workers):
+    """
+    线程池，工作线程继承创建线程的contextvars
+
+    例如处理服务按任务收集日志，任务中创建的线程池打印的进度也写入该任务的日志
+    """
+    return ThreadPoolExecutor(max_workers=max_workers, initializer=_inherit_context,
+                              initargs=(contextvars.copy_context(),))
+
+
+class PipelineError(Exception):
+    """流水线中的某个任务失败"""
+
+
+class ResourceBudget:
+    """
+    内存与磁盘预算
+
+    每个任务带有预估的 (内存, 磁盘) 占用，放行时计入、写入压缩包后释放；
+    单个任务超过预算时在没有其他任务占用资源时单独执行，不会卡住流水线
+    """
+
+    def __init__(self, max_memory=None, max_disk=None):
+        # 上限（字节），None 表示不限制
+        self.limits = (max_memory, max_disk)
+        self.used = [0, 0]
+        # 已放行但尚未释放的任务数
+        self.held = 0
+        # 放行过的最大占用，用于报告
+        self.peak = [0, 0]
+
+    def fits(self, cost):
+        if not self.held:
+            return True
+        return all(limit is None or used + amount <= limit
+                   for used, amount, limit in zip(self.used, cost, self.limits))
+
+    def acquire(self, cost):
+        self.held += 1
+        for i, amount in enumerate(cost):
+            self.used[i] += amount
+            self.peak[i] = max(self.peak[i], self.used[i])
+
+    def release(self, cost):
+        self.held -= 1
+        for i, amount in enumerate(cost):
+            self.used[i] -= amount
+
+
+async def _close_pending(futures):
+    """失败后等待已提交但尚未写入的任务结束，并释放它们的成员"""
+    for future in futures:
+        try:
+            member = await future
+        except BaseException:
+            continue
+        if member is not None:
+            member.close()
+
+
+async def _run(sources, sink, executor, writer, max_pending, costs, budget):
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue(maxsize=max_pending)
+    # 预算释放时唤醒等待放行的生产端
+    released = asyncio.Condition()
+    # 已提交但尚未写入的任务（按提交顺序）
+    pending = []
+
+    async def produce():
+        for index, source in enumerate(sources):
+            cost = costs[index] if costs is not None else (0, 0)
+            if budget is not None:
+                async with released:
+                    await released.wait_for(lambda: budget.fits(cost))
+                    budget.acquire(cost)
+            if callable(source):
+                future = loop.run_in_executor(executor, source)
+            else:
+                future = loop.create_future()
+                future.set_result(source)
+            pending.append(future)
+            # 队列已满时等待写入端取走，限制同时在内存中的成员数量
+            await queue.put((future, cost))
+        await queue.put(None)
+
+    async def consume():
+        count = 0
+        while True:
+            item = await queue.get()
+            if item is None:
+                return count
+            future, cost = item
+            member = await future
+            pending.remove(future)
+            if member is None:
+                raise PipelineError("转换任务失败")
+            try:
+                await loop.run_in_executor(writer, sink, member)
+            finally:
+                member.close()
+            if budget is not None:
+                async with released:
+                    budget.release(cost)
+                    released.notify_all()
+            count += 1
+
+    producer = asyncio.ensure_future(produce())
+    try:
+        count = await consume()
+        await producer
+        return count
+    except BaseException:
+        producer.cancel()
+        try:
+            await producer
+        except BaseException:
+            pass
+        await _close_pending(pending)
+        raise
+
+
+def run_pipeline(sources, sink, executor, max_pending=4, costs=None, budget=None):
+    """
+    运行流水线
+
+    Args:
+        sources: 按写入顺序排列的来源，每一项是已经准备好的 CompressedMember，
+                 或返回 CompressedMember 的无参函数（返回None表示失败）
+        sink: 写入函数，按顺序在单独的写入线程中以每个成员调用一次，返回后成员即被关闭
+        executor: 执行转换任务的线程池
+        max_pending: 同时提交（已完成但尚未写入的也算在内）的任务数上限
+        costs: 与sources一一对应的预估占用 (内存字节数, 磁盘字节数)
+        budget: ResourceBudget，None 表示只按 max_pending 限制
+
+    Returns:
+        int: 写入的成员数量
+    """
+    with context_executor(1) as writer:
+        return asyncio.run(_run(sources, sink, executor, writer, max(1, max_pending),
+                                costs, budget))
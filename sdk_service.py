@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SDK 处理服务模块
+长期运行的本地HTTP服务（默认只监听127.0.0.1），通过JSON接口提交SDK处理任务，
+任务在共享的线程池中执行并共享同一个转换缓存，省去每个任务启动Python进程与导入模块的开销；
+每个任务使用独立的工作目录，输出文件相同的任务按提交顺序依次执行；
+SDK文件与输出目录必须位于服务的根目录（默认 SDK/）之内
+
+接口:
+    POST /jobs           提交任务 {"sdk_zip": 路径, "output_dir": 可选, "options": {...}}
+                         （Content-Type 必须为 application/json）
+    GET  /jobs           所有任务的状态
+    GET  /jobs/<id>      单个任务的状态、度量与输出文件（?log=1 时附带日志）
+    GET  /health         服务状态
+"""
+
+import argparse
+import collections
+import contextvars
+import io
+import itertools
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+from macho_slicer import parse_arch_option
+from sdk_batch import BatchResult, is_source_sdk_zip, prepare_options, run_job
+from sdk_version import version_suffix
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+# 保留的已完成任务数量，超过后丢弃最早完成的任务
+MAX_FINISHED_JOBS = 1000
+
+# 任务状态
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+# 客户端可以指定的处理参数（与 sdk_batch.process_batch 的options相同），
+# arch 为 --arch 的写法，max_memory/max_disk 以MB为单位；
+# 目录类参数（AED目录、转换输出目录、缓存目录等）只能由服务端设置，
+# 否则客户端可以让任务在工作目录之外解压或删除目录
+JOB_OPTIONS = {
+    "jobs": int, "stream": bool, "pipeline": bool, "cache": bool, "incremental": bool,
+    "compress_level": int, "compress_jobs": int, "store_compressed": bool, "verify_deps": bool,
+    "arch": str, "max_memory": int, "max_disk": int, "resume": bool,
+}
+
+
+class JobError(Exception):
+    """提交的任务参数无效"""
+
+
+# 当前任务的日志，任务中创建的线程池（并行转换、流水线、并行压缩）通过
+# sdk_pipeline.context_executor 继承
+_job_log = contextvars.ContextVar("job_log", default=None)
+
+
+class _JobLogRouter(io.TextIOBase):
+    """把任务（包括任务创建的工作线程）中的print输出写入各自任务的日志，其他输出照常打印"""
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def writable(self):
+        return True
+
+    def write(self, text):
+        buffer = _job_log.get()
+        return (buffer if buffer is not None else self.stream).write(text)
+
+    def flush(self):
+        self.stream.flush()
+
+
+class Job:
+    """一个SDK处理任务"""
+
+    def __init__(self, job_id, sdk_zip, output_dir, options):
+        self.id = job_id
+        self.sdk_zip = Path(sdk_zip)
+        self.output_dir = Path(output_dir)
+        self.options = options
+        self.status = QUEUED
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        # 处理结果（BatchResult）
+        self.result = None
+        self.log = io.StringIO()
+
+    def to_dict(self, include_log=False):
+        data = {
+            "id": self.id,
+            "sdk_zip": str(self.sdk_zip),
+            "output_dir": str(self.output_dir),
+            "status": self.status,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+        if self.result is not None:
+            data.update({
+                "success": self.result.success,
+                "duration": round(self.result.duration, 3),
+                "output_files": [str(path) for path in self.result.output_files],
+                "error": self.result.error,
+                "metrics": self.result.metrics,
+            })
+        if include_log:
+            data["log"] = self.log.getvalue()
+        return data
+
+
+class SdkService:
+    """任务队列、共享线程池与任务记录"""
+
+    def __init__(self, workers=2, options=None, root="SDK"):
+        """
+        Args:
+            workers: 同时处理的任务数
+            options: 所有任务的默认处理参数（缓存目录、AED目录等）
+            root: 根目录，任务只能读取其中的SDK文件并在其中生成压缩包与工作目录
+        """
+        self.workers = max(1, workers)
+        self.root = Path(root).resolve()
+        self.defaults = dict(options or {})
+        self.executor = ThreadPoolExecutor(max_workers=self.workers,
+                                           thread_name_prefix="sdk-job")
+        self.jobs = collections.OrderedDict()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        # 输出文件相同的任务共用一把锁，避免互相覆盖
+        self._output_locks = {}
+        self._router = None
+
+    def start(self):
+        """开始收集任务日志（替换sys.stdout）"""
+        self._router = _JobLogRouter(sys.stdout)
+        sys.stdout = self._router
+
+    def close(self):
+        """等待所有任务完成"""
+        self.executor.shutdown(wait=True)
+        if self._router is not None and sys.stdout is self._router:
+            sys.stdout = self._router.stream
+
+    def _job_options(self, options):
+        options = dict(options or {})
+        unknown = sorted(set(options) - set(JOB_OPTIONS))
+        if unknown:
+            raise JobError(f"不支持的参数: {', '.join(unknown)}")
+        for key, value in options.items():
+            expected = JOB_OPTIONS[key]
+            if value is not None and type(value) is not expected:
+                raise JobError(f"参数 {key} 应为 {expected.__name__}")
+        options = dict(self.defaults, **options)
+        try:
+            options["archs"] = parse_arch_option(options.pop("arch", None))
+        except ValueError as e:
+            raise JobError(str(e))
+        for key in ("max_memory", "max_disk"):
+            if options.get(key) is not None:
+                options[key] *= 1024 * 1024
+        return prepare_options(options, self.workers)
+
+    def submit(self, sdk_zip, output_dir=None, options=None):
+        """
+        提交任务
+
+        Returns:
+            Job: 新任务
+
+        Raises:
+            JobError: 参数无效
+        """
+        if not isinstance(sdk_zip, str) or not sdk_zip:
+            raise JobError("缺少 sdk_zip")
+        path = self._inside_root(sdk_zip)
+        if not path.is_file():
+            raise JobError(f"文件不存在: {sdk_zip}")
+        if not is_source_sdk_zip(path):
+            raise JobError(f"不是Agora Mac SDK压缩包: {path.name}")
+        if output_dir is not None and not isinstance(output_dir, str):
+            raise JobError("output_dir 应为字符串")
+        if options is not None and not isinstance(options, dict):
+            raise JobError("options 应为对象")
+        # 处理结束后会删除输出目录中的工作目录，不能指向根目录之外
+        output_dir = self._inside_root(output_dir) if output_dir else path.parent
+        job_options = self._job_options(options)
+
+        with self._lock:
+            job = Job(str(next(self._ids)), path, output_dir, job_options)
+            self.jobs[job.id] = job
+            self._prune()
+        self.executor.submit(self._run, job)
+        return job
+
+    def _inside_root(self, path):
+        """解析路径（相对路径相对于当前目录），不在根目录之内时抛出 JobError"""
+        resolved = Path(path).resolve()
+        if resolved != self.root and self.root not in resolved.parents:
+            raise JobError(f"路径不在服务根目录 {self.root} 之内: {path}")
+        return resolved
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self.jobs.items()
+                    if job.status in (SUCCEEDED, FAILED)]
+        for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self.jobs[job_id]
+
+    def _output_lock(self, job):
+        key = (str(job.output_dir.resolve()), version_suffix(job.sdk_zip.name))
+        with self._lock:
+            return self._output_locks.setdefault(key, threading.Lock())
+
+    def _run(self, job):
+        with self._output_lock(job):
+            job.status = RUNNING
+            job.started_at = time.time()
+            token = _job_log.set(job.log)
+            try:
+                result = run_job(job.sdk_zip, job.output_dir, job.options, capture=False)
+            except Exception as e:
+                result = BatchResult(job.sdk_zip, False, time.time() - job.started_at,
+                                     error=str(e))
+            finally:
+                _job_log.reset(token)
+            job.result = result
+            job.finished_at = time.time()
+            job.status = SUCCEEDED if result.success else FAILED
+
+    def get(self, job_id):
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    def list(self):
+        with self._lock:
+            return list(self.jobs.values())
+
+    def health(self):
+        jobs = self.list()
+        counts = collections.Counter(job.status for job in jobs)
+        return {"ok": True, "workers": self.workers,
+                **{status: counts.get(status, 0) for status in (QUEUED, RUNNING, SUCCEEDED, FAILED)}}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """JSON接口"""
+
+    # 由 create_server 设置
+    service = None
+
+    def _send(self, status, data):
+        body = json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        parts = [part for part in url.path.split("/") if part]
+        if parts == ["health"]:
+            self._send(200, self.service.health())
+        elif parts == ["jobs"]:
+            self._send(200, {"jobs": [job.to_dict() for job in self.service.list()]})
+        elif len(parts) == 2 and parts[0] == "jobs":
+            job = self.service.get(parts[1])
+            if job is None:
+                self._send(404, {"error": f"任务不存在: {parts[1]}"})
+                return
+            include_log = parse_qs(url.query).get("log", ["0"])[0] not in ("0", "")
+            self._send(200, job.to_dict(include_log))
+        else:
+            self._send(404, {"error": f"未知路径: {url.path}"})
+
+    def do_POST(self):
+        if urlparse(self.path).path.rstrip("/") != "/jobs":
+            self._send(404, {"error": f"未知路径: {self.path}"})
+            return
+        # 浏览器跨站提交的表单或text/plain请求不能带application/json，拒绝这类请求
+        if self.headers.get_content_type() != "application/json":
+            self._send(415, {"error": "Content-Type 应为 application/json"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            request = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(request, dict):
+                raise JobError("请求体应为JSON对象")
+            job = self.service.submit(request.get("sdk_zip"), request.get("output_dir"),
+                                      request.get("options"))
+        except (ValueError, JobError) as e:
+            self._send(400, {"error": str(e)})
+            return
+        self._send(202, job.to_dict())
+
+    def log_message(self, format, *args):
+        # 请求日志写到stderr，不混入任务日志
+        sys.stderr.write(f"🌐 {self.address_string()} {format % args}\n")
+
+
+def create_server(service, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    """创建HTTP服务（port为0时使用随机端口）"""
+    handler = type("SdkServiceHandler", (_Handler,), {"service": service})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="SDK处理服务：通过本地HTTP JSON接口提交任务",
+        epilog="示例:\n"
+               "  python sdk_service.py --workers 4\n"
+               "  curl -X POST localhost:8765/jobs -H 'Content-Type: application/json' -d '{\"sdk_zip\": \"SDK/25.8.21/xxx.zip\"}'\n"
+               "  curl localhost:8765/jobs/1",
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"监听地址（默认{DEFAULT_HOST}）")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"监听端口（默认{DEFAULT_PORT}）")
+    parser.add_argument("--workers", type=int, default=2, help="同时处理的任务数（默认2）")
+    parser.add_argument("--root", default="SDK",
+                        help="根目录，只处理其中的SDK文件并输出到其中（默认 SDK）")
+    parser.add_argument("--aed-dir", default="SDK/aed", help="默认的AED文件目录（默认 SDK/aed）")
+    parser.add_argument("--cache-dir", help="共享的转换缓存目录（默认 ~/.cache/framework_to_dylib）")
+    parser.add_argument("--cache-max-size", type=int, default=2048, help="转换缓存大小上限（MB，默认2048）")
+    args = parser.parse_args()
+
+    service = SdkService(args.workers, {
+        "aed_dir": args.aed_dir,
+        "cache_dir": args.cache_dir,
+        "cache_max_bytes": args.cache_max_size * 1024 * 1024,
+    }, args.root)
+    try:
+        server = create_server(service, args.host, args.port)
+    except OSError as e:
+        print(f"❌ 无法监听 {args.host}:{args.port}: {e}")
+        sys.exit(1)
+    service.start()
+    host, port = server.server_address[:2]
+    print(f"🚀 SDK处理服务已启动: http://{host}:{port}（工作线程 {service.workers}）")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 停止服务，等待正在处理的任务完成...")
+    finally:
+        server.server_close()
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
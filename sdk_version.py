@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SDK 版本解析模块
+用预编译的正则表达式解析Agora SDK zip文件名中的版本、构建号、FULL/VOICE等变体、日期、时间与哈希，
+得到的 SdkVersion 供输出文件名、批量任务去重与SDK索引共用；
+可以通过 register_pattern 注册其他命名规则，解析结果按文件名缓存，适合对大量文件名建立索引
+"""
+
+import functools
+import re
+import zlib
+
+# Agora SDK 命名规则，例如
+#   Agora_Native_SDK_for_Mac_rel.v4.4.30_25321_FULL_20250820_1052_846534.zip
+#   Agora_Native_SDK_for_Mac_v4.5.0_VOICE.zip
+AGORA_PATTERN = re.compile(
+    r"(?:^|_)(?:(?P<channel>[A-Za-z]+)\.)?"
+    r"v(?P<version>\d+(?:\.\d+){1,3})"
+    r"(?:_(?P<build>\d+))?"
+    r"(?:_(?P<variant>[A-Z][A-Z0-9]*))?"
+    r"(?:_(?P<date>\d{8})(?:_(?P<time>\d{4}))?)?"
+    r"(?:_(?P<hash>[0-9a-fA-F]+))?"
+    r"(?P<extra>(?:[_.-].*)?)$")
+
+# 依次尝试的命名规则（register_pattern 注册的规则优先）
+_PATTERNS = [AGORA_PATTERN]
+
+# 无法识别版本时后缀中保留的字符
+_UNSAFE_CHARS = re.compile(r"[^0-9A-Za-z._-]+")
+_SDK_PREFIX = re.compile(r"^Agora_Native_SDK_for_Mac[_.-]*")
+
+
+class SdkVersion:
+    """
+    从SDK zip文件名中解析出的版本信息
+
+    不可修改：parse_sdk_version 的缓存把同一个对象返回给所有调用者（索引、批量任务等）
+    """
+
+    __slots__ = ("version", "build", "variant", "date", "time", "hash", "channel", "extra",
+                 "suffix")
+
+    def __init__(self, version, build=None, variant=None, date=None, time=None, hash=None,
+                 channel=None, extra="", suffix=None):
+        fields = {
+            # "4.4.30"
+            "version": version,
+            # 构建号，例如 "25321"
+            "build": build,
+            # "FULL"、"VOICE" 等
+            "variant": variant,
+            # "20250820"、"1052"
+            "date": date,
+            "time": time,
+            "hash": hash,
+            # 发布通道，例如 "rel"
+            "channel": channel,
+            # 无法归入以上字段的剩余部分
+            "extra": extra,
+            # 输出文件名中使用的后缀，例如 "v4.4.30_25321_FULL_20250820_1052_846534"
+            "suffix": suffix or f"v{version}",
+        }
+        for name, value in fields.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"SdkVersion 不可修改: {name}")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"SdkVersion 不可修改: {name}")
+
+    @property
+    def version_tuple(self):
+        """用于比较的版本号，例如 (4, 4, 30)"""
+        return tuple(int(part) for part in self.version.split("."))
+
+    def describe(self):
+        """用于日志的简短描述"""
+        details = [f"构建 {self.build}" if self.build else None, self.variant]
+        if self.date:
+            stamp = f"{self.date[:4]}-{self.date[4:6]}-{self.date[6:]}"
+            if self.time:
+                stamp += f" {self.time[:2]}:{self.time[2:]}"
+            details.append(stamp)
+        details = [detail for detail in details if detail]
+        return f"v{self.version}" + (f"（{'，'.join(details)}）" if details else "")
+
+    def to_dict(self):
+        return {"version": self.version, "build": self.build, "variant": self.variant,
+                "date": self.date, "time": self.time, "hash": self.hash,
+                "channel": self.channel, "extra": self.extra, "suffix": self.suffix}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+    def __eq__(self, other):
+        return isinstance(other, SdkVersion) and self.to_dict() == other.to_dict()
+
+    def __hash__(self):
+        return hash(tuple(self.to_dict().values()))
+
+    def __reduce__(self):
+        # 字段只能通过构造函数设置（批量任务在进程间传递时需要）
+        return (SdkVersion, tuple(self.to_dict().values()))
+
+    def __repr__(self):
+        return f"SdkVersion({self.suffix!r})"
+
+
+def register_pattern(pattern):
+    """
+    注册其他命名规则（优先于已有规则）
+
+    Args:
+        pattern: 字符串或已编译的正则表达式，必须包含命名组 version，
+                 可以包含 build、variant、date、time、hash、channel、extra，
+                 作用于去掉 .zip 扩展名的文件名；后缀从 version 前的 "v" 开始
+    """
+    pattern = re.compile(pattern) if isinstance(pattern, str) else pattern
+    if "version" not in pattern.groupindex:
+        raise ValueError("命名规则必须包含命名组 version")
+    _PATTERNS.insert(0, pattern)
+    parse_sdk_version.cache_clear()
+
+
+def _stem(zip_filename):
+    return zip_filename[:-4] if zip_filename.lower().endswith(".zip") else zip_filename
+
+
+@functools.lru_cache(maxsize=4096)
+def parse_sdk_version(zip_filename):
+    """
+    解析SDK zip文件名（不含目录）
+
+    Returns:
+        SdkVersion: 无法识别版本号时返回None
+    """
+    stem = _stem(zip_filename)
+    for pattern in _PATTERNS:
+        match = pattern.search(stem)
+        if match is None:
+            continue
+        groups = match.groupdict()
+        start = match.start("version")
+        # 后缀从版本号前的 "v" 开始到文件名结尾，与之前生成的文件名保持一致
+        if start > 0 and stem[start - 1] in "vV":
+            start -= 1
+        return SdkVersion(groups["version"], groups.get("build"), groups.get("variant"),
+                          groups.get("date"), groups.get("time"), groups.get("hash"),
+                          groups.get("channel"), groups.get("extra") or "",
+                          suffix=stem[start:])
+    return None
+
+
+def version_suffix(zip_filename):
+    """
+    输出文件名中使用的后缀
+
+    无法识别版本号时使用 "unknown_<文件名>"，不同的SDK不会生成同名的压缩包
+    """
+    sdk_version = parse_sdk_version(zip_filename)
+    if sdk_version is not None:
+        return sdk_version.suffix
+    name = _UNSAFE_CHARS.sub("_", _SDK_PREFIX.sub("", _stem(zip_filename))).strip("._-")
+    if not name:
+        # 文件名中没有可用的字符，使用文件名的CRC区分
+        name = f"{zlib.crc32(zip_filename.encode('utf-8')):08x}"
+    return f"unknown_{name}"
@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SDK 目录监听模块
+长期运行，监听 SDK/ 目录树（Linux下通过ctypes调用inotify，其他平台或inotify不可用时定时扫描），
+新放入的 Agora_Native_SDK_for_Mac*.zip 大小与修改时间稳定且zip结构完整后才会被处理，
+处理任务交给固定大小的工作池执行，压缩包生成在SDK文件所在目录
+"""
+
+import argparse
+import collections
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+
+from build_manifest import file_signature
+from sdk_batch import (BatchResult, is_source_sdk_zip, prepare_options, print_batch_summary,
+                       run_job)
+
+# inotify 事件（linux/inotify.h）
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+_WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE_SELF
+# struct inotify_event { int wd; uint32_t mask, cookie, len; char name[]; }
+_EVENT_HEADER = struct.Struct("iIII")
+
+# 文件大小与修改时间保持不变多久后才认为写入完成（秒）
+DEFAULT_SETTLE = 10.0
+DEFAULT_POLL_INTERVAL = 2.0
+
+
+def _is_hidden(path, root):
+    """跳过隐藏文件与目录（批量处理的工作目录、压缩包写入时的临时文件等）"""
+    try:
+        parts = Path(path).relative_to(root).parts
+    except ValueError:
+        parts = Path(path).parts
+    return any(part.startswith(".") for part in parts)
+
+
+class PollingWatcher:
+    """定时扫描目录树，返回新增或大小、修改时间变化的文件"""
+
+    def __init__(self, root, interval=DEFAULT_POLL_INTERVAL):
+        self.root = Path(root)
+        self.interval = interval
+        self.snapshot = self._scan()
+
+    def _scan(self):
+        snapshot = {}
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            dirnames[:] = [name for name in dirnames if not name.startswith(".")]
+            for name in filenames:
+                path = Path(dirpath) / name
+                try:
+                    st = path.stat()
+                except OSError:
+                    continue
+                snapshot[path] = (st.st_size, st.st_mtime_ns)
+        return snapshot
+
+    def existing(self):
+        return list(self.snapshot)
+
+    def poll(self, timeout):
+        """等待至多timeout秒（不超过扫描间隔），返回发生变化的文件路径集合"""
+        time.sleep(min(timeout, self.interval))
+        snapshot = self._scan()
+        changed = {path for path, signature in snapshot.items()
+                   if self.snapshot.get(path) != signature}
+        self.snapshot = snapshot
+        return changed
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """通过inotify监听目录树（新建的子目录会自动加入监听）"""
+
+    def __init__(self, root):
+        self.root = Path(root)
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._add_watch_fn = libc.inotify_add_watch
+        self._add_watch_fn.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, f"inotify_init1 失败: {os.strerror(errno)}")
+        # {watch描述符: 目录}
+        self.watches = {}
+        self._initial = []
+        try:
+            self._initial = self._add_tree(self.root)
+        except BaseException:
+            os.close(self.fd)
+            raise
+
+    def _add_watch(self, directory):
+        wd = self._add_watch_fn(self.fd, os.fsencode(directory), _WATCH_MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, f"无法监听 {directory}: {os.strerror(errno)}")
+        self.watches[wd] = Path(directory)
+
+    def _add_tree(self, directory):
+        """监听目录及其子目录，返回其中已有的文件（监听建立前写入的文件不会产生事件）"""
+        files = []
+        for dirpath, dirnames, filenames in os.walk(directory):
+            dirnames[:] = [name for name in dirnames if not name.startswith(".")]
+            self._add_watch(dirpath)
+            files.extend(Path(dirpath) / name for name in filenames)
+        return files
+
+    def existing(self):
+        return list(self._initial)
+
+    def poll(self, timeout):
+        """等待至多timeout秒，返回发生变化的文件路径集合"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        changed = set()
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            changed.update(self._parse(data))
+        return changed
+
+    def _parse(self, data):
+        changed = set()
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            raw_name = data[offset + _EVENT_HEADER.size:offset + _EVENT_HEADER.size + length]
+            offset += _EVENT_HEADER.size + length
+            name = os.fsdecode(raw_name.rstrip(b"\0"))
+            if mask & IN_Q_OVERFLOW:
+                # 事件队列溢出，重新扫描整个目录树
+                changed.update(self._add_tree(self.root))
+                continue
+            if mask & IN_IGNORED:
+                self.watches.pop(wd, None)
+                continue
+            directory = self.watches.get(wd)
+            if directory is None or not name:
+                continue
+            path = directory / name
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO) and not name.startswith("."):
+                    try:
+                        changed.update(self._add_tree(path))
+                    except OSError:
+                        # 目录刚创建就被删除
+                        pass
+                continue
+            changed.add(path)
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+def create_watcher(root, poll_interval=DEFAULT_POLL_INTERVAL, use_inotify=True):
+    """优先使用inotify，不可用时（非Linux、达到监听数上限等）改为定时扫描"""
+    if use_inotify and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(root)
+        except (OSError, AttributeError) as e:
+            print(f"⚠️  inotify不可用，改为每 {poll_interval:g} 秒扫描一次: {e}")
+    return PollingWatcher(root, poll_interval)
+
+
+class SettleTracker:
+    """去抖：文件大小与修改时间在settle秒内没有变化、且zip结构完整后才算写入完成"""
+
+    def __init__(self, settle=DEFAULT_SETTLE):
+        self.settle = settle
+        # {路径: (文件签名, 签名最后一次变化的时间)}
+        self.pending = {}
+
+    def touch(self, path, now=None):
+        """记录发生变化的文件"""
+        now = time.monotonic() if now is None else now
+        try:
+            signature = file_signature(path)
+        except OSError:
+            self.pending.pop(path, None)
+            return
+        previous = self.pending.get(path)
+        if previous is None or previous[0] != signature:
+            self.pending[path] = (signature, now)
+
+    def ready(self, now=None):
+        """返回已经写入完成的文件及其签名 [(路径, 签名)]"""
+        now = time.monotonic() if now is None else now
+        ready = []
+        for path, (signature, since) in list(self.pending.items()):
+            try:
+                current = file_signature(path)
+            except OSError:
+                # 文件被删除或移走
+                del self.pending[path]
+                continue
+            if current != signature:
+                self.pending[path] = (current, now)
+            elif now - since >= self.settle:
+                del self.pending[path]
+                # 写入中断或仍在复制的zip缺少中央目录，等待下一次变化
+                if zipfile.is_zipfile(path):
+                    ready.append((path, signature))
+                else:
+                    print(f"⚠️  {path.name} 不是完整的zip文件，等待其写入完成")
+        return ready
+
+
+class SdkWatcher:
+    """监听SDK目录并把新放入的SDK zip交给工作池处理"""
+
+    def __init__(self, root="SDK", options=None, workers=2, settle=DEFAULT_SETTLE,
+                 poll_interval=DEFAULT_POLL_INTERVAL, use_inotify=True, process_existing=False):
+        """
+        Args:
+            root: 监听的目录
+            options: 处理参数（与 sdk_batch.process_batch 的options相同）
+            workers: 同时处理的SDK数量
+            settle: 文件保持不变多久后开始处理（秒）
+            poll_interval: 定时扫描的间隔（秒，inotify不可用时）
+            use_inotify: 是否尝试使用inotify
+            process_existing: 启动时是否处理目录中已有的SDK zip
+        """
+        self.root = Path(root)
+        self.workers = max(1, workers)
+        self.options = prepare_options(options, self.workers)
+        self.poll_interval = poll_interval
+        self.watcher = create_watcher(self.root, poll_interval, use_inotify)
+        self.tracker = SettleTracker(settle)
+        # 等待处理的SDK zip（工作池已满时排队）
+        self.queue = collections.deque()
+        # 正在处理的任务 {路径: (future, 签名)}
+        self.running = {}
+        # 已处理的SDK zip {路径: 处理时的签名}，内容不变时不会重复处理
+        self.processed = {}
+        # 所有已完成任务的结果
+        self.results = []
+        if self.workers == 1:
+            # 单个工作线程在当前进程中处理，日志直接输出
+            self.executor = ThreadPoolExecutor(max_workers=1)
+        else:
+            self.executor = ProcessPoolExecutor(max_workers=self.workers)
+
+        existing = [path for path in self.watcher.existing() if self._is_candidate(path)]
+        for path in existing:
+            if process_existing:
+                self.tracker.touch(path)
+            else:
+                try:
+                    self.processed[path] = file_signature(path)
+                except OSError:
+                    pass
+
+    def _is_candidate(self, path):
+        return is_source_sdk_zip(path) and not _is_hidden(path, self.root)
+
+    def step(self, timeout=1.0):
+        """
+        处理一轮：接收文件变化、取出写入完成的zip、提交任务、收集已完成的任务
+
+        Returns:
+            list: 本轮完成的 BatchResult
+        """
+        # 有文件等待稳定时定期醒来检查
+        if self.tracker.pending or self.running:
+            timeout = min(timeout, self.poll_interval, max(self.tracker.settle, 0.1))
+        for path in self.watcher.poll(timeout):
+            if self._is_candidate(path):
+                self.tracker.touch(path)
+
+        for path, signature in self.tracker.ready():
+            if self.processed.get(path) == signature:
+                continue
+            if path not in self.queue and path not in self.running:
+                print(f"📥 发现新的SDK: {path}")
+                self.queue.append(path)
+
+        finished = self._collect()
+        self._submit()
+        return finished
+
+    def _submit(self):
+        while self.queue and len(self.running) < self.workers:
+            path = self.queue.popleft()
+            try:
+                signature = file_signature(path)
+            except OSError:
+                continue
+            capture = not isinstance(self.executor, ThreadPoolExecutor)
+            future = self.executor.submit(run_job, path, path.parent, self.options, capture)
+            self.running[path] = (future, signature)
+            print(f"🚀 开始处理: {path.name}（处理中 {len(self.running)}/{self.workers}）")
+
+    def _collect(self):
+        finished = []
+        for path, (future, signature) in list(self.running.items()):
+            if not future.done():
+                continue
+            del self.running[path]
+            try:
+                result = future.result()
+            except Exception as e:
+                result = BatchResult(path, False, 0.0, error=str(e))
+            if result.log:
+                print(result.log, end="")
+            print_batch_summary([result])
+            self.processed[path] = signature
+            # 处理期间文件又被替换时重新检查
+            self.tracker.touch(path)
+            finished.append(result)
+        self.results.extend(finished)
+        return finished
+
+    def idle(self):
+        """没有等待稳定、排队或正在处理的SDK"""
+        return not (self.tracker.pending or self.queue or self.running)
+
+    def run(self):
+        """持续监听，直到被中断（Ctrl+C）"""
+        print(f"👀 监听 {self.root}（{type(self.watcher).__name__}，工作池 {self.workers}）")
+        try:
+            while True:
+                self.step()
+        except KeyboardInterrupt:
+            print("\n👋 停止监听，等待正在处理的任务完成...")
+        finally:
+            self.close()
+
+    def close(self):
+        self.watcher.close()
+        self.executor.shutdown(wait=True)
+        self._collect()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="监听SDK目录，自动处理新放入的Agora Mac SDK",
+        epilog="示例:\n"
+               "  python sdk_watch.py\n"
+               "  python sdk_watch.py SDK --workers 2 --settle 30",
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("root", nargs="?", default="SDK", help="监听的目录（默认 SDK）")
+    parser.add_argument("--aed-dir", default="SDK/aed", help="AED文件目录（默认 SDK/aed）")
+    parser.add_argument("--workers", type=int, default=2, help="同时处理的SDK数量（默认2）")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="每个SDK并行转换framework的任务数")
+    parser.add_argument("--settle", type=float, default=DEFAULT_SETTLE,
+                        help=f"文件保持不变多少秒后开始处理（默认{DEFAULT_SETTLE:g}）")
+    parser.add_argument("--poll-interval", type=float, default=DEFAULT_POLL_INTERVAL,
+                        help=f"不使用inotify时的扫描间隔（秒，默认{DEFAULT_POLL_INTERVAL:g}）")
+    parser.add_argument("--polling", action="store_true", help="不使用inotify，定时扫描目录")
+    parser.add_argument("--process-existing", action="store_true", help="启动时处理目录中已有的SDK zip")
+    parser.add_argument("--pipeline", action="store_true", help="使用流水线模式处理")
+    parser.add_argument("--no-cache", action="store_true", help="不使用转换缓存")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.root):
+        print(f"❌ 错误: 目录不存在: {args.root}")
+        sys.exit(1)
+
+    options = {
+        "aed_dir": args.aed_dir,
+        "jobs": args.jobs,
+        "pipeline": args.pipeline,
+        "cache": not args.no_cache,
+    }
+    watcher = SdkWatcher(args.root, options, args.workers, args.settle, args.poll_interval,
+                         use_inotify=not args.polling, process_existing=args.process_existing)
+    watcher.run()
+
+
+if __name__ == "__main__":
+    main()
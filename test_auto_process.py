@@ -5,7 +5,10 @@
 """
 
 import os
+import shutil
 import sys
+import tempfile
+import zipfile
 from pathlib import Path
 
 def test_script_import():
@@ -94,6 +97,363 @@ def test_sdk_files():
     
     return True
 
+def test_macho_rewrite():
+    """测试Mach-O解析与install name改写（使用合成的FAT动态库）"""
+    from macho_fixtures import build_framework_binary, framework_install_name
+    from macho_parser import parse_macho
+    from macho_rewriter import dylib_install_names, rewrite_buffer
+    from macho_slicer import parse_arch_option, thin_buffer
+    
+    data = bytearray(build_framework_binary("AgoraRtcKit", ["Agorafdkaac"]))
+    macho = parse_macho(data)
+    assert macho.archs == ["arm64", "x86_64"]
+    assert macho.id == framework_install_name("AgoraRtcKit")
+    
+    new_id, changes = dylib_install_names(macho, "AgoraRtcKit")
+    rewrite_buffer(data, new_id, changes)
+    rewritten = parse_macho(data)
+    assert rewritten.id == "@rpath/libAgoraRtcKit.dylib"
+    assert "@rpath/libAgorafdkaac.dylib" in rewritten.dependencies
+    assert "/usr/lib/libSystem.B.dylib" in rewritten.dependencies
+    
+    # 从FAT文件中取出单个架构
+    thin = parse_macho(bytearray(thin_buffer(data, "x86_64")))
+    assert not thin.is_fat and thin.archs == ["x86_64"]
+    assert thin.id == "@rpath/libAgoraRtcKit.dylib"
+    assert parse_arch_option("split") == ["arm64", "x86_64"]
+    assert parse_arch_option("universal") == [None]
+    
+    # 没有任何架构的FAT文件作为格式错误报告，而不是抛出异常
+    from check_dylib_dependencies import dylib_report
+    with tempfile.TemporaryDirectory() as tmp:
+        empty_fat = Path(tmp) / "libEmpty.dylib"
+        empty_fat.write_bytes(bytes.fromhex("cafebabe00000000"))
+        assert dylib_report(empty_fat)["error"]
+    print("✅ Mach-O解析与改写正常")
+    return True
+
+def test_process_synthetic_sdk():
+    """测试完整处理流程（合成SDK，解压模式、流式模式、流水线模式与低占用模式结果一致）"""
+    from auto_process_sdk import AgoraSDKProcessor
+    from macho_fixtures import write_sdk_zip
+    from macho_parser import parse_macho
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        sdk_zip = tmp / "Agora_Native_SDK_for_Mac_v4.4.30_TEST.zip"
+        write_sdk_zip(sdk_zip, ["AgoraRtcKit", "Agorafdkaac"], body_size=1024)
+        
+        contents = {}
+        for mode in ("extract", "stream", "pipeline", "bounded"):
+            output_dir = tmp / mode
+            output_dir.mkdir()
+            processor = AgoraSDKProcessor("agora_sdk", tmp / "aed", output_dir,
+                                          stream=(mode != "extract"), pipeline=(mode == "pipeline"),
+                                          work_dir=tmp / f"work_{mode}",
+                                          verify_deps=True,
+                                          # 内存预算小于任何framework，全部在临时文件中转换
+                                          max_memory=1 if mode == "bounded" else None,
+                                          max_disk=1 if mode == "bounded" else None)
+            assert processor.process_sdk(str(sdk_zip))
+            with zipfile.ZipFile(output_dir / "agora_sdk_mac_v4.4.30_TEST.zip") as zip_ref:
+                assert zip_ref.testzip() is None
+                contents[mode] = {name: zip_ref.read(name) for name in zip_ref.namelist()}
+        
+        assert (contents["extract"] == contents["stream"] == contents["pipeline"] ==
+                contents["bounded"])
+        assert sorted(contents["extract"]) == ["agora_sdk/libAgoraRtcKit.dylib",
+                                               "agora_sdk/libAgorafdkaac.dylib"]
+        macho = parse_macho(contents["extract"]["agora_sdk/libAgorafdkaac.dylib"])
+        assert macho.id == "@rpath/libAgorafdkaac.dylib"
+        assert "@rpath/libAgoraRtcKit.dylib" in macho.dependencies
+    print("✅ 合成SDK处理结果正确")
+    return True
+
+def test_incremental_with_aed():
+    """测试增量处理（只有一个framework变化、带AED文件；解压模式与流式模式）"""
+    from auto_process_sdk import AgoraSDKProcessor
+    from macho_fixtures import build_dylib, build_framework_binary, write_sdk_zip
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        (tmp / "aed").mkdir()
+        (tmp / "aed" / "libAgoraAED.dylib").write_bytes(build_dylib("@rpath/libAgoraAED.dylib"))
+        original = tmp / "original.zip"
+        write_sdk_zip(original, ["AgoraRtcKit", "Agorafdkaac"], body_size=1024)
+        sdk_zip = tmp / "Agora_Native_SDK_for_Mac_v4.4.30_TEST.zip"
+        
+        for mode in ("extract", "stream"):
+            output_dir = tmp / mode
+            options = dict(aed_dir=tmp / "aed", output_dir=output_dir,
+                           stream=(mode == "stream"), work_dir=tmp / f"work_{mode}")
+            shutil.copyfile(original, sdk_zip)
+            assert AgoraSDKProcessor(**options).process_sdk(str(sdk_zip))
+            
+            # 排在前面的framework变大，沿用的framework在新标准包中的偏移随之变化
+            with zipfile.ZipFile(original) as src, zipfile.ZipFile(sdk_zip, "w") as dst:
+                for info in src.infolist():
+                    data = src.read(info)
+                    if info.filename.endswith("/Versions/A/AgoraRtcKit"):
+                        data = build_framework_binary("AgoraRtcKit", body_size=4096, seed=7)
+                    dst.writestr(info, data)
+            processor = AgoraSDKProcessor(**options)
+            assert processor.process_sdk(str(sdk_zip))
+            assert set(processor.reused) == {"Agorafdkaac"}
+            
+            with zipfile.ZipFile(output_dir / "agora_sdk_mac_v4.4.30_TEST.zip") as standard, \
+                    zipfile.ZipFile(output_dir / "agora_sdk_mac_v4.4.30_TEST-aed.zip") as aed:
+                assert standard.testzip() is None and aed.testzip() is None
+                assert sorted(aed.namelist()) == sorted(standard.namelist() +
+                                                        ["agora_sdk/libAgoraAED.dylib"])
+                for name in standard.namelist():
+                    assert aed.read(name) == standard.read(name)
+    print("✅ 增量处理沿用的dylib在AED包中正确")
+    return True
+
+def test_dylib_graph():
+    """测试dylib依赖图检查（未解析引用、循环依赖、加载顺序）"""
+    from dylib_graph import build_graph_from_dir
+    from macho_fixtures import build_dylib
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        (tmp / "libA.dylib").write_bytes(build_dylib("@rpath/libA.dylib", ["@rpath/libB.dylib"]))
+        (tmp / "libB.dylib").write_bytes(build_dylib("@rpath/libB.dylib", ["/usr/lib/libSystem.B.dylib"]))
+        graph = build_graph_from_dir(tmp)
+        assert graph.ok
+        assert graph.topological_order() == ["libB.dylib", "libA.dylib"]
+        
+        (tmp / "libB.dylib").write_bytes(build_dylib("@rpath/libB.dylib", ["@rpath/libA.dylib",
+                                                                           "@rpath/libC.dylib"]))
+        graph = build_graph_from_dir(tmp)
+        assert not graph.ok
+        assert graph.cycles == [["libA.dylib", "libB.dylib"]]
+        assert graph.unresolved == [("libB.dylib", "@rpath/libC.dylib")]
+        assert graph.topological_order() is None
+    print("✅ dylib依赖图检查正常")
+    return True
+
+
+def test_xcframework_index():
+    """测试根据 Info.plist 选择xcframework的macOS slice"""
+    from macho_fixtures import write_sdk_zip
+    from sdk_index import SdkZipIndex
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        sdk_zip = Path(tmp) / "Agora_Native_SDK_for_Mac_v4.4.30_TEST.zip"
+        write_sdk_zip(sdk_zip, ["AgoraRtcKit", "Agorafdkaac"], body_size=64, xcframework=True)
+        with zipfile.ZipFile(sdk_zip) as zip_ref:
+            index = SdkZipIndex(zip_ref)
+            assert [entry.name for entry in index] == ["AgoraRtcKit", "Agorafdkaac"]
+            assert all("/macos-arm64_x86_64/" in entry.binary.filename for entry in index)
+            simulator = SdkZipIndex(zip_ref, platform="ios", variant="simulator")
+            assert all("-simulator/" in entry.binary.filename for entry in simulator)
+            assert len(SdkZipIndex(zip_ref, arch="i386")) == 0
+    print("✅ xcframework slice选择正常")
+    return True
+
+
+def test_resume_after_failure():
+    """测试断点续传（转换失败后 --resume 只转换未完成的framework）"""
+    from auto_process_sdk import AgoraSDKProcessor
+    from macho_fixtures import write_sdk_zip
+    
+    class FlakyProcessor(AgoraSDKProcessor):
+        fail = "Agorafdkaac"
+        converted = []
+        
+        def _convert_single_framework(self, lib_path, lib_name, log=print):
+            self.converted.append(lib_name)
+            if lib_name == self.fail:
+                raise RuntimeError("模拟转换失败")
+            return super()._convert_single_framework(lib_path, lib_name, log)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        sdk_zip = tmp / "Agora_Native_SDK_for_Mac_v4.4.30_TEST.zip"
+        write_sdk_zip(sdk_zip, ["AgoraRtcKit", "Agorafdkaac"], body_size=1024)
+        options = dict(aed_dir=tmp / "aed", output_dir=tmp / "out", work_dir=tmp / "work")
+        
+        # 失败的那次运行没有使用 --resume，断点同样保留
+        assert not FlakyProcessor(**options).process_sdk(str(sdk_zip))
+        assert (tmp / "work" / ".agora_sdk.journal.json").exists()
+        FlakyProcessor.fail = None
+        FlakyProcessor.converted = []
+        assert FlakyProcessor(resume=True, **options).process_sdk(str(sdk_zip))
+        assert FlakyProcessor.converted == ["Agorafdkaac"]
+        assert not (tmp / "work" / ".agora_sdk.journal.json").exists()
+        with zipfile.ZipFile(tmp / "out" / "agora_sdk_mac_v4.4.30_TEST.zip") as zip_ref:
+            assert sorted(zip_ref.namelist()) == ["agora_sdk/libAgoraRtcKit.dylib",
+                                                  "agora_sdk/libAgorafdkaac.dylib"]
+    print("✅ 断点续传只转换未完成的framework")
+    return True
+
+def test_sdk_watch():
+    """测试目录监听（未写完的zip不处理，写入完成后自动处理）"""
+    from macho_fixtures import write_sdk_zip
+    from sdk_watch import SdkWatcher
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / "SDK"
+        (root / "aed").mkdir(parents=True)
+        source = Path(tmp) / "Agora_Native_SDK_for_Mac_v4.4.30_TEST.zip"
+        write_sdk_zip(source, ["AgoraRtcKit"], body_size=1024)
+        data = source.read_bytes()
+        
+        watcher = SdkWatcher(root, {"aed_dir": root / "aed", "cache": False}, workers=1,
+                             settle=0, poll_interval=0.01, use_inotify=False)
+        try:
+            drop = root / "25.8.21" / source.name
+            drop.parent.mkdir()
+            drop.write_bytes(data[:len(data) // 2])
+            assert watcher.step(0.01) == [] and not watcher.queue and not watcher.running
+            drop.write_bytes(data)
+            for _ in range(500):
+                if watcher.step(0.01):
+                    break
+        finally:
+            watcher.close()
+        assert [result.success for result in watcher.results] == [True]
+        assert (drop.parent / "agora_sdk_mac_v4.4.30_TEST.zip").exists()
+    print("✅ 新放入的SDK被自动处理")
+    return True
+
+def test_sdk_catalog():
+    """测试SDK目录索引（增量更新与处理状态）"""
+    from auto_process_sdk import AgoraSDKProcessor
+    from macho_fixtures import write_sdk_zip
+    from sdk_catalog import STATUS_NEW, STATUS_PROCESSED, SdkCatalog
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / "SDK"
+        sdk_zip = root / "25.8.21" / "Agora_Native_SDK_for_Mac_v4.4.30_TEST.zip"
+        sdk_zip.parent.mkdir(parents=True)
+        write_sdk_zip(sdk_zip, ["AgoraRtcKit"], body_size=1024)
+        
+        catalog = SdkCatalog.load(root).refresh()
+        [entry] = catalog.sdk_files()
+        assert entry.status == STATUS_NEW and entry.version_suffix == "v4.4.30_TEST"
+        assert entry.sdk_version.version == "4.4.30" and entry.sdk_version.variant == "TEST"
+        catalog.save()
+        
+        processor = AgoraSDKProcessor(aed_dir=root / "aed", output_dir=sdk_zip.parent,
+                                      work_dir=Path(tmp) / "work")
+        assert processor.process_sdk(str(sdk_zip))
+        catalog = SdkCatalog.load(root).refresh()
+        [entry] = catalog.sdk_files()
+        assert entry.status == STATUS_PROCESSED
+        assert list(entry.outputs) == ["agora_sdk_mac_v4.4.30_TEST.zip"]
+        assert catalog.sdk_files(include_processed=False) == []
+        catalog.save()
+        # 原子写入的索引与普通新建文件权限相同（不是mkstemp的0600）
+        umask = os.umask(0)
+        os.umask(umask)
+        assert catalog.path.stat().st_mode & 0o777 == 0o666 & ~umask
+        # 目录未变化时不重新扫描
+        assert not SdkCatalog.load(root).refresh().changed
+        
+        # 原地替换的SDK zip即使目录修改时间不变也能发现
+        dir_stat = sdk_zip.parent.stat()
+        replacement = Path(tmp) / "replacement.zip"
+        write_sdk_zip(replacement, ["AgoraRtcKit"], body_size=2048)
+        os.replace(replacement, sdk_zip)
+        os.utime(sdk_zip.parent, ns=(dir_stat.st_atime_ns, dir_stat.st_mtime_ns))
+        catalog = SdkCatalog.load(root).refresh()
+        [entry] = catalog.sdk_files()
+        st = sdk_zip.stat()
+        assert (entry.size, entry.mtime_ns) == (st.st_size, st.st_mtime_ns)
+    print("✅ SDK目录索引正确")
+    return True
+
+def test_sdk_version():
+    """测试SDK文件名解析"""
+    import pickle
+    from sdk_version import parse_sdk_version, version_suffix
+    
+    name = "Agora_Native_SDK_for_Mac_rel.v4.4.30_25321_FULL_20250820_1052_846534.zip"
+    sdk_version = parse_sdk_version(name)
+    assert (sdk_version.version, sdk_version.build, sdk_version.variant, sdk_version.date,
+            sdk_version.time, sdk_version.hash, sdk_version.channel) == (
+        "4.4.30", "25321", "FULL", "20250820", "1052", "846534", "rel")
+    assert version_suffix(name) == "v4.4.30_25321_FULL_20250820_1052_846534"
+    # 缓存的解析结果由所有调用者共用，不能被修改
+    try:
+        sdk_version.build = "0"
+        raise AssertionError("SdkVersion 不应可修改")
+    except AttributeError:
+        pass
+    assert parse_sdk_version(name).build == "25321"
+    assert pickle.loads(pickle.dumps(sdk_version)) == sdk_version
+    assert parse_sdk_version("Agora_Native_SDK_for_Mac_v4.5.0_VOICE.zip").version_tuple == (4, 5, 0)
+    # 无法识别版本号时后缀仍然互不相同
+    assert parse_sdk_version("Agora_Native_SDK_for_Mac_FULL.zip") is None
+    assert (version_suffix("Agora_Native_SDK_for_Mac_FULL.zip") !=
+            version_suffix("Agora_Native_SDK_for_Mac_VOICE.zip"))
+    print("✅ SDK文件名解析正确")
+    return True
+
+def test_sdk_service():
+    """测试处理服务（HTTP提交任务并查询结果）"""
+    import json
+    import threading
+    import time
+    import urllib.error
+    import urllib.request
+    from macho_fixtures import write_sdk_zip
+    from sdk_service import JobError, SdkService, create_server
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp).resolve()
+        sdk_zip = tmp / "Agora_Native_SDK_for_Mac_v4.4.30_TEST.zip"
+        write_sdk_zip(sdk_zip, ["AgoraRtcKit"], body_size=1024)
+        service = SdkService(1, {"aed_dir": str(tmp / "aed"), "cache": False}, root=tmp)
+        # 目录类参数只能由服务端设置，输出目录必须在服务根目录之内
+        rejected = [{"options": {"sdk_dir": str(tmp)}}, {"options": {"aed_dir": str(tmp)}},
+                    {"output_dir": str(tmp.parent)}, {"output_dir": str(tmp / "..")}]
+        for request in rejected:
+            try:
+                service.submit(str(sdk_zip), **request)
+            except JobError:
+                continue
+            raise AssertionError(f"应拒绝: {request}")
+        server = create_server(service, port=0)
+        service.start()
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        # 流水线模式下framework在工作线程中转换，其输出也应写入任务日志
+        body = json.dumps({"sdk_zip": str(sdk_zip),
+                           "options": {"pipeline": True, "jobs": 2}}).encode("utf-8")
+        try:
+            # 非JSON的请求（例如浏览器跨站提交的text/plain）被拒绝
+            request = urllib.request.Request(f"{base}/jobs", method="POST", data=body,
+                                             headers={"Content-Type": "text/plain"})
+            try:
+                urllib.request.urlopen(request)
+                raise AssertionError("text/plain 请求不应被接受")
+            except urllib.error.HTTPError as e:
+                assert e.code == 415
+            request = urllib.request.Request(f"{base}/jobs", method="POST", data=body,
+                                             headers={"Content-Type": "application/json"})
+            with urllib.request.urlopen(request) as response:
+                assert response.status == 202
+                job_id = json.load(response)["id"]
+            for _ in range(500):
+                with urllib.request.urlopen(f"{base}/jobs/{job_id}?log=1") as response:
+                    job = json.load(response)
+                if job["status"] in ("succeeded", "failed"):
+                    break
+                time.sleep(0.01)
+        finally:
+            server.shutdown()
+            server.server_close()
+            service.close()
+        assert job["status"] == "succeeded" and job["metrics"]["stages"]
+        assert "🔄 转换: AgoraRtcKit" in job["log"]
+        assert job["output_files"] == [str(tmp / "agora_sdk_mac_v4.4.30_TEST.zip")]
+    print("✅ 处理服务返回任务状态与输出文件")
+    return True
+
 def run_tests():
     """运行所有测试"""
     print("🧪 开始测试自动化SDK处理脚本...\n")
@@ -104,6 +464,16 @@ def run_tests():
         ("目录结构测试", test_directory_structure),
         ("AED文件测试", test_aed_files),
         ("SDK文件测试", test_sdk_files),
+        ("Mach-O改写测试", test_macho_rewrite),
+        ("合成SDK处理测试", test_process_synthetic_sdk),
+        ("增量处理AED测试", test_incremental_with_aed),
+        ("dylib依赖图测试", test_dylib_graph),
+        ("xcframework测试", test_xcframework_index),
+        ("断点续传测试", test_resume_after_failure),
+        ("目录监听测试", test_sdk_watch),
+        ("SDK索引测试", test_sdk_catalog),
+        ("SDK版本解析测试", test_sdk_version),
+        ("处理服务测试", test_sdk_service),
     ]
     
     passed = 0
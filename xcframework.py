@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+xcframework 解析模块
+用plistlib读取 Info.plist 中的 AvailableLibraries，建立 平台/变体/架构 -> slice 的索引，
+直接选出需要的slice（默认macOS），不会误转换iOS、模拟器等其他slice；
+目录中的xcframework与zip中的xcframework共用同一套选择逻辑
+"""
+
+import os
+import plistlib
+
+# 默认选择的平台
+DEFAULT_PLATFORM = "macos"
+# 没有 Info.plist 时沿用的macOS slice目录
+LEGACY_MACOS_IDENTIFIER = "macos-arm64_x86_64"
+
+
+class XCFrameworkError(Exception):
+    """xcframework 的 Info.plist 缺失或格式错误"""
+
+
+class XCFrameworkLibrary:
+    """Info.plist 中 AvailableLibraries 的一项（一个slice）"""
+
+    def __init__(self, identifier, library_path, platform, variant=None, archs=(),
+                 binary_path=None):
+        # slice目录名，例如 "macos-arm64_x86_64"
+        self.identifier = identifier
+        # slice目录下的framework，例如 "AgoraRtcKit.framework"
+        self.library_path = library_path
+        # "macos"、"ios" 等
+        self.platform = platform
+        # None、"simulator" 或 "maccatalyst"
+        self.variant = variant
+        self.archs = list(archs)
+        # 新版Xcode写入的动态库相对路径，例如 "AgoraRtcKit.framework/Versions/A/AgoraRtcKit"
+        self.binary_path = binary_path
+
+    @classmethod
+    def from_plist(cls, item):
+        try:
+            return cls(item["LibraryIdentifier"], item["LibraryPath"], item["SupportedPlatform"],
+                       item.get("SupportedPlatformVariant"), item.get("SupportedArchitectures", []),
+                       item.get("BinaryPath"))
+        except (KeyError, TypeError, AttributeError) as e:
+            raise XCFrameworkError(f"AvailableLibraries 格式错误: {e}")
+
+    @property
+    def framework_path(self):
+        """framework相对xcframework的路径，例如 "macos-arm64_x86_64/AgoraRtcKit.framework" """
+        return f"{self.identifier}/{self.library_path}"
+
+    def matches(self, platform=DEFAULT_PLATFORM, variant=None, arch=None):
+        """平台与变体一致，且指定架构时包含该架构"""
+        return (self.platform == platform and self.variant == variant and
+                (arch is None or arch in self.archs))
+
+    def __repr__(self):
+        return f"XCFrameworkLibrary({self.identifier!r}, archs={self.archs})"
+
+
+def parse_info_plist(data):
+    """
+    解析xcframework的 Info.plist
+
+    Args:
+        data: Info.plist 的内容（XML或二进制plist）
+
+    Returns:
+        list: XCFrameworkLibrary 列表
+    """
+    try:
+        plist = plistlib.loads(data)
+    except (plistlib.InvalidFileException, ValueError) as e:
+        raise XCFrameworkError(f"无法解析 Info.plist: {e}")
+    if not isinstance(plist, dict) or not isinstance(plist.get("AvailableLibraries"), list):
+        raise XCFrameworkError("Info.plist 中没有 AvailableLibraries")
+    return [XCFrameworkLibrary.from_plist(item) for item in plist["AvailableLibraries"]]
+
+
+def select_library(libraries, platform=DEFAULT_PLATFORM, variant=None, arch=None):
+    """
+    选择符合条件的slice，有多个时选择架构最多的（结果与plist中的顺序无关）
+
+    Returns:
+        XCFrameworkLibrary: 找不到时返回None
+    """
+    candidates = [library for library in libraries if library.matches(platform, variant, arch)]
+    if not candidates:
+        return None
+    return min(candidates, key=lambda library: (-len(library.archs), library.identifier))
+
+
+def read_xcframework(xcframework_path):
+    """读取目录中xcframework的 Info.plist，返回 XCFrameworkLibrary 列表"""
+    plist_path = os.path.join(xcframework_path, "Info.plist")
+    try:
+        with open(plist_path, "rb") as f:
+            return parse_info_plist(f.read())
+    except OSError as e:
+        raise XCFrameworkError(f"无法读取 {plist_path}: {e}")
+
+
+def resolve_framework(xcframework_path, platform=DEFAULT_PLATFORM, variant=None, arch=None):
+    """
+    找到xcframework中对应平台的 .framework 目录
+
+    Args:
+        xcframework_path: xcframework目录
+        platform: 平台，默认 "macos"
+        variant: None、"simulator" 或 "maccatalyst"
+        arch: 要求slice包含的架构，None 表示不限
+
+    Returns:
+        str: .framework目录路径，找不到时返回None
+    """
+    try:
+        library = select_library(read_xcframework(xcframework_path), platform, variant, arch)
+    except XCFrameworkError:
+        # 没有 Info.plist 的旧版SDK，沿用固定的macOS slice目录
+        if platform != DEFAULT_PLATFORM or variant is not None:
+            return None
+        slice_dir = os.path.join(xcframework_path, LEGACY_MACOS_IDENTIFIER)
+        if not os.path.isdir(slice_dir):
+            return None
+        for name in sorted(os.listdir(slice_dir)):
+            if name.endswith(".framework"):
+                return os.path.join(slice_dir, name)
+        return None
+    if library is None:
+        return None
+    return os.path.join(xcframework_path, library.identifier, library.library_path)